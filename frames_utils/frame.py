@@ -1,4 +1,4 @@
-import copy
+import copy, datetime
 from dataclasses import dataclass
 
 
@@ -44,6 +44,16 @@ class DtlDateTime:
         millisecond = int.from_bytes(_bytes[8: 12], byteorder)
         return DtlDateTime(year, month, day, dayOfWeek, hour, minute, second, millisecond)
 
+    def timestamp(self):
+        """
+        :return: POSIX timestamp of local date and time, None when fields don't form a valid date
+        """
+        try:
+            return datetime.datetime(self.year, self.month, self.day, self.hour, self.minute, self.second,
+                                     self.millisecond * 1000).timestamp()
+        except (ValueError, OverflowError):
+            return None
+
     def to_bytes(self, unusedLength, byteorder):
         res = bytearray()
         res.extend(self.year.to_bytes(2, byteorder))
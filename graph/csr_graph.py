@@ -0,0 +1,262 @@
+import numpy as np
+from graph.graph import PathsCache, k_shortest_paths
+
+
+class CsrEdge:
+    """
+    Lightweight view of a single CsrGraph edge, supports igraph style edge['executors'] access.
+    """
+    def __init__(self, graph, index):
+        self.graph = graph
+        self.index = index
+
+    @property
+    def source(self):
+        return int(self.graph.edgeSources[self.index])
+
+    @property
+    def target(self):
+        return int(self.graph.edgeTargets[self.index])
+
+    def __getitem__(self, name):
+        return self.graph.edgeAttribute(self.index, name)
+
+    def __setitem__(self, name, value):
+        self.graph.setEdgeAttribute(self.index, name, value)
+
+
+class CsrEdgeSequence:
+    def __init__(self, graph):
+        self.__graph = graph
+
+    def __len__(self):
+        return self.__graph.ecount()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return [self.__graph.edgeAttribute(eid, key) for eid in range(0, len(self))]
+        if key < 0 or key >= len(self):
+            raise IndexError("Edge index out of range: {}".format(key))
+        return CsrEdge(self.__graph, key)
+
+    def __setitem__(self, key, value):
+        if not isinstance(key, str):
+            raise TypeError("Only attribute names can be assigned for all edges")
+        for eid in range(0, len(self)):
+            self.__graph.setEdgeAttribute(eid, key, value)
+
+    def __iter__(self):
+        for eid in range(0, len(self)):
+            yield CsrEdge(self.__graph, eid)
+
+
+class CsrVertexSequence(list):
+    @property
+    def indices(self):
+        return range(0, len(self))
+
+
+class CsrGraph:
+    """
+    Immutable topology stored as NumPy compressed sparse rows.
+
+    Row v holds neighbours of node v in indices[indptr[v]:indptr[v + 1]], sorted by neighbour and edge id.
+    Undirected edges are stored in both endpoint rows, edge ids refer to the order edges were given in.
+    Weights and integer attributes are per-edge columns, object attributes (agents, executors) are kept
+    sparsely and created on first access, so untouched edges cost no Python objects at all.
+    """
+    def __init__(self, vertices, sources, targets, weights, directed=False):
+        self.vs = CsrVertexSequence(vertices)
+        self.es = CsrEdgeSequence(self)
+        self.edgeSources = np.asarray(sources, dtype=np.int32)
+        self.edgeTargets = np.asarray(targets, dtype=np.int32)
+        self.edgeWeights = np.asarray(weights, dtype=np.float64)
+        self.__directed = directed
+        self.__intColumns = dict()
+        self.__objectColumns = dict()
+        self.__objectFactories = dict()
+        self.__paths = PathsCache()
+        self.weightsVersion = 0  # Bumped whenever a weight changes
+        self.__buildRows()
+
+    @classmethod
+    def fromGraph(cls, graph, objectAttributes=('agents', 'executors')):
+        """
+        Converts igraph or fallback graph.Graph into CSR form.
+        :param graph: Graph to convert
+        :param objectAttributes: Edge attributes holding mutable objects, created lazily per edge
+        :return: CsrGraph with the same vertex and edge ids
+        """
+        indices = list(graph.vs.indices)
+        verticesCount = max(indices) + 1 if len(indices) > 0 else 0
+        vertices = []
+        for i in range(0, verticesCount):
+            vertices.append(_vertexAttributes(graph.vs[i]) if i in indices else dict())
+
+        sources, targets, weights, attributes = [], [], [], []
+        for edge in graph.es:
+            edgeAttributes = _edgeAttributes(edge)
+            weight = edgeAttributes.pop('weight', None)
+            sources.append(edge.source)
+            targets.append(edge.target)
+            weights.append(weight if weight is not None else 1.0)
+            attributes.append(edgeAttributes)
+
+        csr = cls(vertices, sources, targets, weights, directed=graph.is_directed())
+        for name in objectAttributes:
+            csr.addObjectAttribute(name, dict)
+        for eid, edgeAttributes in enumerate(attributes):
+            for name, value in edgeAttributes.items():
+                if name in objectAttributes:
+                    if value:
+                        csr.setEdgeAttribute(eid, name, value)
+                elif isinstance(value, (int, np.integer)):
+                    if name not in csr.__intColumns:
+                        csr.addIntAttribute(name)
+                    csr.setEdgeAttribute(eid, name, value)
+        return csr
+
+    def __buildRows(self):
+        verticesCount = len(self.vs)
+        edgeIds = np.arange(0, len(self.edgeSources), dtype=np.int32)
+        rows, columns, slotEdges = self.edgeSources, self.edgeTargets, edgeIds
+        if not self.__directed:
+            reversible = self.edgeSources != self.edgeTargets
+            rows = np.concatenate((self.edgeSources, self.edgeTargets[reversible]))
+            columns = np.concatenate((self.edgeTargets, self.edgeSources[reversible]))
+            slotEdges = np.concatenate((edgeIds, edgeIds[reversible]))
+        order = np.lexsort((slotEdges, columns, rows))
+        rows = rows[order]
+        self.indices = columns[order]
+        self.slotEdges = slotEdges[order]
+        self.slotWeights = self.edgeWeights[self.slotEdges]
+        self.indptr = np.zeros(verticesCount + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=verticesCount), out=self.indptr[1:])
+        self.__slotKeys = rows.astype(np.int64) * verticesCount + self.indices
+
+    def is_directed(self):
+        return self.__directed
+
+    def vcount(self):
+        return len(self.vs)
+
+    def ecount(self):
+        return len(self.edgeSources)
+
+    def neighbors(self, vertex):
+        return self.indices[self.indptr[vertex]:self.indptr[vertex + 1]]
+
+    def get_eid(self, v1, v2, directed=True, error=True):
+        """
+        Retrieves id of the edge between two nodes, edge matching exact direction takes precedence.
+        :param error: Raise ValueError when edge doesn't exist, return -1 otherwise
+        """
+        key = v1 * len(self.vs) + v2
+        slot = int(np.searchsorted(self.__slotKeys, key))
+        eid = -1
+        while slot < len(self.__slotKeys) and self.__slotKeys[slot] == key:
+            candidate = int(self.slotEdges[slot])
+            if eid == -1 or self.edgeSources[candidate] == v1:
+                eid = candidate
+                if self.edgeSources[candidate] == v1:
+                    break
+            slot += 1
+        if eid == -1 and error:
+            raise ValueError("No such edge: {} -> {}".format(v1, v2))
+        return eid
+
+    def get_eids(self, sources, targets):
+        """
+        Vectorized edge ids lookup, -1 for missing edges.
+        :param sources: Array of source nodes
+        :param targets: Array of target nodes
+        :return: Array of edge ids
+        """
+        keys = np.asarray(sources, dtype=np.int64) * len(self.vs) + np.asarray(targets, dtype=np.int64)
+        slots = np.searchsorted(self.__slotKeys, keys)
+        clipped = np.minimum(slots, len(self.__slotKeys) - 1)
+        found = (slots < len(self.__slotKeys)) & (self.__slotKeys[clipped] == keys)
+        return np.where(found, self.slotEdges[clipped], -1)
+
+    def get_edgelist(self):
+        return list(zip(self.edgeSources.tolist(), self.edgeTargets.tolist()))
+
+    def __getitem__(self, item):
+        eid = self.get_eid(item[0], item[1], error=False)
+        if eid == -1:
+            return None
+        return float(self.edgeWeights[eid])
+
+    def __setitem__(self, key, value):
+        eid = self.get_eid(key[0], key[1], error=False)
+        if eid == -1:
+            raise ValueError("CsrGraph topology is immutable, can't add edge: {} -> {}".format(key[0], key[1]))
+        self.setEdgeAttribute(eid, 'weight', value)
+
+    def addIntAttribute(self, name, default=0):
+        self.__intColumns[name] = np.full(self.ecount(), default, dtype=np.int32)
+
+    def addObjectAttribute(self, name, factory):
+        self.__objectColumns[name] = dict()
+        self.__objectFactories[name] = factory
+
+    def intAttribute(self, name):
+        """
+        :return: Whole integer column, suitable for vectorized reads
+        """
+        return self.__intColumns[name]
+
+    def edgeAttribute(self, eid, name):
+        if name == 'weight':
+            return float(self.edgeWeights[eid])
+        if name in self.__intColumns:
+            return int(self.__intColumns[name][eid])
+        values = self.__objectColumns[name]
+        value = values.get(eid)
+        if value is None:
+            value = values.setdefault(eid, self.__objectFactories[name]())
+        return value
+
+    def setEdgeAttribute(self, eid, name, value):
+        if name == 'weight':
+            if self.edgeWeights[eid] != value:
+                self.edgeWeights[eid] = value
+                self.slotWeights[self.slotEdges == eid] = value
+                self.weightsVersion += 1
+                self.__paths.clear()
+        elif name in self.__intColumns:
+            self.__intColumns[name][eid] = value
+        else:
+            if name not in self.__objectColumns:
+                self.addObjectAttribute(name, dict)
+            self.__objectColumns[name][eid] = value
+
+    def get_k_shortest_paths(self, s, d, k=1):
+        """
+        Finds k shortest loopless paths using Yen's algorithm. Results are cached until a weight changes.
+        """
+        # Paths computed while a weight changes are stored under the previous version and never read again
+        key = (s, d, k, self.weightsVersion)
+        paths = self.__paths.get(key)
+        if paths is None:
+            paths = tuple(tuple(path) for path in k_shortest_paths(self.__adjacent, s, d, k))
+            self.__paths.put(key, paths)
+        return [list(path) for path in paths]
+
+    def __adjacent(self, node):
+        begin, end = self.indptr[node], self.indptr[node + 1]
+        return zip(self.slotEdges[begin:end].tolist(), self.indices[begin:end].tolist(), self.slotWeights[begin:end].tolist())
+
+
+def _vertexAttributes(vertex):
+    if hasattr(vertex, 'attributes'):
+        return vertex.attributes()
+    attributes = dict(vertex)
+    attributes.pop('edges', None)
+    return attributes
+
+
+def _edgeAttributes(edge):
+    if callable(edge.attributes):
+        return edge.attributes()
+    return dict(edge.attributes, weight=edge.weight)
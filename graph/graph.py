@@ -1,14 +1,195 @@
+import heapq, itertools, threading
+from collections import OrderedDict
+
+
+PATHS_CACHE_SIZE = 4096
+
+
 class Edge:
-    def __init__(self, source, destination, weight):
+    def __init__(self, source, destination, weight, **attributes):
         self.source = source
         self.destination = destination
-        self.weight = weight
+        self.__weight = weight
+        self.attributes = attributes
+        self.index = -1
+        self.onWeightChanged = None  # Set by the graph owning the edge
+
+    @property
+    def target(self):
+        return self.destination
+
+    @property
+    def weight(self):
+        return self.__weight
+
+    @weight.setter
+    def weight(self, value):
+        """
+        Every write of weight, e.g. edge['weight'] = 1.0 or es['weight'] = 1.0, is reported to the owning graph.
+        """
+        if self.__weight != value:
+            self.__weight = value
+            if self.onWeightChanged is not None:
+                self.onWeightChanged()
+
+    def __getitem__(self, name):
+        """
+        Retrieves edge attribute the same way igraph does, e.g. edge['executors'].
+        """
+        if name == 'weight':
+            return self.weight
+        return self.attributes[name]
+
+    def __setitem__(self, name, value):
+        if name == 'weight':
+            self.weight = value
+        else:
+            self.attributes[name] = value
+
+
+class EdgeSequence(list):
+    def __setitem__(self, key, value):
+        """
+        Assigning by attribute name sets it for every edge, e.g. es['weight'] = 1.0.
+        """
+        if isinstance(key, str):
+            for edge in self:
+                edge[key] = value
+        else:
+            super().__setitem__(key, value)
+
+
+class VertexSequence(dict):
+    @property
+    def indices(self):
+        return list(self.keys())
+
+
+class PathsCache:
+    """
+    Bounded LRU cache of k shortest paths keyed by (source, destination, k, weights version).
+    Paths are stored as tuples so cached entries can't be mutated by callers.
+    """
+    def __init__(self, size=PATHS_CACHE_SIZE):
+        self.__size = size
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        with self.__lock:
+            paths = self.__entries.get(key)
+            if paths is not None:
+                self.__entries.move_to_end(key)
+            return paths
+
+    def put(self, key, paths):
+        with self.__lock:
+            self.__entries[key] = paths
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__size:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+def shortest_path(adjacent, source, destination, excludedNodes=(), excludedEdges=()):
+    """
+    Dijkstra search for a single shortest path.
+    :param adjacent: Callable returning (edgeKey, neighbour, weight) tuples for a node
+    :param excludedNodes: Nodes that can't be visited
+    :param excludedEdges: Edge keys that can't be traversed
+    :return: Tuple of (cost, path) or None if destination is unreachable
+    """
+    distances = {source: 0}
+    previous = {}
+    counter = itertools.count()
+    heap = [(0, next(counter), source)]
+    while heap:
+        cost, _, node = heapq.heappop(heap)
+        if node == destination:
+            path = [node]
+            while node in previous:
+                node = previous[node]
+                path.append(node)
+            path.reverse()
+            return cost, path
+        if cost > distances[node]:
+            continue
+        for edgeKey, neighbour, weight in adjacent(node):
+            if neighbour in excludedNodes or edgeKey in excludedEdges:
+                continue
+            newCost = cost + weight
+            if neighbour not in distances or newCost < distances[neighbour]:
+                distances[neighbour] = newCost
+                previous[neighbour] = node
+                heapq.heappush(heap, (newCost, next(counter), neighbour))
+    return None
+
+
+def k_shortest_paths(adjacent, source, destination, k):
+    """
+    Yen's algorithm for k shortest loopless paths.
+    :param adjacent: Callable returning (edgeKey, neighbour, weight) tuples for a node
+    :return: List of at most k paths (lists of nodes) ordered by cost
+    """
+    if source == destination:
+        return [[source]]
+    first = shortest_path(adjacent, source, destination)
+    if first is None:
+        return []
+
+    def edgesWeights(path):
+        return [min(w for _, n, w in adjacent(path[i - 1]) if n == path[i]) for i in range(1, len(path))]
+
+    paths = [first]
+    found = {tuple(first[1])}
+    candidates = []
+    counter = itertools.count()
+    while len(paths) < k:
+        _, lastPath = paths[-1]
+        lastWeights = edgesWeights(lastPath)
+        rootCost = 0
+        for i in range(0, len(lastPath) - 1):
+            spurNode = lastPath[i]
+            rootPath = lastPath[:i + 1]
+            excludedEdges = set()
+            for _, path in paths:
+                if len(path) > i + 1 and path[:i + 1] == rootPath:
+                    for key, n, _ in adjacent(path[i]):
+                        if n == path[i + 1]:
+                            excludedEdges.add(key)
+            excludedNodes = set(rootPath[:-1])
+            spur = shortest_path(adjacent, spurNode, destination, excludedNodes, excludedEdges)
+            if spur is not None:
+                spurCost, spurPath = spur
+                candidate = rootPath[:-1] + spurPath
+                if tuple(candidate) not in found:
+                    found.add(tuple(candidate))
+                    heapq.heappush(candidates, (rootCost + spurCost, next(counter), candidate))
+            rootCost += lastWeights[i]
+        if not candidates:
+            break
+        cost, _, path = heapq.heappop(candidates)
+        paths.append((cost, path))
+    return [path for _, path in paths]
 
 
 class Graph:
-    def __init__(self):
-        self.vs = dict()  # Stores vertices and associated data
-        self.es = []      # Stores edges
+    def __init__(self, directed=True):
+        self.vs = VertexSequence()  # Stores vertices and associated data
+        self.es = EdgeSequence()    # Stores edges, edge id is the position in this list
+        self.__directed = directed
+        self.__edgesIndex = dict()  # (source, destination) -> edge id
+        self.__paths = PathsCache()
+        self.weightsVersion = 0  # Bumped whenever weights or edges change
+
+    def is_directed(self):
+        return self.__directed
 
     def add_edges(self, edges):
         """
@@ -16,6 +197,8 @@ class Graph:
         :param edges: List of Edge objects to add
         """
         for edge in edges:
+            edge.index = len(self.es)
+            edge.onWeightChanged = self.__onWeightChanged
             self.es.append(edge)
             # Add edge to adjacency list representation
             if edge.source not in self.vs:
@@ -23,16 +206,46 @@ class Graph:
             if edge.destination not in self.vs:
                 self.vs[edge.destination] = {'edges': []}
             self.vs[edge.source]['edges'].append(edge)
+            if not self.__directed and edge.source != edge.destination:
+                self.vs[edge.destination]['edges'].append(edge)
+            self.__indexEdge(edge)
+        self.weightsVersion += 1
+        self.__paths.clear()
+
+    def add_edge(self, source, target, **attributes):
+        """
+        Adds single edge, igraph compatible.
+        :param source: Source node index
+        :param target: Target node index
+        :param attributes: Edge attributes, e.g. weight or executors
+        """
+        weight = attributes.pop('weight', None)
+        edge = Edge(source, target, weight, **attributes)
+        self.add_edges([edge])
+        return edge
 
-    def add_vertex(self, node):
+    def add_vertex(self, node=None, **attributes):
         """
         Adds a vertex to the graph.
         :param node: Node data to add
         """
         i = len(self.vs)
-        self.vs[i] = dict()
-        self.vs[i]['node'] = node
-        self.vs[i]['edges'] = []  # Initialize empty list of edges for the new node
+        vertex = self.vs.setdefault(i, {'edges': []})  # Keep edges when vertex was already created by add_edges
+        vertex['node'] = node
+        vertex.update(attributes)
+
+    def get_eid(self, v1, v2, directed=True, error=True):
+        """
+        Retrieves id of the edge between two nodes in O(1).
+        :param v1: Source node
+        :param v2: Destination node
+        :param error: Raise ValueError when edge doesn't exist, return -1 otherwise
+        :return: Edge id, valid index for self.es
+        """
+        eid = self.__edgesIndex.get((v1, v2), -1)
+        if eid == -1 and error:
+            raise ValueError("No such edge: {} -> {}".format(v1, v2))
+        return eid
 
     def __getitem__(self, item):
         """
@@ -40,11 +253,10 @@ class Graph:
         :param item: Tuple of (source, destination)
         :return: Weight of the edge or None if edge doesn't exist
         """
-        source, destination = item
-        for edge in self.es:
-            if edge.source == source and edge.destination == destination:
-                return edge.weight
-        return None
+        eid = self.__edgesIndex.get(item, -1)
+        if eid == -1:
+            return None
+        return self.es[eid].weight
 
     def __setitem__(self, key, value):
         """
@@ -52,24 +264,59 @@ class Graph:
         :param key: Tuple of (source, destination)
         :param value: Weight of the edge
         """
-        source, destination = key
-        for edge in self.es:
-            if edge.source == source and edge.destination == destination:
-                edge.weight = value
-                return
+        eid = self.__edgesIndex.get(key, -1)
+        if eid != -1:
+            self.es[eid].weight = value
+            return
         # If edge doesn't exist, create a new one
+        source, destination = key
         new_edge = Edge(source, destination, value)
         self.add_edges([new_edge])
 
-    def get_k_shortest_paths(self, s, d, k):
+    def __onWeightChanged(self):
+        self.weightsVersion += 1
+        self.__paths.clear()
+
+    def __indexEdge(self, edge):
+        key = (edge.source, edge.destination)
+        if key not in self.__edgesIndex or self.es[self.__edgesIndex[key]].source != edge.source:
+            # Edge matching exact direction takes precedence over reversed undirected one
+            self.__edgesIndex[key] = edge.index
+        if not self.__directed:
+            self.__edgesIndex.setdefault((edge.destination, edge.source), edge.index)
+
+    def get_k_shortest_paths(self, s, d, k=1):
         """
-        A stub for getting k shortest paths. Replace with actual pathfinding logic.
+        Finds k shortest loopless paths using Yen's algorithm. Results are cached until a weight changes.
         :param s: Source node
         :param d: Destination node
         :param k: Number of shortest paths to find
-        :return: List of paths
+        :return: List of paths, each path being a list of node indices
+        """
+        # Paths computed while a weight changes are stored under the previous version and never read again
+        key = (s, d, k, self.weightsVersion)
+        paths = self.__paths.get(key)
+        if paths is None:
+            paths = tuple(tuple(path) for path in k_shortest_paths(self.__adjacent, s, d, k))
+            self.__paths.put(key, paths)
+        return [list(path) for path in paths]
+
+    def neighbors(self, vertex):
+        """
+        Retrieves adjacent nodes, igraph compatible.
+        :param vertex: Node index
+        :return: List of neighbour node indices
         """
-        return [[s, d]]  # Placeholder
+        return [neighbour for _, neighbour, _ in self.__adjacent(vertex)]
+
+    def __adjacent(self, node):
+        if node not in self.vs:
+            return []
+        adjacent = []
+        for edge in self.vs[node]['edges']:
+            neighbour = edge.destination if edge.source == node else edge.source
+            adjacent.append((edge.index, neighbour, edge.weight if edge.weight is not None else 1))
+        return adjacent
 
     def get_adjacency_matrix(self):
         """
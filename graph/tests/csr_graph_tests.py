@@ -0,0 +1,50 @@
+import unittest
+from graph.graph import Graph
+from graph.csr_graph import CsrGraph
+
+
+class CsrGraphTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.__graph = Graph(directed=False)
+        for i in range(0, 5):
+            self.__graph.add_vertex(node=i)
+        for source, destination, weight in [(0, 1, 1), (1, 3, 1), (0, 2, 1), (2, 3, 2), (1, 2, 1), (3, 4, 1), (2, 4, 5)]:
+            self.__graph.add_edge(source, destination, agents={}, executors={})
+            self.__graph[source, destination] = weight
+        self.__csr = CsrGraph.fromGraph(self.__graph)
+
+    def test_keepsNodesAndEdgeIds(self):
+        self.assertEqual(self.__csr.vs[3]['node'], 3)
+        self.assertEqual(len(self.__csr.vs), 5)
+        for source, destination in [(0, 1), (3, 1), (4, 2), (2, 3)]:
+            self.assertEqual(self.__csr.get_eid(source, destination), self.__graph.get_eid(source, destination))
+            self.assertEqual(self.__csr[source, destination], self.__graph[source, destination])
+
+    def test_findsSamePathsAsListBackedGraph(self):
+        for source, destination in [(0, 4), (4, 0), (1, 2)]:
+            self.assertEqual(self.__csr.get_k_shortest_paths(source, destination, k=4),
+                             self.__graph.get_k_shortest_paths(source, destination, k=4))
+
+    def test_vectorizedEdgeIdsLookup(self):
+        eids = self.__csr.get_eids([0, 3, 0], [1, 4, 4])
+        self.assertEqual(eids.tolist(), [self.__graph.get_eid(0, 1), self.__graph.get_eid(3, 4), -1])
+
+    def test_objectAttributesAreCreatedOnAccess(self):
+        executors = self.__csr.es[self.__csr.get_eid(0, 1)]['executors']
+        executors[1] = 'executor'
+        self.assertEqual(self.__csr.es[self.__csr.get_eid(1, 0)]['executors'], {1: 'executor'})
+        self.assertEqual(self.__csr.es[self.__csr.get_eid(1, 2)]['executors'], {})
+
+    def test_weightChangeInvalidatesCachedPaths(self):
+        self.assertEqual(self.__csr.get_k_shortest_paths(0, 4, k=1), [[0, 1, 3, 4]])
+        self.__csr[2, 4] = 0.1
+        self.assertEqual(self.__csr.get_k_shortest_paths(0, 4, k=1), [[0, 2, 4]])
+
+    def test_addingEdgesIsRejected(self):
+        with self.assertRaises(ValueError):
+            self.__csr[0, 4] = 1
+
+
+if __name__ == '__main__':
+    unittest.main()
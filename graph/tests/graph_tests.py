@@ -0,0 +1,89 @@
+import unittest
+from unittest import mock
+from graph import graph as graphModule
+from graph.graph import Graph
+
+
+def buildGraph(edges, directed=True):
+    graph = Graph(directed=directed)
+    for source, destination, weight in edges:
+        graph[source, destination] = weight
+    return graph
+
+
+class GraphTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.__graph = buildGraph([(0, 1, 1), (1, 3, 1), (0, 2, 1), (2, 3, 2), (1, 2, 1), (3, 4, 1), (2, 4, 5)])
+
+    def test_findsKShortestPathsOrderedByCost(self):
+        paths = self.__graph.get_k_shortest_paths(0, 4, k=5)
+        self.assertEqual(paths, [[0, 1, 3, 4], [0, 2, 3, 4], [0, 1, 2, 3, 4], [0, 2, 4], [0, 1, 2, 4]])
+
+    def test_returnsAllPathsWhenLessThanKExist(self):
+        self.assertEqual(len(self.__graph.get_k_shortest_paths(0, 4, k=50)), 5)
+
+    def test_returnsNoPathsForUnreachableDestination(self):
+        self.assertEqual(self.__graph.get_k_shortest_paths(4, 0, k=3), [])
+
+    def test_cachedPathsAreNotSharedWithCallers(self):
+        self.__graph.get_k_shortest_paths(0, 4, k=1)[0].append(100)
+        self.assertEqual(self.__graph.get_k_shortest_paths(0, 4, k=1), [[0, 1, 3, 4]])
+
+    def test_weightChangeInvalidatesCachedPaths(self):
+        self.assertEqual(self.__graph.get_k_shortest_paths(0, 4, k=1), [[0, 1, 3, 4]])
+        self.__graph[2, 4] = 0.1
+        self.assertEqual(self.__graph.get_k_shortest_paths(0, 4, k=1), [[0, 2, 4]])
+
+    def test_weightWrittenToEdgesInvalidatesCachedPaths(self):
+        self.assertEqual(self.__graph.get_k_shortest_paths(0, 4, k=1), [[0, 1, 3, 4]])
+        version = self.__graph.weightsVersion
+        self.__graph.es[self.__graph.get_eid(2, 4)]['weight'] = 0.1
+        self.assertEqual(self.__graph.get_k_shortest_paths(0, 4, k=1), [[0, 2, 4]])
+        self.assertGreater(self.__graph.weightsVersion, version)
+
+        version = self.__graph.weightsVersion
+        self.__graph.es['weight'] = 1
+        self.assertEqual(self.__graph.get_k_shortest_paths(0, 4, k=1), [[0, 2, 4]])
+        self.assertGreater(self.__graph.weightsVersion, version)
+        self.__graph.es[self.__graph.get_eid(2, 4)]['weight'] = 3
+        self.assertEqual(self.__graph.get_k_shortest_paths(0, 4, k=1), [[0, 1, 3, 4]])
+
+    def test_pathsComputedDuringWeightChangeAreNotCached(self):
+        computePaths = graphModule.k_shortest_paths
+
+        def computeWhileWeightChanges(*args):
+            paths = computePaths(*args)
+            self.__graph[2, 4] = 0.1
+            return paths
+
+        with mock.patch.object(graphModule, 'k_shortest_paths', computeWhileWeightChanges):
+            self.assertEqual(self.__graph.get_k_shortest_paths(0, 4, k=1), [[0, 1, 3, 4]])
+        self.assertEqual(self.__graph.get_k_shortest_paths(0, 4, k=1), [[0, 2, 4]])
+
+    def test_undirectedGraphIsTraversableBothWays(self):
+        graph = buildGraph([(0, 1, 1), (1, 2, 1)], directed=False)
+        self.assertEqual(graph.get_k_shortest_paths(2, 0, k=1), [[2, 1, 0]])
+        self.assertEqual(graph[2, 1], 1)
+
+    def test_edgeIdMatchesEdgeSequence(self):
+        graph = Graph(directed=False)
+        graph.add_vertex(node='a')
+        graph.add_vertex(node='b')
+        graph.es['weight'] = 1.0
+        graph.add_edge(0, 1, executors={})
+        graph[0, 1] = 7
+        edge = graph.es[graph.get_eid(0, 1)]
+        self.assertEqual(edge['weight'], 7)
+        self.assertEqual(edge['executors'], {})
+        self.assertEqual(graph.get_eid(1, 0), graph.get_eid(0, 1))
+        self.assertEqual(graph.vs.indices, [0, 1])
+
+    def test_missingEdgeIdRaises(self):
+        with self.assertRaises(ValueError):
+            self.__graph.get_eid(4, 0)
+        self.assertEqual(self.__graph.get_eid(4, 0, error=False), -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,4 @@
 #!/bin/bash
 
 export PYTHONPATH=`pwd`
-python3 ./tms/tms_cli.py "$@" tms/test_utils/testGraph.json tms/test_utils/mesTasksMapping.json
+python3 ./tms/tms_cli.py "$@" tms/test_utils/testGraph.json tms/test_utils/mesTasksMapping.json $TMS_JOURNAL_DIRECTORY
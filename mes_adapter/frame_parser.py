@@ -20,7 +20,8 @@ class MesFrameParser(RequestParser):
             genericFrameParser = FrameParser(GenericFrameDescription())
             frameData = genericFrameParser.parse(self.__data).data
             frame = FrameParser(Frame5000Description()).parse(frameData)
-            return MesRequest(orderId=frame.productionOrderId.orderType, uniqueId=1)
+            return MesRequest(orderId=frame.productionOrderId.orderType, uniqueId=1, orderPriority=frame.orderPriority,
+                              requiredOutputTime=frame.requiredOutputTime.timestamp())
         except Exception as e:
             print(e)
             return MesRequest(orderId=-1, uniqueId=1)
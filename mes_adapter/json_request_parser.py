@@ -6,6 +6,7 @@ class JsonRequestParser(RequestParser):
     def parse(self, data) -> MesRequest:
         try:
             parsed = json.loads(data)
-            return MesRequest(orderId=parsed['productionOrderId'], uniqueId=parsed['id'])
+            return MesRequest(orderId=parsed['productionOrderId'], uniqueId=parsed['id'], orderPriority=parsed.get('orderPriority', 0),
+                              requiredOutputTime=parsed.get('requiredOutputTime'))
         except Exception:
             return MesRequest(orderId=-1, uniqueId=1)
\ No newline at end of file
@@ -32,7 +32,7 @@ class MesClient:
                     parsed = self.__requestParser.parse(data)
                     productionOrderId = parsed.orderId
                     taskId = parsed.uniqueId
-                    self.__tasksSource.handleRequest(productionOrderId, taskId)
+                    self.__tasksSource.handleRequest(productionOrderId, taskId, parsed.orderPriority, parsed.requiredOutputTime)
                     confirmation = bytes(str(productionOrderId), encoding='ASCII')
                     self.__mesDataSource.sendDataToServer(confirmation)
                 time.sleep(1)
@@ -5,6 +5,8 @@ from dataclasses import dataclass
 class MesRequest:
     orderId: int
     uniqueId: int
+    orderPriority: int = 0
+    requiredOutputTime: float = None
 
 
 class RequestParser:
@@ -12,10 +12,11 @@ class MesTasksSource(TasksSource):
     def setTasksQueue(self, queue: TasksQueue):
         self.__tasksQueue = queue
 
-    def handleRequest(self, requestId, taskId):
+    def handleRequest(self, requestId, taskId, orderPriority=0, requiredOutputTime=None):
         with self.__lock:
             task = self.__requestMapper.getTaskFromId(requestId, taskId)
             if task is not None:
+                task.setOrderRequirements(orderPriority, requiredOutputTime)
                 if self.__tasksQueue is not None:
                     self.__tasksQueue.enqueue(task)
             else:
@@ -1,7 +1,11 @@
+import threading
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from torch_geometric.nn import GCNConv
+from torch_geometric.nn import GCNConv, global_add_pool
+from torch_geometric.data import Data
+from model.gnn_runtime import PathScorerBase, WEIGHTS_NAMES
 
 class GNNModel(nn.Module):
     def __init__(self, num_node_features, num_classes):
@@ -12,6 +16,21 @@ class GNNModel(nn.Module):
         self.fc1 = nn.Linear(16, num_classes)
 
     def forward(self, data):
+        # GCN layers over given graph
+        x = self.nodeEmbeddings(data)
+
+        # Global sum pooling, cost of a path adds up over its nodes, per graph for batched input
+        batch = getattr(data, 'batch', None)
+        if batch is None:
+            x = torch.sum(x, dim=0)
+        else:
+            x = global_add_pool(x, batch, size=data.num_graphs)
+
+        # Fully connected layer to output classes
+        x = self.fc1(x)
+        return x
+
+    def nodeEmbeddings(self, data):
         # Extract features and edge index from data
         x, edge_index = data.x, data.edge_index
 
@@ -21,11 +40,127 @@ class GNNModel(nn.Module):
 
         # Second GCN layer
         x = self.conv2(x, edge_index)
-        x = F.relu(x)
+        return F.relu(x)
 
-        # Global mean pooling (to summarize graph-level information)
-        x = torch.mean(x, dim=0)
+    def scorePaths(self, nodeFeatures, paths):
+        """
+        Scores all paths in a single forward pass, every path is treated as a chain graph of its nodes.
+        :param nodeFeatures: Tensor of node features, one row per node index
+        :param paths: List of paths (lists of node indices)
+        :return: Tensor with one score per path
+        """
+        if len(paths) == 0:
+            return torch.empty(0)
+        return self(pathsBatch(nodeFeatures, paths))[:, 0]
 
-        # Fully connected layer to output classes
-        x = self.fc1(x)
-        return x
\ No newline at end of file
+    def scoreEmbeddedPaths(self, embeddings, paths):
+        """
+        Scores paths as sum of precomputed node embeddings followed by the output layer, no GCN layers are run.
+        :param embeddings: Result of nodeEmbeddings for the whole system graph
+        :return: Tensor with one score per path
+        """
+        if len(paths) == 0:
+            return torch.empty(0)
+        nodes, batch = _pathsNodes(paths)
+        return self.fc1(global_add_pool(embeddings[nodes], batch, size=len(paths)))[:, 0]
+
+
+class PathScorer(PathScorerBase):
+    """
+    Scores paths of the system graph by running the whole model on batch of path chain graphs.
+    """
+    def __init__(self, model: GNNModel, system):
+        self._model = model
+        self._system = system
+
+    def scorePaths(self, paths):
+        """
+        :return: List with one score per path
+        """
+        with torch.no_grad():
+            return self._score(paths).tolist()
+
+    def _score(self, paths):
+        return self._model.scorePaths(self._system.graph_data.x, paths)
+
+
+class CachedEmbeddingsPathScorer(PathScorer):
+    """
+    GCN layers depend only on the graph, so node embeddings are computed once per System.graphDataVersion
+    and every path costs just a pooled lookup of its rows and the output layer, independent of graph size.
+    """
+    def __init__(self, model: GNNModel, system):
+        super().__init__(model, system)
+        self.__embeddings = None
+        self.__version = None
+        self.__lock = threading.Lock()
+
+    def embeddings(self):
+        with self.__lock:
+            if self.__version != self._system.graphDataVersion():
+                self.__version = self._system.graphDataVersion()
+                with torch.no_grad():
+                    self.__embeddings = self._model.nodeEmbeddings(self._system.graph_data)
+            return self.__embeddings
+
+    def _score(self, paths):
+        return self._model.scoreEmbeddedPaths(self.embeddings(), paths)
+
+
+def pathScorer(model: GNNModel, system, cachedEmbeddings=False):
+    if cachedEmbeddings:
+        return CachedEmbeddingsPathScorer(model, system)
+    return PathScorer(model, system)
+
+
+def pathsBatch(nodeFeatures, paths):
+    """
+    Packs paths into one disjoint batch of chain graphs.
+    :return: Data with x, edge_index, batch and num_graphs
+    """
+    nodes, batch = _pathsNodes(paths)
+    # Consecutive nodes of the same path are connected in both directions
+    sources = torch.nonzero(batch[:-1] == batch[1:]).flatten()
+    targets = sources + 1
+    edge_index = torch.stack((torch.cat((sources, targets)), torch.cat((targets, sources))))
+    data = Data(x=nodeFeatures[nodes], edge_index=edge_index, batch=batch)
+    data.num_graphs = len(paths)
+    return data
+
+
+def _pathsNodes(paths):
+    """
+    :return: Concatenated nodes of all paths and index of the path every node belongs to
+    """
+    lengths = torch.tensor([len(path) for path in paths], dtype=torch.long)
+    nodes = torch.tensor([node for path in paths for node in path], dtype=torch.long)
+    return nodes, torch.repeat_interleave(torch.arange(len(paths)), lengths)
+
+
+def graphData(system):
+    """
+    Builds torch_geometric representation of the system topology.
+    :return: Data with node features as x and both directions of undirected edges in edge_index
+    """
+    x, edgeIndex = system.graphArrays()
+    return Data(x=torch.from_numpy(x), edge_index=torch.from_numpy(edgeIndex))
+
+
+def exportWeights(model: GNNModel, path):
+    """
+    Freezes trained model into .npz file evaluated by model.gnn_runtime.NumpyGNN without torch.
+    """
+    weights = [model.conv1.lin.weight, model.conv1.bias, model.conv2.lin.weight, model.conv2.bias, model.fc1.weight, model.fc1.bias]
+    np.savez(path, **{name: weight.detach().cpu().numpy() for name, weight in zip(WEIGHTS_NAMES, weights)})
+
+
+def importWeights(model: GNNModel, path):
+    """
+    Loads weights written by exportWeights back into the model.
+    """
+    with np.load(path) as weights:
+        parameters = [model.conv1.lin.weight, model.conv1.bias, model.conv2.lin.weight, model.conv2.bias, model.fc1.weight, model.fc1.bias]
+        with torch.no_grad():
+            for name, parameter in zip(WEIGHTS_NAMES, parameters):
+                parameter.copy_(torch.from_numpy(weights[name]))
+    return model
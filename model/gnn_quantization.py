@@ -0,0 +1,161 @@
+"""
+Opt-in INT8 inference of GNNModel for CPU-only TMS hosts.
+
+Linear transforms of GCN layers and the output layer are quantized dynamically by torch.ao.quantization: weights are
+stored as int8, activations are quantized with scales taken from every input at run time. Torch has no int8 kernels
+for the sparse GCN aggregation, so messages are aggregated in float32 after the quantized transform.
+Calibration keeps the most quantized set of layers which doesn't change choices of paths recorded on the system graph.
+
+Usage: python -m model.gnn_quantization [gnn_weights.npz], measures latency and memory on a test topology
+"""
+import copy, io, logging, random, sys, time
+from dataclasses import dataclass
+import torch
+import torch.nn as nn
+from model.gnn_model import GNNModel, importWeights
+
+logger = logging.getLogger(__name__)
+
+# Tried in order by calibration, the output layer sums many signed terms into a small score, so it's the first kept in float32
+QUANTIZED_LAYERS_CANDIDATES = (('conv1', 'conv2', 'fc1'), ('conv1', 'conv2'))
+CALIBRATION_PATH_GROUPS = 200
+CANDIDATE_PATHS = 3
+
+
+@dataclass
+class QuantizationReport:
+    layers: tuple
+    maxAbsoluteError: float
+    changedChoices: int
+    groups: int
+
+
+def quantizeModel(model: GNNModel, layers):
+    """
+    :param layers: Names of GCN and Linear layers of the model to quantize
+    :return: Copy of the model with int8 dynamic Linear layers
+    """
+    model = copy.deepcopy(model).eval()
+    names = set()
+    for name in layers:
+        layer = getattr(model, name)
+        if isinstance(layer, nn.Linear):
+            names.add(name)
+        else:
+            # GCNConv transform is torch_geometric Linear, which quantize_dynamic doesn't recognize
+            layer.lin = _torchLinear(layer.lin)
+            names.add(name + '.lin')
+    return torch.ao.quantization.quantize_dynamic(model, names, dtype=torch.qint8)
+
+
+def _torchLinear(linear):
+    res = nn.Linear(linear.in_channels, linear.out_channels, bias=linear.bias is not None)
+    with torch.no_grad():
+        res.weight.copy_(linear.weight)
+        if linear.bias is not None:
+            res.bias.copy_(linear.bias)
+    return res
+
+
+def recordedPathGroups(system, groupsCount, k=CANDIDATE_PATHS, seed=0):
+    """
+    Candidate paths between random pairs of nodes, the same as TrafficController and QueueOptimizer evaluate.
+    """
+    generator = random.Random(seed)
+    nodes = list(range(0, system.nodesCount()))
+    groups = []
+    attempts = 0
+    while len(nodes) > 1 and len(groups) < groupsCount and attempts < 10 * groupsCount:
+        attempts += 1
+        source, destination = generator.sample(nodes, 2)
+        paths = system.graph.get_k_shortest_paths(source, destination, k=k)
+        if len(paths) > 0:
+            groups.append(paths)
+    return groups
+
+
+def accuracyCheck(reference: GNNModel, quantized: GNNModel, nodeFeatures, pathGroups, layers=()) -> QuantizationReport:
+    """
+    Compares scores of quantized model with the float one, a choice is changed when the best or the worst
+    scored path of a group differs, as consumers pick either of them.
+    """
+    maxAbsoluteError = 0.0
+    changedChoices = 0
+    with torch.no_grad():
+        for paths in pathGroups:
+            expected = reference.scorePaths(nodeFeatures, paths)
+            scores = quantized.scorePaths(nodeFeatures, paths)
+            maxAbsoluteError = max(maxAbsoluteError, float((expected - scores).abs().max()))
+            if int(expected.argmax()) != int(scores.argmax()) or int(expected.argmin()) != int(scores.argmin()):
+                changedChoices += 1
+    return QuantizationReport(tuple(layers), maxAbsoluteError, changedChoices, len(pathGroups))
+
+
+def calibratedQuantizedModel(model: GNNModel, system, groupsCount=CALIBRATION_PATH_GROUPS):
+    """
+    Quantizes the first set of QUANTIZED_LAYERS_CANDIDATES which keeps all choices of paths recorded on the system graph.
+    :return: Quantized model, None when every set changes some choice
+    """
+    model.eval()
+    pathGroups = recordedPathGroups(system, groupsCount)
+    nodeFeatures = system.graph_data.x
+    for layers in QUANTIZED_LAYERS_CANDIDATES:
+        quantized = quantizeModel(model, layers)
+        report = accuracyCheck(model, quantized, nodeFeatures, pathGroups, layers)
+        if report.changedChoices == 0:
+            logger.info("Quantized GNN layers %s keep all %d recorded choices, max score error %.4f",
+                        ', '.join(layers), report.groups, report.maxAbsoluteError)
+            return quantized
+        logger.info("Quantized GNN layers %s change %d of %d recorded choices", ', '.join(layers), report.changedChoices, report.groups)
+    logger.warning("Quantized GNN changes choices of paths, float GNN is used")
+    return None
+
+
+def modelBytes(model):
+    """
+    Size of serialized state of the model, int8 weights are packed by quantized layers.
+    """
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes
+
+
+def scoringSeconds(model, nodeFeatures, batches, repeats=20):
+    """
+    :param batches: Lists of paths scored in one call each
+    :return: Median time of scoring all batches
+    """
+    times = []
+    with torch.no_grad():
+        for _ in range(0, repeats):
+            begin = time.perf_counter()
+            for paths in batches:
+                model.scorePaths(nodeFeatures, paths)
+            times.append(time.perf_counter() - begin)
+    return sorted(times)[len(times) // 2]
+
+
+if __name__ == '__main__':
+    from simulation.core.system_builder import SystemBuilder
+    from simulation.experiments_utils.test_graphs_builders import ShortServiceTimeFullGraphWithBranchesBuilder
+    from model.gnn_runtime import congestionFeatures
+    logging.basicConfig(level=logging.INFO)
+    random.seed(0)  # service times of the test topology
+    systemBuilder = SystemBuilder()
+    ShortServiceTimeFullGraphWithBranchesBuilder(4).build(systemBuilder)
+    system = systemBuilder.system()
+    for i in range(0, system.nodesCount()):
+        system.setNodeFeatures(i, congestionFeatures(system, i, 0))
+    floatModel = GNNModel(num_node_features=system.graph_data.num_features, num_classes=1)
+    if len(sys.argv) > 1:
+        importWeights(floatModel, sys.argv[1])
+    floatModel.eval()
+    quantizedModel = calibratedQuantizedModel(floatModel, system)
+    groups = recordedPathGroups(system, CALIBRATION_PATH_GROUPS, seed=1)
+    # Single candidates group per call as in TrafficController, all groups in one call as micro-batches of InferenceService
+    batchings = [('group', groups), ('batch', [[path for paths in groups for path in paths]])]
+    for name, measured in [('float32', floatModel), ('int8', quantizedModel)]:
+        if measured is None:
+            continue
+        seconds = ["{} {:8.3f} ms".format(batching, scoringSeconds(measured, system.graph_data.x, batches) * 1e3) for batching, batches in batchings]
+        print("{:<8} {} {:8d} bytes".format(name, ' '.join(seconds), modelBytes(measured)))
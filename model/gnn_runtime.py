@@ -0,0 +1,251 @@
+"""
+Inference of exported GNNModel weights with NumPy only, so path scoring doesn't import torch and torch_geometric.
+"""
+import threading
+import numpy as np
+
+WEIGHTS_NAMES = ('conv1.weight', 'conv1.bias', 'conv2.weight', 'conv2.bias', 'fc1.weight', 'fc1.bias')
+
+
+def gcnNormalization(verticesCount, edgeIndex):
+    """
+    Symmetric GCN normalization with self loops, the same as GCNConv defaults.
+    :param edgeIndex: 2 x E array of source and target nodes
+    :return: Sources, targets and coefficients of all messages including self loops sorted by target,
+             and offsets where messages of every target start
+    """
+    loops = np.arange(0, verticesCount, dtype=np.int64)
+    sources = np.concatenate((np.asarray(edgeIndex[0], dtype=np.int64), loops))
+    targets = np.concatenate((np.asarray(edgeIndex[1], dtype=np.int64), loops))
+    order = np.argsort(targets, kind='stable')
+    sources, targets = sources[order], targets[order]
+    degrees = np.bincount(targets, minlength=verticesCount)
+    inverseRoots = 1.0 / np.sqrt(degrees.astype(np.float32))
+    # Thanks to self loops every node has at least one message, so offsets are strictly increasing
+    starts = np.concatenate(([0], np.cumsum(degrees)[:-1]))
+    return sources, targets, inverseRoots[sources] * inverseRoots[targets], starts
+
+
+def gcnLayer(x, normalization, weight, bias):
+    """
+    Single GCN layer: x' = D^-1/2 (A + I) D^-1/2 x W^T + b, aggregated sparsely per edge.
+    """
+    sources, _, coefficients, starts = normalization
+    transformed = x @ weight.T
+    return np.add.reduceat(transformed[sources] * coefficients[:, None], starts, axis=0) + bias
+
+
+def pathsNodes(paths):
+    """
+    :return: Concatenated nodes of all paths and lengths of paths
+    """
+    lengths = np.fromiter((len(path) for path in paths), dtype=np.int64, count=len(paths))
+    nodes = np.fromiter((node for path in paths for node in path), dtype=np.int64, count=int(lengths.sum()))
+    return nodes, lengths
+
+
+def segmentSum(rows, lengths):
+    """
+    Sums of consecutive segments of rows, the same as global_add_pool with sorted batch vector.
+    """
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.add.reduceat(rows, starts, axis=0)
+
+
+class NumpyGNN:
+    """
+    NumPy twin of GNNModel evaluating weights written by model.gnn_model.exportWeights.
+    """
+    def __init__(self, weights):
+        self.__weights = {name: np.asarray(weights[name], dtype=np.float32) for name in WEIGHTS_NAMES}
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as weights:
+            return cls(weights)
+
+    def numNodeFeatures(self):
+        return self.__weights['conv1.weight'].shape[1]
+
+    def nodeEmbeddings(self, x, edgeIndex):
+        normalization = gcnNormalization(x.shape[0], edgeIndex)
+        x = np.maximum(gcnLayer(x, normalization, self.__weights['conv1.weight'], self.__weights['conv1.bias']), 0)
+        return np.maximum(gcnLayer(x, normalization, self.__weights['conv2.weight'], self.__weights['conv2.bias']), 0)
+
+    def output(self, pooled):
+        return pooled @ self.__weights['fc1.weight'].T + self.__weights['fc1.bias']
+
+    def scorePaths(self, nodeFeatures, paths):
+        """
+        Scores paths as disjoint chain graphs, the same as GNNModel.scorePaths.
+        :return: Array with one score per path
+        """
+        if len(paths) == 0:
+            return np.empty(0, dtype=np.float32)
+        nodes, lengths = pathsNodes(paths)
+        # Consecutive nodes of the same path are connected in both directions
+        links = np.ones(len(nodes) - 1, dtype=bool)
+        links[np.cumsum(lengths)[:-1] - 1] = False
+        sources = np.flatnonzero(links)
+        targets = sources + 1
+        edgeIndex = np.stack((np.concatenate((sources, targets)), np.concatenate((targets, sources))))
+        embeddings = self.nodeEmbeddings(nodeFeatures[nodes], edgeIndex)
+        return self.output(segmentSum(embeddings, lengths))[:, 0]
+
+    def scoreEmbeddedPaths(self, embeddings, paths):
+        if len(paths) == 0:
+            return np.empty(0, dtype=np.float32)
+        nodes, lengths = pathsNodes(paths)
+        return self.output(segmentSum(embeddings[nodes], lengths))[:, 0]
+
+
+class PathScorerBase:
+    def scorePaths(self, paths):
+        """
+        :return: List with one score per path
+        """
+        raise NotImplementedError()
+
+    def scorePathGroups(self, pathGroups):
+        """
+        Scores candidate paths of many tasks at once, with single forward pass and single device sync.
+        :param pathGroups: List of candidate paths lists, e.g. k shortest paths for every task
+        :return: List of scores lists matching pathGroups
+        """
+        scores = self.scorePaths([path for group in pathGroups for path in group])
+        res = []
+        i = 0
+        for group in pathGroups:
+            res.append(scores[i:i + len(group)])
+            i += len(group)
+        return res
+
+
+class NumpyPathScorer(PathScorerBase):
+    def __init__(self, runtime: NumpyGNN, system):
+        self._runtime = runtime
+        self._system = system
+
+    def scorePaths(self, paths):
+        return self._runtime.scorePaths(self._system.graphArrays()[0], paths).tolist()
+
+
+class NumpyCachedEmbeddingsPathScorer(NumpyPathScorer):
+    def __init__(self, runtime: NumpyGNN, system):
+        super().__init__(runtime, system)
+        self.__embeddings = None
+        self.__version = None
+        self.__lock = threading.Lock()
+
+    def embeddings(self):
+        with self.__lock:
+            if self.__version != self._system.graphDataVersion():
+                self.__version = self._system.graphDataVersion()
+                self.__embeddings = self._runtime.nodeEmbeddings(*self._system.graphArrays())
+            return self.__embeddings
+
+    def scorePaths(self, paths):
+        return self._runtime.scoreEmbeddedPaths(self.embeddings(), paths).tolist()
+
+
+class LazyPathScorer(PathScorerBase):
+    """
+    Creates path scorer on first use, so loading the GNN stack doesn't delay start of the process.
+    """
+    def __init__(self, factory):
+        self.__factory = factory
+        self.__pathScorer = None
+        self.__lock = threading.Lock()
+
+    def pathScorer(self):
+        with self.__lock:
+            if self.__pathScorer is None:
+                self.__pathScorer = self.__factory()
+            return self.__pathScorer
+
+    def scorePaths(self, paths):
+        return self.pathScorer().scorePaths(paths)
+
+    def scorePathGroups(self, pathGroups):
+        return self.pathScorer().scorePathGroups(pathGroups)
+
+
+def congestionFeatures(system, index, occupancy=None):
+    """
+    Features GNN weights are trained on by model.gnn_training.
+    :param occupancy: Executors at the node, agents served or queued by the simulated node are counted when not given
+    :return: Service time, degree and occupancy of the node
+    """
+    node = system.node(index)
+    if occupancy is None:
+        executor = getattr(node, 'executor', None)
+        occupancy = executor.count + len(executor.queue) if executor is not None else 0
+    return [float(getattr(node, 'serviceTime', 0)), float(len(system.graph.neighbors(index))), float(occupancy)]
+
+
+class OccupancyFeatures:
+    """
+    Keeps congestion features of nodes up to date with locations of job executors, observes JobExecutorsManager.
+    """
+    def __init__(self, system):
+        self.__system = system
+        self.__occupancy = dict()
+        self.__lock = threading.Lock()
+        for i in range(0, system.nodesCount()):
+            system.setNodeFeatures(i, congestionFeatures(system, i, 0))
+
+    def onOccupancyChanged(self, occupancy):
+        """
+        :param occupancy: Dictionary of node index to number of executors at the node
+        """
+        with self.__lock:
+            for index in set(occupancy) | set(self.__occupancy):
+                count = occupancy.get(index, 0)
+                if count != self.__occupancy.get(index, 0):
+                    self.__system.setNodeFeatures(index, congestionFeatures(self.__system, index, count))
+            self.__occupancy = dict(occupancy)
+
+
+def congestionFeaturesMatrix(system):
+    return np.array([congestionFeatures(system, i) for i in range(0, system.nodesCount())], dtype=np.float32)
+
+
+def graphArrays(system):
+    """
+    :return: Node features matrix and 2 x E edge index with both directions of undirected edges
+    """
+    x = np.array([system.nodeFeatures(i) for i in range(0, system.nodesCount())], dtype=np.float32)
+    sources, targets = [], []
+    for edge in system.graph.es:
+        sources.append(edge.source)
+        targets.append(edge.target)
+    if not system.graph.is_directed():
+        sources, targets = sources + targets, targets + sources
+    return x, np.array([sources, targets], dtype=np.int64).reshape(2, -1)
+
+
+def createPathScorer(system, cachedEmbeddings=False, weightsPath=None, quantized=False):
+    """
+    Creates path scorer for TrafficController and QueueOptimizer.
+    :param weightsPath: Weights exported by model.gnn_model.exportWeights, evaluated with NumPy without importing torch.
+                        Untrained torch GNNModel is used when not given.
+    :param quantized: Weights are evaluated by torch GNNModel with int8 layers of model.gnn_quantization,
+                      float model is kept when quantization changes choices of paths
+    """
+    if weightsPath is not None and not quantized:
+        runtime = NumpyGNN.load(weightsPath)
+        if cachedEmbeddings:
+            return NumpyCachedEmbeddingsPathScorer(runtime, system)
+        return NumpyPathScorer(runtime, system)
+
+    from model.gnn_model import GNNModel, pathScorer, importWeights  # training stack is imported only when needed
+    model = GNNModel(num_node_features=system.graph_data.num_features, num_classes=1)
+    if weightsPath is not None:
+        importWeights(model, weightsPath)
+    model.eval()
+    if quantized:
+        from model.gnn_quantization import calibratedQuantizedModel
+        quantizedModel = calibratedQuantizedModel(model, system)
+        if quantizedModel is not None:
+            model = quantizedModel
+    return pathScorer(model, system, cachedEmbeddings)
@@ -0,0 +1,305 @@
+"""
+Offline training of GNNModel on path costs realized in SimPy simulation of test topologies.
+
+Every simulation run starts single task agents on one topology, each agent takes one of k shortest candidate
+paths and reports its realized cost, collisions and queue time. Nodes of the path are described by their service time,
+degree and occupancy when the path is chosen. Runs are spread over a process pool.
+Trained model predicts job cost of a path including congestion, so consumers prefer paths with the lowest score.
+It has to beat always taking the shortest candidate, compareJobCost reports both.
+
+Usage: python -m model.gnn_training <outputDirectory> [runsPerTopology] [epochs]
+"""
+import os, random, sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from model.gnn_runtime import congestionFeatures, congestionFeaturesMatrix
+from simulation.core.system_builder import SystemBuilder
+from simulation.core.task import Task
+from simulation.core.traverser_base import TraverserBase
+from simulation.simpy_adapter.agent import Agent
+from simulation.simpy_adapter.environment_wrapper import EnvironmentWrapper
+from simulation.experiments_utils.test_graphs_builders import ShortServiceTimeFullGraphBuilder, LongServiceTimeFullGraphBuilder, \
+    ShortServiceTimeFullGraphWithBranchesBuilder, TreeGraphBuilder
+
+CANDIDATE_PATHS = 3
+TASKS_PER_RUN = 40
+ARRIVAL_INTERVAL = 20
+SIMULATION_TIMEOUT = 1000000
+VALIDATION_RUNS_MODULO = 5
+# Fewer runs leave trained choices dependent on the seed, some seeds don't beat the shortest candidate
+DEFAULT_RUNS_PER_TOPOLOGY = 50
+WEIGHTS_FILE = 'gnn_weights.npz'
+# Weight of standardized collisions and queue time in labels, relative to standardized job cost
+CONGESTION_WEIGHT = 0.5
+
+TRAINING_TOPOLOGIES = {
+    'shortServiceTimeFullGraph': lambda: ShortServiceTimeFullGraphBuilder(8),
+    'longServiceTimeFullGraph': lambda: LongServiceTimeFullGraphBuilder(8),
+    'fullGraphWithBranches': lambda: ShortServiceTimeFullGraphWithBranchesBuilder(4),
+    'treeGraph': lambda: TreeGraphBuilder(3, 4)
+}
+
+
+@dataclass
+class PathExample:
+    topology: str
+    run: int
+    features: list
+    path: list
+    cost: float
+    collisions: int
+    timeInQueue: float
+
+
+@dataclass
+class EpochMetrics:
+    epoch: int
+    trainLoss: float
+    validationLoss: float
+    pairwiseAccuracy: float
+
+
+@dataclass
+class JobCostComparison:
+    randomJobCost: float
+    shortestJobCost: float
+    trainedJobCost: float
+
+
+class RecordingTraverser(TraverserBase):
+    """
+    Traverser of a single task agent, lets chooser pick one of candidate paths and records its realized cost
+    together with features of the path nodes at the moment of choice.
+    """
+    def __init__(self, system, task, chooser, outcomes):
+        super().__init__(system)
+        self.assignSequence([task])
+        self.__chooser = chooser
+        self.__outcomes = outcomes
+        self.__path = None
+        self.__features = None
+
+    def pathBetweenNodes(self, source, destination):
+        self.__path = self.__chooser(self.system.graph.get_k_shortest_paths(source.index, destination.index, k=CANDIDATE_PATHS))
+        self.__features = [congestionFeatures(self.system, node) for node in self.__path]
+        return self.__path
+
+    def feedback(self, cost, collisions, timeInQueue, timeInPenalty, timeInTransition):
+        self.__outcomes.append((self.__path, cost, collisions, timeInQueue, self.__features))
+
+
+def simulateRun(topology, run, chooserFactory=None):
+    """
+    Simulates TASKS_PER_RUN single task agents arriving to given topology. Tasks, arrivals and random choices are drawn
+    from a generator seeded by topology and run. Topology builders and SimPy timeouts use the global random module,
+    it's seeded from the generator for the run and restored afterwards.
+    :param chooserFactory: Callable system -> chooser of a path from candidates, random choice when not given
+    :return: System and list of (path, cost, collisions, timeInQueue, features) tuples
+    """
+    generator = random.Random('{}-{}'.format(topology, run))
+    callerState = random.getstate()
+    random.seed(generator.getrandbits(64))
+    try:
+        simulation = EnvironmentWrapper(timeout=SIMULATION_TIMEOUT)
+        systemBuilder = SystemBuilder()
+        TRAINING_TOPOLOGIES[topology]().setEnvironment(simulation.env).build(systemBuilder)
+        system = systemBuilder.system()
+        chooser = chooserFactory(system) if chooserFactory is not None else generator.choice
+
+        outcomes = []
+        nodes = list(range(0, system.nodesCount()))
+        for taskNumber in range(0, TASKS_PER_RUN):
+            source, destination = generator.sample(nodes, 2)
+            agent = Agent(env=simulation.env, number=taskNumber, traverser=RecordingTraverser(system, Task(taskNumber, source, destination), chooser, outcomes))
+            simulation.env.process(_startAgent(simulation.env, agent, generator.uniform(0, TASKS_PER_RUN * ARRIVAL_INTERVAL)))
+        simulation.run()
+        return system, outcomes
+    finally:
+        random.setstate(callerState)
+
+
+def _startAgent(env, agent, delay):
+    yield env.timeout(delay)
+    agent.start()
+
+
+def generateExamples(job):
+    """
+    :param job: Tuple of topology name and run number
+    :return: List of PathExample
+    """
+    topology, run = job
+    _, outcomes = simulateRun(topology, run)
+    return [PathExample(topology, run, features, path, cost, collisions, timeInQueue)
+            for path, cost, collisions, timeInQueue, features in outcomes]
+
+
+def generateDataset(runsPerTopology, workers=None):
+    jobs = [(topology, run) for topology in TRAINING_TOPOLOGIES for run in range(0, runsPerTopology)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [example for examples in pool.map(generateExamples, jobs) for example in examples]
+
+
+def runLabels(examples):
+    """
+    Job cost plus CONGESTION_WEIGHT times collisions and queue time, each standardized within every simulation run,
+    so topologies with different time scales weigh the same.
+    :return: List of labels matching examples
+    """
+    costs = _standardizedPerRun(examples, lambda example: example.cost)
+    collisions = _standardizedPerRun(examples, lambda example: example.collisions)
+    timesInQueue = _standardizedPerRun(examples, lambda example: example.timeInQueue)
+    return [cost + CONGESTION_WEIGHT * (collision + timeInQueue) for cost, collision, timeInQueue in zip(costs, collisions, timesInQueue)]
+
+
+def _standardizedPerRun(examples, value):
+    runs = dict()
+    for example in examples:
+        runs.setdefault((example.topology, example.run), []).append(value(example))
+    statistics = dict()
+    for key, values in runs.items():
+        mean = sum(values) / len(values)
+        deviation = (sum((v - mean) ** 2 for v in values) / len(values)) ** 0.5
+        statistics[key] = (mean, deviation if deviation > 0 else 1.0)
+    return [(value(example) - statistics[(example.topology, example.run)][0]) / statistics[(example.topology, example.run)][1] for example in examples]
+
+
+def pairwiseAccuracy(examples, scores):
+    """
+    Fraction of pairs of paths from the same run whose predicted cost order matches realized one.
+    """
+    runs = dict()
+    for example, score in zip(examples, scores):
+        runs.setdefault((example.topology, example.run), []).append((example.cost, score))
+    agreeing, pairs = 0, 0
+    for items in runs.values():
+        for i in range(0, len(items)):
+            for j in range(i + 1, len(items)):
+                if items[i][0] != items[j][0]:
+                    pairs += 1
+                    agreeing += (items[i][0] < items[j][0]) == (items[i][1] < items[j][1])
+    return agreeing / pairs if pairs > 0 else 0.0
+
+
+def examplesBatch(examples):
+    import torch
+    from model.gnn_model import pathsBatch
+    features = torch.tensor([row for example in examples for row in example.features], dtype=torch.float)
+    paths = []
+    offset = 0
+    for example in examples:
+        paths.append(list(range(offset, offset + len(example.path))))
+        offset += len(example.path)
+    return pathsBatch(features, paths)
+
+
+def train(examples, outputDirectory, epochs=30, batchSize=64, learningRate=0.01, seed=0):
+    """
+    Trains GNNModel to predict standardized job cost of a path. Checkpoint is saved after every epoch,
+    weights of the epoch with the lowest validation loss are exported for model.gnn_runtime.
+    :return: List of EpochMetrics
+    """
+    import torch
+    from model.gnn_model import GNNModel, exportWeights
+    torch.manual_seed(seed)
+    os.makedirs(outputDirectory, exist_ok=True)
+    labels = runLabels(examples)
+    training = [(example, label) for example, label in zip(examples, labels) if example.run % VALIDATION_RUNS_MODULO != 0]
+    validation = [(example, label) for example, label in zip(examples, labels) if example.run % VALIDATION_RUNS_MODULO == 0]
+
+    model = GNNModel(num_node_features=len(examples[0].features[0]), num_classes=1)
+    optimizer = torch.optim.Adam(model.parameters(), lr=learningRate)
+    generator = random.Random(seed)
+    history = []
+    bestLoss = None
+    for epoch in range(0, epochs):
+        model.train()
+        generator.shuffle(training)
+        trainLoss = 0.0
+        for i in range(0, len(training), batchSize):
+            batch = training[i:i + batchSize]
+            optimizer.zero_grad()
+            loss = torch.nn.functional.mse_loss(model(examplesBatch([example for example, _ in batch]))[:, 0],
+                                                torch.tensor([label for _, label in batch], dtype=torch.float))
+            loss.backward()
+            optimizer.step()
+            trainLoss += loss.item() * len(batch)
+
+        metrics = EpochMetrics(epoch, trainLoss / len(training), *_validate(model, validation))
+        history.append(metrics)
+        print(metrics, flush=True)
+        torch.save({'epoch': epoch, 'model': model.state_dict(), 'optimizer': optimizer.state_dict(), 'metrics': metrics.__dict__},
+                   os.path.join(outputDirectory, 'checkpoint-{}.pt'.format(epoch)))
+        if bestLoss is None or metrics.validationLoss < bestLoss:
+            bestLoss = metrics.validationLoss
+            exportWeights(model, os.path.join(outputDirectory, WEIGHTS_FILE))
+    return history
+
+
+def _validate(model, validation):
+    import torch
+    if len(validation) == 0:
+        return 0.0, 0.0
+    model.eval()
+    with torch.no_grad():
+        scores = model(examplesBatch([example for example, _ in validation]))[:, 0]
+    loss = torch.nn.functional.mse_loss(scores, torch.tensor([label for _, label in validation], dtype=torch.float)).item()
+    return loss, pairwiseAccuracy([example for example, _ in validation], scores.tolist())
+
+
+class TrainedChooserFactory:
+    """
+    Picks candidate path with the lowest predicted cost using exported weights, picklable for process pool.
+    """
+    def __init__(self, weightsPath):
+        self.__weightsPath = weightsPath
+
+    def __call__(self, system):
+        from model.gnn_runtime import NumpyGNN
+        runtime = NumpyGNN.load(self.__weightsPath)
+
+        def choose(paths):
+            # Occupancy changes during the run, features are taken at the moment of choice as in training
+            scores = runtime.scorePaths(congestionFeaturesMatrix(system), paths)
+            return paths[int(scores.argmin())]
+        return choose
+
+
+def shortestChooserFactory(system):
+    """
+    Always picks the shortest candidate, the baseline trained weights have to beat.
+    """
+    return _firstCandidate
+
+
+def _firstCandidate(paths):
+    return paths[0]
+
+
+def averageJobCost(job):
+    topology, run, chooserFactory = job
+    _, outcomes = simulateRun(topology, run, chooserFactory)
+    return sum(outcome[1] for outcome in outcomes) / len(outcomes)
+
+
+def compareJobCost(weightsPath, runsPerTopology, workers=None):
+    """
+    Mean job cost on validation runs with random path choice, with the shortest candidate and with paths chosen by trained weights.
+    """
+    runs = [(topology, run) for topology in TRAINING_TOPOLOGIES for run in range(0, runsPerTopology) if run % VALIDATION_RUNS_MODULO == 0]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        randomCosts = list(pool.map(averageJobCost, [(topology, run, None) for topology, run in runs]))
+        shortestCosts = list(pool.map(averageJobCost, [(topology, run, shortestChooserFactory) for topology, run in runs]))
+        trainedCosts = list(pool.map(averageJobCost, [(topology, run, TrainedChooserFactory(weightsPath)) for topology, run in runs]))
+    return JobCostComparison(sum(randomCosts) / len(randomCosts), sum(shortestCosts) / len(shortestCosts),
+                             sum(trainedCosts) / len(trainedCosts))
+
+
+if __name__ == '__main__':
+    outputDirectory = sys.argv[1]
+    runsPerTopology = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RUNS_PER_TOPOLOGY
+    epochs = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+    dataset = generateDataset(runsPerTopology)
+    print("Generated {} examples".format(len(dataset)), flush=True)
+    train(dataset, outputDirectory, epochs=epochs)
+    print(compareJobCost(os.path.join(outputDirectory, WEIGHTS_FILE), runsPerTopology), flush=True)
@@ -0,0 +1,125 @@
+import threading, time
+from collections import deque
+from concurrent.futures import Future
+from model.gnn_runtime import PathScorerBase
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT = 0.002
+IDLE_WAIT_FRACTION = 0.1
+
+
+class InferenceService:
+    """
+    Owns the only path scorer of the process. Requests from any thread are coalesced into micro-batches scored
+    in a single forward pass. A batch is closed when it has maxBatchSize paths, its first request waited maxWait
+    seconds or no new request came for a fraction of maxWait, so a few blocked consumers don't wait for nothing.
+    Requests are scored synchronously in the calling thread while the service isn't started.
+    """
+    def __init__(self, pathScorer, maxBatchSize=DEFAULT_MAX_BATCH_SIZE, maxWait=DEFAULT_MAX_WAIT):
+        self.__pathScorer = pathScorer
+        self.__maxBatchSize = maxBatchSize
+        self.__maxWait = maxWait
+        self.__requests = deque()
+        self.__pathsCount = 0
+        self.__condition = threading.Condition()
+        self.__working = False
+        self.__thread = None
+        self.__batches = 0
+        self.__requestsCount = 0
+
+    def start(self):
+        with self.__condition:
+            self.__working = True
+        self.__thread = threading.Thread(target=self.__serve)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def shutdown(self):
+        if self.__thread is None:
+            return
+        with self.__condition:
+            self.__working = False
+            self.__condition.notify_all()
+        self.__thread.join()
+        self.__thread = None
+
+    def submit(self, paths):
+        """
+        :param paths: List of paths to score
+        :return: Future of list with one score per path
+        """
+        future = Future()
+        with self.__condition:
+            if self.__working:
+                self.__requests.append((paths, future, time.monotonic()))
+                self.__pathsCount += len(paths)
+                self.__condition.notify_all()
+                return future
+        self.__score([(paths, future, None)])
+        return future
+
+    def averageBatchSize(self):
+        """
+        :return: Average number of requests served by single forward pass
+        """
+        with self.__condition:
+            return self.__requestsCount / self.__batches if self.__batches > 0 else 0.0
+
+    def __serve(self):
+        while True:
+            with self.__condition:
+                while self.__working and len(self.__requests) == 0:
+                    self.__condition.wait()
+                if len(self.__requests) == 0:
+                    return
+                # Batch is open since the first request arrived, wait for more until it's full, too old or idle
+                deadline = self.__requests[0][2] + self.__maxWait
+                while self.__working and self.__pathsCount < self.__maxBatchSize:
+                    remainingTime = min(deadline - time.monotonic(), self.__maxWait * IDLE_WAIT_FRACTION)
+                    if remainingTime <= 0:
+                        break
+                    requestsCount = len(self.__requests)
+                    self.__condition.wait(remainingTime)
+                    if len(self.__requests) == requestsCount:
+                        break
+                batch = self.__takeBatch()
+            self.__score(batch)
+
+    def __takeBatch(self):
+        batch = []
+        pathsCount = 0
+        while len(self.__requests) > 0 and (len(batch) == 0 or pathsCount + len(self.__requests[0][0]) <= self.__maxBatchSize):
+            request = self.__requests.popleft()
+            batch.append(request)
+            pathsCount += len(request[0])
+        self.__pathsCount -= pathsCount
+        return batch
+
+    def __score(self, batch):
+        try:
+            scores = self.__pathScorer.scorePathGroups([request[0] for request in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        with self.__condition:
+            self.__batches += 1
+            self.__requestsCount += len(batch)
+        for (_, future, _), pathsScores in zip(batch, scores):
+            future.set_result(pathsScores)
+
+
+class BatchingPathScorer(PathScorerBase):
+    """
+    Path scorer of a single consumer, forwarding its requests to the shared InferenceService.
+    """
+    def __init__(self, service: InferenceService):
+        self.__service = service
+
+    def scorePaths(self, paths):
+        return self.__service.submit(paths).result()
+
+    def scorePathGroups(self, pathGroups):
+        # Submitting groups separately lets the service batch them together with other consumers requests
+        futures = [self.__service.submit(paths) for paths in pathGroups]
+        return [future.result() for future in futures]
@@ -0,0 +1,78 @@
+import os, tempfile, unittest
+from unittest import mock
+from simulation.core.system_builder import SystemBuilder, Vertex, Edge
+from model.gnn_runtime import createPathScorer
+
+try:
+    import torch
+    from model.gnn_model import GNNModel, exportWeights
+    from model import gnn_quantization
+    from model.gnn_quantization import quantizeModel, calibratedQuantizedModel, QuantizationReport
+except ModuleNotFoundError:
+    torch = None
+
+
+def gridSystem(size=4):
+    builder = SystemBuilder()
+    for i in range(0, size * size):
+        builder.addVertex(Vertex(name='unused', node=i))
+    for row in range(0, size):
+        for column in range(0, size):
+            index = row * size + column
+            if column + 1 < size:
+                builder.addEdge(Edge(name='unused', source=index, target=index + 1, weight=1 + index % 3))
+            if row + 1 < size:
+                builder.addEdge(Edge(name='unused', source=index, target=index + size, weight=1 + index % 2))
+    system = builder.system()
+    for i in range(0, system.nodesCount()):
+        system.setNodeFeatures(i, [float(i % 5), float(i % 3)])
+    return system
+
+
+@unittest.skipIf(torch is None, "torch is not installed")
+class GnnQuantizationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(0)
+        self.__system = gridSystem()
+        self.__model = GNNModel(num_node_features=2, num_classes=1).eval()
+
+    def test_quantizedLayersUseInt8Weights(self):
+        quantized = quantizeModel(self.__model, ('conv1', 'conv2', 'fc1'))
+        dynamicLinear = torch.ao.nn.quantized.dynamic.Linear
+        for layer in [quantized.conv1.lin, quantized.conv2.lin, quantized.fc1]:
+            self.assertIsInstance(layer, dynamicLinear)
+        # Original model is kept in float32
+        self.assertNotIsInstance(self.__model.fc1, dynamicLinear)
+
+        paths = [[0, 1, 2], [4, 5, 6, 7], [15, 11]]
+        with torch.no_grad():
+            expected = self.__model.scorePaths(self.__system.graph_data.x, paths)
+            scores = quantized.scorePaths(self.__system.graph_data.x, paths)
+        torch.testing.assert_close(scores, expected, atol=0.05, rtol=0.05)
+
+    def test_calibratedModelKeepsRecordedChoices(self):
+        quantized = calibratedQuantizedModel(self.__model, self.__system, groupsCount=20)
+        self.assertIsNotNone(quantized)
+        report = gnn_quantization.accuracyCheck(self.__model, quantized, self.__system.graph_data.x,
+                                                gnn_quantization.recordedPathGroups(self.__system, 20))
+        self.assertEqual(0, report.changedChoices)
+
+    def test_floatModelIsKeptWhenChoicesChange(self):
+        changed = QuantizationReport((), 1.0, 1, 20)
+        with mock.patch.object(gnn_quantization, 'accuracyCheck', return_value=changed):
+            with self.assertLogs('model.gnn_quantization', level='WARNING'):
+                self.assertIsNone(calibratedQuantizedModel(self.__model, self.__system, groupsCount=20))
+
+    def test_quantizedScorerOfExportedWeightsMatchesFloatScorer(self):
+        paths = [[0, 1, 2], [4, 5, 6, 7], [15, 11]]
+        with tempfile.TemporaryDirectory() as directory:
+            weightsPath = os.path.join(directory, 'weights.npz')
+            exportWeights(self.__model, weightsPath)
+            expected = createPathScorer(self.__system, weightsPath=weightsPath).scorePaths(paths)
+            scores = createPathScorer(self.__system, weightsPath=weightsPath, quantized=True).scorePaths(paths)
+        for score, expectedScore in zip(scores, expected):
+            self.assertAlmostEqual(expectedScore, score, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
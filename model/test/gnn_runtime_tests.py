@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from model.gnn_runtime import NumpyGNN, NumpyCachedEmbeddingsPathScorer, OccupancyFeatures, gcnNormalization, gcnLayer
+from simulation.core.system_builder import SystemBuilder, Vertex, Edge
+
+try:
+    import torch
+    from model.gnn_model import GNNModel
+except ModuleNotFoundError:
+    torch = None
+
+
+def randomWeights(features=1, hidden=16, seed=0):
+    random = np.random.default_rng(seed)
+    return {
+        'conv1.weight': random.normal(size=(hidden, features)), 'conv1.bias': random.normal(size=hidden),
+        'conv2.weight': random.normal(size=(hidden, hidden)), 'conv2.bias': random.normal(size=hidden),
+        'fc1.weight': random.normal(size=(1, hidden)), 'fc1.bias': random.normal(size=1)
+    }
+
+
+class GnnRuntimeTests(unittest.TestCase):
+    def test_gcnLayerMatchesDenseFormula(self):
+        x = np.array([[1.0], [2.0], [3.0]], dtype=np.float32)
+        edgeIndex = np.array([[0, 1, 1, 2], [1, 0, 2, 1]])
+        weight = np.array([[2.0]], dtype=np.float32)
+        bias = np.array([0.5], dtype=np.float32)
+
+        adjacency = np.eye(3) + np.array([[0, 1, 0], [1, 0, 1], [0, 1, 0]])
+        inverseRoots = np.diag(1 / np.sqrt(adjacency.sum(axis=1)))
+        expected = inverseRoots @ adjacency @ inverseRoots @ x @ weight.T + bias
+
+        res = gcnLayer(x, gcnNormalization(3, edgeIndex), weight, bias)
+        np.testing.assert_allclose(res, expected, rtol=1e-5)
+
+    def test_batchedPathsScoresMatchSinglePathScores(self):
+        runtime = NumpyGNN(randomWeights())
+        features = np.arange(0, 6, dtype=np.float32).reshape(6, 1)
+        paths = [[0, 1, 2], [3], [5, 4, 3, 2]]
+        batched = runtime.scorePaths(features, paths)
+        for path, score in zip(paths, batched):
+            self.assertAlmostEqual(runtime.scorePaths(features, [path])[0], score, places=4)
+
+    def test_cachedEmbeddingsAreRecomputedAfterFeaturesChange(self):
+        builder = SystemBuilder()
+        for i in range(0, 3):
+            builder.addVertex(Vertex(name='unused', node=i))
+        for source, target in [(0, 1), (1, 2)]:
+            builder.addEdge(Edge(name='unused', source=source, target=target, weight=1))
+        system = builder.system()
+        scorer = NumpyCachedEmbeddingsPathScorer(NumpyGNN(randomWeights()), system)
+
+        embeddings = scorer.embeddings()
+        self.assertIs(embeddings, scorer.embeddings())
+        system.setNodeFeatures(1, [4.0])
+        self.assertIsNot(embeddings, scorer.embeddings())
+
+    def test_occupancyFeaturesFollowExecutors(self):
+        builder = SystemBuilder()
+        for i in range(0, 3):
+            builder.addVertex(Vertex(name='unused', node=i))
+        for source, target in [(0, 1), (1, 2)]:
+            builder.addEdge(Edge(name='unused', source=source, target=target, weight=1))
+        system = builder.system()
+        occupancyFeatures = OccupancyFeatures(system)
+        self.assertEqual([0.0, 2.0, 0.0], system.nodeFeatures(1))
+
+        occupancyFeatures.onOccupancyChanged({1: 2, 2: 1})
+        self.assertEqual([2.0, 1.0], [system.nodeFeatures(i)[2] for i in (1, 2)])
+        version = system.graphDataVersion()
+        # Executor left node 2, features of other nodes aren't rewritten
+        occupancyFeatures.onOccupancyChanged({1: 2})
+        self.assertEqual([0.0, 2.0, 0.0], [system.nodeFeatures(i)[2] for i in range(0, 3)])
+        self.assertEqual(version[1] + 1, system.graphDataVersion()[1])
+
+    @unittest.skipIf(torch is None, "torch is not installed")
+    def test_exportedWeightsMatchTorchModel(self):
+        import tempfile, os
+        from model.gnn_model import exportWeights
+        model = GNNModel(num_node_features=1, num_classes=1)
+        model.eval()
+        features = torch.arange(0, 6, dtype=torch.float).reshape(6, 1)
+        paths = [[0, 1, 2], [5, 4, 3, 2]]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'weights.npz')
+            exportWeights(model, path)
+            runtime = NumpyGNN.load(path)
+        with torch.no_grad():
+            expected = model.scorePaths(features, paths).numpy()
+        np.testing.assert_allclose(runtime.scorePaths(features.numpy(), paths), expected, rtol=1e-4, atol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
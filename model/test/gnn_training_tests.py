@@ -0,0 +1,35 @@
+import random, unittest
+from model.gnn_training import generateExamples, runLabels, pairwiseAccuracy, PathExample, TASKS_PER_RUN, CONGESTION_WEIGHT
+
+
+class GnnTrainingTests(unittest.TestCase):
+    def test_generatesExampleForEveryTask(self):
+        examples = generateExamples(('treeGraph', 0))
+        self.assertEqual(len(examples), TASKS_PER_RUN)
+        for example in examples:
+            self.assertGreater(example.cost, 0)
+            self.assertEqual(len(example.features), len(example.path))
+            # Service time, degree and occupancy
+            self.assertTrue(all(len(features) == 3 for features in example.features))
+        self.assertTrue(any(features[2] > 0 for example in examples for features in example.features))
+
+    def test_generationIsReproducibleAndKeepsCallerRandomState(self):
+        random.seed(1)
+        state = random.getstate()
+        first = generateExamples(('treeGraph', 1))
+        self.assertEqual(state, random.getstate())
+        second = generateExamples(('treeGraph', 1))
+        self.assertEqual([example.cost for example in first], [example.cost for example in second])
+
+    def test_labelsAreStandardizedPerRunAndRanked(self):
+        examples = [PathExample('t', run, [[1.0]], [0], cost, 0, 0) for run, cost in [(0, 1), (0, 3), (1, 10), (1, 30)]]
+        self.assertEqual(runLabels(examples), [-1, 1, -1, 1])
+        self.assertEqual(pairwiseAccuracy(examples, [0.1, 0.2, 0.5, 0.4]), 0.5)
+
+    def test_labelsIncludeCongestion(self):
+        examples = [PathExample('t', 0, [[1.0]], [0], 1, collisions, timeInQueue) for collisions, timeInQueue in [(0, 5), (2, 5)]]
+        self.assertEqual(runLabels(examples), [-CONGESTION_WEIGHT, CONGESTION_WEIGHT])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import threading
+import unittest
+from model.gnn_runtime import PathScorerBase
+from model.inference_service import InferenceService, BatchingPathScorer
+
+
+class FakePathScorer(PathScorerBase):
+    def __init__(self):
+        self.calls = 0
+
+    def scorePaths(self, paths):
+        self.calls += 1
+        return [float(len(path)) for path in paths]
+
+
+class InferenceServiceTests(unittest.TestCase):
+    def test_scoresSynchronouslyWhenNotStarted(self):
+        scorer = FakePathScorer()
+        service = InferenceService(scorer)
+        self.assertEqual(BatchingPathScorer(service).scorePaths([[0, 1], [0, 1, 2]]), [2.0, 3.0])
+        self.assertEqual(scorer.calls, 1)
+
+    def test_coalescesConcurrentRequests(self):
+        scorer = FakePathScorer()
+        service = InferenceService(scorer, maxBatchSize=1000, maxWait=0.2)
+        service.start()
+        results = dict()
+        barrier = threading.Barrier(8)
+
+        def request(k):
+            barrier.wait()
+            results[k] = BatchingPathScorer(service).scorePaths([[0] * (k + 1)])
+
+        threads = [threading.Thread(target=request, args=(k,)) for k in range(0, 8)]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+        service.shutdown()
+
+        self.assertEqual(results, {k: [float(k + 1)] for k in range(0, 8)})
+        self.assertLess(scorer.calls, 8)
+        self.assertGreater(service.averageBatchSize(), 1)
+
+    def test_propagatesScoringErrors(self):
+        scorer = FakePathScorer()
+        scorer.scorePaths = lambda paths: 1 / 0
+        service = InferenceService(scorer)
+        service.start()
+        with self.assertRaises(ZeroDivisionError):
+            service.submit([[0, 1]]).result()
+        service.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
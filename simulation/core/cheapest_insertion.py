@@ -0,0 +1,47 @@
+"""
+Cheapest insertion of tasks into an optimized sequence. Cost of a sequence is the sum of empty travels between
+destination of a task and source of the next one, looked up in TravelCosts matrix.
+"""
+import numpy as np
+
+
+def taskEndpoints(tasks):
+    sources = np.fromiter((task.source() for task in tasks), dtype=np.int64, count=len(tasks))
+    destinations = np.fromiter((task.destination() for task in tasks), dtype=np.int64, count=len(tasks))
+    return sources, destinations
+
+
+def transitionCost(costs, sources, destinations):
+    return float(costs[destinations[:-1], sources[1:]].sum())
+
+
+def insertionDeltas(costs, sources, destinations, source, destination):
+    """
+    :return: Increase of sequence cost when task is inserted before every position, the last position appends it
+    """
+    deltas = np.zeros(len(sources) + 1)
+    deltas[1:] += costs[destinations, source]
+    deltas[:-1] += costs[destination, sources]
+    deltas[1:-1] -= costs[destinations[:-1], sources[1:]]
+    # Unreachable neighbours give inf - inf
+    return np.nan_to_num(deltas, nan=np.inf, posinf=np.inf)
+
+
+def insertTasks(costs, sequence, newTasks):
+    """
+    Inserts new tasks one by one at positions increasing sequence cost the least.
+    :return: New sequence and list of cost increases of insertions
+    """
+    sequence = list(sequence)
+    sources, destinations = taskEndpoints(sequence)
+    increases = []
+    for task in newTasks:
+        deltas = insertionDeltas(costs, sources, destinations, task.source(), task.destination())
+        position = int(np.argmin(deltas))
+        if not np.isfinite(deltas[position]):
+            position = len(sequence)  # task isn't reachable from anywhere, it's served last
+        sequence.insert(position, task)
+        sources = np.insert(sources, position, task.source())
+        destinations = np.insert(destinations, position, task.destination())
+        increases.append(float(deltas[position]))
+    return sequence, increases
@@ -1,12 +1,19 @@
+import threading
 from dataclasses import dataclass
 from simulation.core.system_builder import SystemBuilder
-from simulation.core.tasks_queue import TasksQueue
+from simulation.core.tasks_queue import TasksQueue, FIFO
 from simulation.core.tasks_scheduler import TasksScheduler
 from simulation.core.job_executors_manager import JobExecutorsManager
 from simulation.core.simulated_annealing_traverser import SimulatedAnnealingTraverser
 from simulation.core.genetic_algorithm_traverser import GeneticAlgorithmTraverser
-from simulation.core.queue_optimizer import QueueOptimizer
+from simulation.core.queue_optimizer import QueueOptimizer, FULL
 from simulation.core.traffic_controller import TrafficController
+from simulation.core.travel_costs import TravelCosts
+from simulation.core.reservation_table import ReservationTable, CooperativePlanner
+from simulation.core.sequence_validation import setSequenceValidation
+from simulation.core.tasks_journal import TasksJournal
+from model.gnn_runtime import createPathScorer, LazyPathScorer, OccupancyFeatures
+from model.inference_service import InferenceService, BatchingPathScorer, DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT
 
 
 TRAVERSERS = {
@@ -18,6 +25,24 @@ TRAVERSERS = {
 @dataclass
 class SimulationInitInfo:
     traverserName: str
+    compactTopology: bool = False
+    cooperativePathPlanning: bool = False
+    cachedNodeEmbeddings: bool = False
+    gnnWeightsPath: str = None
+    # int8 GNN inference, used only when it keeps choices of paths of the float GNN
+    quantizedGnn: bool = False
+    inferenceMaxBatchSize: int = DEFAULT_MAX_BATCH_SIZE
+    inferenceMaxWait: float = DEFAULT_MAX_WAIT
+    # Checks that optimizers only reorder tasks, may be disabled in production
+    validateSequences: bool = True
+    # FIFO, PRIORITY or EARLIEST_DEADLINE_FIRST dispatching of tasks
+    queueMode: str = FIFO
+    # FULL re-optimization of the whole queue or INCREMENTAL insertion of newly arrived tasks
+    optimizerMode: str = FULL
+    # Directory of tasks write-ahead log, queue isn't persisted when None
+    journalDirectory: str = None
+    # Seed of deadlock back-offs of traffic controller, unseeded when None
+    trafficSeed: int = None
 
 
 class CompositionRoot:
@@ -29,28 +54,81 @@ class CompositionRoot:
         self.__executorsManager = None
         self.__queueOptimizer = None
         self.__trafficController = None
+        self.__inferenceService = None
+        self.__pathScorer = None
+        self.__warmUpThread = None
+        self.__travelCostsThread = None
+        self.__journal = None
 
     def initialize(self, dependencies, topologyBuilder, simulationInitInfo):
+        setSequenceValidation(simulationInitInfo.validateSequences)
         systemBuilder = SystemBuilder()
-        self.__tasksQueue = TasksQueue()
+        self.__tasksQueue = TasksQueue(simulationInitInfo.queueMode)
         topologyBuilder.build(systemBuilder)
         self.__system = systemBuilder.system()
-        self.__trafficController = TrafficController(self.__system)
+        if simulationInitInfo.compactTopology:
+            self.__system.compact()
+        # Single GNN shared by all consumers, their requests are scored in micro-batches. It's loaded
+        # in background after start, so heavy GNN imports don't delay MES polling.
+        self.__pathScorer = LazyPathScorer(lambda: self.__createPathScorer(simulationInitInfo))
+        self.__inferenceService = InferenceService(self.__pathScorer,
+                                                   maxBatchSize=simulationInitInfo.inferenceMaxBatchSize,
+                                                   maxWait=simulationInitInfo.inferenceMaxWait)
+        self.__trafficController = TrafficController(self.__system, pathScorer=BatchingPathScorer(self.__inferenceService),
+                                                   seed=simulationInitInfo.trafficSeed)
+        if simulationInitInfo.cooperativePathPlanning:
+            self.__trafficController.setPathPlanner(CooperativePlanner(self.__system, ReservationTable()))
         self.__executorsManager = JobExecutorsManager(taskExecutorsManager=dependencies['taskExecutorsManager'], trafficController=self.__trafficController, queue=self.__tasksQueue)
+        if simulationInitInfo.gnnWeightsPath is not None:
+            # Trained weights expect the features they were trained on, occupancy follows executors
+            self.__executorsManager.addOccupancyObserver(OccupancyFeatures(self.__system))
         self.__queueOptimizer = QueueOptimizer(system=self.__system,
                                                agentsFactory=dependencies['agentsFactory'],
                                                simulation=dependencies['simulation'],
                                                traverserFactory=TRAVERSERS[simulationInitInfo.traverserName],
                                                queue=self.__tasksQueue,
-                                               executorsManager=self.__executorsManager)
+                                               executorsManager=self.__executorsManager,
+                                               pathScorer=BatchingPathScorer(self.__inferenceService),
+                                               mode=simulationInitInfo.optimizerMode)
         self.__tasksScheduler = TasksScheduler(executorsManager=self.__executorsManager,
                                                queueOptimizer=self.__queueOptimizer)
+        if simulationInitInfo.journalDirectory is not None:
+            self.__journal = TasksJournal(simulationInitInfo.journalDirectory)
+            self.__journal.recover(self.__tasksQueue)
+            self.__tasksQueue.setJournal(self.__journal)
+            self.__executorsManager.setJournal(self.__journal)
+
+    def __createPathScorer(self, simulationInitInfo):
+        return createPathScorer(self.__system, cachedEmbeddings=simulationInitInfo.cachedNodeEmbeddings,
+                                weightsPath=simulationInitInfo.gnnWeightsPath, quantized=simulationInitInfo.quantizedGnn)
+
+    def precomputeTravelCosts(self):
+        """
+        Shares travel costs between consumers, the whole matrix is computed in background, so it doesn't delay start.
+        Single costs are available meanwhile.
+        """
+        travelCosts = TravelCosts(self.__system)
+        self.__trafficController.setTravelCosts(travelCosts)
+        self.__queueOptimizer.setTravelCosts(travelCosts)
+        self.__travelCostsThread = threading.Thread(target=travelCosts.matrix)
+        self.__travelCostsThread.daemon = True
+        self.__travelCostsThread.start()
 
     def start(self):
+        self.__warmUpThread = threading.Thread(target=self.__pathScorer.pathScorer)
+        self.__warmUpThread.daemon = True
+        self.__warmUpThread.start()
+        self.__inferenceService.start()
+        if self.__journal is not None:
+            self.__journal.start()
         self.__tasksScheduler.start()
 
     def shutdown(self):
         self.__tasksScheduler.shutdown()
+        if self.__journal is not None:
+            self.__journal.close()
+        self.__inferenceService.shutdown()
+        self.__warmUpThread.join()
 
     def pathsController(self):
         return self.__pathsController
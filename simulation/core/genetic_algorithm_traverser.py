@@ -1,5 +1,9 @@
+import numpy as np
 from simulation.core.traverser_base import *
 from simulation.core.task import Task
+from simulation.core.sequence_validation import sequenceValidationEnabled, missingTaskNumber
+from simulation.core.permutation_population import PermutationPopulation, arePermutations
+from simulation.core.surrogate_cost import screenedCosts
 
 
 DEFAULT_POOL_SIZE = 120
@@ -35,31 +39,25 @@ class Genome:
         if p1 > p2:
             p1, p2 = p2, p1
 
-        child = []
-        for i in range(0, len(self.tasks)):
-            child.append(Task(-1, -1, -1))
-
+        n = len(self.tasks)
+        child = list(self.tasks)
+        # Tasks of every number which aren't in the child yet
+        missing = sequenceHistogram(self.tasks)
         for i in range(p1, p2):
-            child[i] = self.tasks[i]
-
-        originalHistogram = sequenceHistogram(self.tasks)
-
-        def processSecondParentElementsForRange(start, stop):
-            for i in range(start, stop):
-                currentChildHistogram = sequenceHistogram(child)
-                for j in range(0, len(other.tasks)):
-                    index = i + j
-                    if index >= len(other.tasks):
-                        index -= len(other.tasks)
-                    t = other.tasks[index]
-                    if t.taskNumber() in currentChildHistogram and originalHistogram[t.taskNumber()] == currentChildHistogram[t.taskNumber()]:
-                        continue
-                    else:
-                        child[i] = t
-                        break
-
-        processSecondParentElementsForRange(p2, len(child))
-        processSecondParentElementsForRange(0, p1)
+            missing[self.tasks[i].taskNumber()] -= 1
+
+        # Positions from p2 to the end and then from the beginning to p1 take the first task of the second parent
+        # with missing number, searching from their own index. Tasks skipped by the search stay not missing,
+        # so the search continues from the last taken task, unless it was taken at the preceding index.
+        cursor = p2
+        for step in range(0, n - (p2 - p1)):
+            i = (p2 + step) % n
+            if step > 0 and cursor == (i - 1) % n:
+                cursor = i
+            while missing[other.tasks[cursor].taskNumber()] == 0:
+                cursor = (cursor + 1) % n
+            child[i] = other.tasks[cursor]
+            missing[child[i].taskNumber()] -= 1
         return Genome(child)
 
     def mutate(self, sequence):
@@ -78,103 +76,109 @@ class Genome:
         return len(self.tasks)
 
     def validate(self, sequence):
-        tmp = copy.deepcopy(sequence)
+        if not sequenceValidationEnabled():
+            return
         if self.size() != len(sequence):
             raise Exception("Broken genome! Size: {}, expected size: {}".format(self.size(), len(sequence)))
-        for task in self.tasks:
-            index = -1
-            for i in range(0, len(tmp)):
-                if task.taskNumber() == tmp[i].taskNumber():
-                    index = i
-                    break
-            if index == -1:
-                raise Exception("Broken genome! Missing item: {}".format(task.taskNumber()))
-            else:
-                tmp.pop(index)
+        missing = missingTaskNumber(self.tasks, sequence)
+        if missing is not None:
+            raise Exception("Broken genome! Missing item: {}".format(missing))
 
     def __lt__(self, other):
         return self.cost < other.cost
 
 
 class GeneticAlgorithmTraverser(TraverserBase):
-    def __init__(self, system):
-        super().__init__(system)
-        self._genes = []
+    def __init__(self, system, seed=None):
+        super().__init__(system, seed)
+        self._population = None
+        self.__tasks = []
+        self.__bestGenome = None
+        self.__simulated = None
+        self.__estimates = None
         self.__currentGene = -1
         self.__genePoolSize = DEFAULT_POOL_SIZE
 
     def assignSequence(self, sequence):
         super().assignSequence(sequence)
         self.__genePoolSize = self.__calculatePoolSize(len(sequence))
-        self.__generateGenes()
+        self.__tasks = self._currentSequence
+        self.__bestGenome = None
+        self._population = PermutationPopulation(self.__genePoolSize, len(self.__tasks), MUTATION_PROBABILITY,
+                                                 np.random.default_rng(self._random.getrandbits(64)))
+        self.__validatePool()
         self.__currentGene = 0
 
     def __calculatePoolSize(self, sequenceLength):
         return DEFAULT_POOL_SIZE
 
-    def __generateGenes(self):
-        g = Genome(self._currentSequence)
-        self._genes.append(g)
-        g.validate(self._initialSequence)
-        for i in range(0, self.__genePoolSize-1):
-            g = Genome(random.sample(self._currentSequence, k=len(self._currentSequence)))
-            g.validate(self._initialSequence)
-            self._genes.append(g)
-
     def nextIteration(self):
-        self._genes[self.__currentGene].cost = self._currentCost
+        self._population.costs[self.__currentGene] = self._currentCost
         if self._bestCost == -1 or self._bestCost > self._currentCost:
             self._acceptCurrentSolution()
 
         self.__currentGene += 1
-        if self.__currentGene >= len(self._genes):
-            l1 = len(self._genes)
-            self.__depopulate()
-            self.__mutate()
-            self.__crossover()
-            l2 = len(self._genes)
-            if l1 != l2:
-                raise Exception("Genes pool broken")
-            self.__currentGene = 0
-
-        self._currentSequence = self._genes[self.__currentGene].tasks
-        self._tmpSequence = copy.deepcopy(self._currentSequence)
+        if self.__currentGene >= self._population.size():
+            self.__nextGeneration()
+        else:
+            self.__startGene()
+
+    def __nextGeneration(self):
+        self._population.nextGeneration()
+        self.__validatePool()
+        self.__currentGene = 0
+        self.__startGene()
+
+    def __startGene(self):
+        self._currentSequence = self.__genomeTasks(self._population.genomes[self.__currentGene])
+        self._tmpSequence = list(self._currentSequence)
         self._currentCost = 0
         self._currentStatistics = TraverserStatistics(0, 0, 0, 0)
 
     def feedback(self, cost, collisions, timeInQueue, timeInPenalty, timeInTransition):
         super().feedback(cost, collisions, timeInQueue, timeInPenalty, timeInTransition)
 
-    def __crossover(self):
-        self.__validatePool()
-        newGenes = []
-        while len(self._genes) > 0:
-            genom1 = self._genes.pop(random.randint(0, len(self._genes)-1))
-            genom2 = self._genes.pop(random.randint(0, len(self._genes)-1))
-            newGenom1, newGenom2 = genom1.crossover(genom2)
-            genom1.reset()
-            genom2.reset()
-            newGenom1.validate(self._initialSequence)
-            newGenom2.validate(self._initialSequence)
-            genom1.validate(self._initialSequence)
-            genom2.validate(self._initialSequence)
-            newGenes.append(newGenom1)
-            newGenes.append(newGenom2)
-            newGenes.append(genom1)
-            newGenes.append(genom2)
-        self._genes = newGenes
-
-    def __mutate(self):
-        for genome in self._genes:
-            genome.mutate(self._initialSequence)
-
-    def __depopulate(self):
-        self.__validatePool()
-        self._genes.sort()
-        self._genes = self._genes[0: int(len(self._genes) / 2)]
-        self.__validatePool()
+    def candidates(self):
+        # Whole generation is evaluated at once, unless surrogate leaves out the worst genomes
+        genomes = self._population.genomes
+        if self._surrogate is None:
+            self.__simulated = np.arange(0, len(genomes))
+            return genomes
+        self.__estimates = self._surrogate.costs(self.__tasks, genomes)
+        self._budget.surrogateEvaluations += len(genomes)
+        self.__simulated = np.argsort(self.__estimates, kind='stable')[0: self._simulatedCount(len(genomes))]
+        return genomes[self.__simulated]
+
+    def batchFeedback(self, results):
+        simulatedCosts = np.array([result[0] for result in results], dtype=np.float64)
+        self._budget.simulatedEvaluations += len(results)
+        if len(self.__simulated) == self._population.size():
+            self._population.costs[self.__simulated] = simulatedCosts
+        else:
+            self._population.costs = screenedCosts(self.__estimates, self.__simulated, simulatedCosts)
+        best = int(np.argmin(simulatedCosts))
+        if self._bestCost == -1 or self._bestCost > results[best][0]:
+            self._bestCost = results[best][0]
+            self.__bestGenome = self._population.genomes[self.__simulated[best]].copy()
+            self._bestStatistics = TraverserStatistics(*results[best][1:])
+        self.__nextGeneration()
+
+    def sequence(self):
+        if self.__bestGenome is None:
+            return self._bestSequence
+        return self.__genomeTasks(self.__bestGenome)
+
+    def _acceptCurrentSolution(self):
+        # Only the genome is kept, tasks of the best sequence are looked up when requested
+        self._bestCost = self._currentCost
+        self.__bestGenome = self._population.genomes[self.__currentGene].copy()
+        self._bestStatistics = copy.copy(self._currentStatistics)
+
+    def __genomeTasks(self, genome):
+        return [self.__tasks[i] for i in genome]
 
     def __validatePool(self):
-        l = len(self._genes)
-        if l % 2 != 0:
-            raise RuntimeError("Invalid population size")
+        if not sequenceValidationEnabled():
+            return
+        if not arePermutations(self._population.genomes):
+            raise RuntimeError("Genes pool broken")
@@ -1,7 +1,7 @@
 import copy
 from simulation.core.task import Task
 from simulation.core.task_executor import TaskExecutor
-import threading, time
+import threading
 
 
 class JobExecutor:
@@ -17,6 +17,7 @@ class JobExecutor:
         self.__path = None
         self.__killed = False
         self.__remainingJob = None
+        self.__abandoned = False
 
     def busy(self):
         return self.__busy
@@ -30,6 +31,7 @@ class JobExecutor:
     def executeJob(self, job):
         self.__remainingJob = None
         self.__killed = False
+        self.__abandoned = False
         self.__busy = True
         self.__state = "assigned"
         self.__currentTask = 0
@@ -100,14 +102,19 @@ class JobExecutor:
         self.__path = self.__waitForFreePath(points[0], points[1])
         self.__pathPoint = 0
 
-        for _ in self.__path:
+        while self.__pathPoint < len(self.__path):
+            self.__owner.trafficController().waitForPlannedDeparture(self.__path, self, self.__pathPoint)
             self.__state = "running"
             succeeded = self.__taskExecutor.execute(self.__currentSegmentNodes(), task.taskId())
             if self.__killed or not succeeded:
                 return False
 
             self.__pathPoint += 1
-            self.__waitForFreeSegment(self.__path, self.__pathPoint)
+            self.__owner.onExecutorMoved(self)
+            if not self.__waitForFreeSegment(self.__path, self.__pathPoint):
+                # Deadlock retries are exhausted, remaining tasks are given back to the queue
+                self.__abandoned = True
+                return False
 
         self.__owner.trafficController().revokePath(self.__path, self)
         return True
@@ -120,7 +127,10 @@ class JobExecutor:
 
     def __onJobFinished(self):
         self.__unassignJob()
-        self.__owner.onExecutorFinished()
+        if self.__abandoned:
+            self.__owner.onJobAbandoned(self)
+        else:
+            self.__owner.onExecutorFinished(self)
 
     def __unassignJob(self):
         if self.__path is not None:
@@ -134,16 +144,17 @@ class JobExecutor:
 
     def __waitForFreePath(self, source, destination):
         self.__state = "waiting_for_path"
-        path = self.__owner.trafficController().requestPath(source, destination, self)
-        while path is None:
-            path = self.__owner.trafficController().requestPath(source, destination, self)
-            time.sleep(1)
-        return path
+        return self.__owner.trafficController().waitForPath(source, destination, self)
 
     def __waitForFreeSegment(self, path, startingPoint):
         self.__state = "waiting_for_path"
-        while not self.__owner.trafficController().requestNextSegment(path, self, startingPoint):
-            time.sleep(1)
+        if not self.__owner.trafficController().waitForNextSegment(path, self, startingPoint):
+            return False
+        reroutedPath = self.__owner.trafficController().takeReroutedPath(self)
+        if reroutedPath is not None:
+            self.__path = reroutedPath
+            self.__pathPoint = 0
+        return True
 
     def __currentSegmentNodes(self):
         return self.__owner.trafficController().segmentNodes(self.__path, self.__pathPoint)
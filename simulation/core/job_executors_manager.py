@@ -1,7 +1,10 @@
-import random, threading
+import logging, random, threading
+import numpy as np
 from simulation.core.job_executor import JobExecutor, JobExecutorView
 from simulation.core.tasks_executor_manager import TasksExecutorManager
 
+logger = logging.getLogger(__name__)
+
 
 class JobExecutorsManager:
     def __init__(self, taskExecutorsManager : TasksExecutorManager, trafficController, queue):
@@ -10,6 +13,8 @@ class JobExecutorsManager:
         self.__taskExecutorsManager.addTasksExecutorObserver(self)
         self.__trafficController = trafficController
         self.__queue = queue
+        self.__journal = None
+        self.__occupancyObservers = []
         self.__lock = threading.Lock()
 
     def freeExecutors(self):
@@ -38,19 +43,38 @@ class JobExecutorsManager:
             return executor
 
     def closestFreeExecutor(self, task):
-        candidates = self.freeExecutors()
-        closestCost = None
-        closestExecutor = None
-        for executor in candidates:
-            if self.trafficController().isValidLocation(executor.location()):
-                transitCost = self.trafficController().lowestCost(executor.location(), task.source())
-                if closestCost is None or closestCost > transitCost:
-                    closestCost = transitCost
-                    closestExecutor = executor
-        return closestExecutor
-
-    def onExecutorFinished(self):
-        pass
+        candidates = [executor for executor in self.freeExecutors() if self.trafficController().isValidLocation(executor.location())]
+        if len(candidates) == 0:
+            return None
+        transitCosts = self.trafficController().lowestCosts([executor.location() for executor in candidates], task.source())
+        return candidates[int(np.argmin(transitCosts))]
+
+    def setJournal(self, journal):
+        self.__journal = journal
+
+    def assignJob(self, executor, job):
+        if self.__journal is not None:
+            self.__journal.onJobAssigned(executor.taskExecutorId(), job)
+        executor.executeJob(job)
+
+    def onExecutorFinished(self, executor):
+        if self.__journal is not None:
+            self.__journal.onJobFinished(executor.taskExecutorId())
+
+    def addOccupancyObserver(self, observer):
+        self.__occupancyObservers.append(observer)
+        self.__notifyOccupancyChanged()
+
+    def onExecutorMoved(self, executor):
+        self.__notifyOccupancyChanged()
+
+    def onJobAbandoned(self, executor):
+        remainingJob = executor.remainingJob()
+        logger.warning("Executor %s abandoned its job after deadlock retries, %d tasks are enqueued again",
+                       executor.taskExecutorId(), len(remainingJob))
+        # Same as for interrupted jobs, assignment ends before remaining tasks are enqueued
+        self.onExecutorFinished(executor)
+        self.__queue.batchEnqueue(remainingJob)
 
     def executorsNumber(self):
         with self.__lock:
@@ -74,6 +98,7 @@ class JobExecutorsManager:
     def onTasksExecutorsChanged(self):
         self.__unregisterUnavailableExecutors()
         self.__refreshAvailableExecutors()
+        self.__notifyOccupancyChanged()
 
     def refreshExecutors(self):
         self.__taskExecutorsManager.refreshTasksExecutors()
@@ -84,6 +109,18 @@ class JobExecutorsManager:
     def trafficController(self):
         return self.__trafficController
 
+    def __notifyOccupancyChanged(self):
+        if len(self.__occupancyObservers) == 0:
+            return
+        occupancy = dict()
+        with self.__lock:
+            for executorId in self.__executors:
+                executor = self.__executors[executorId]
+                if executor.online():
+                    occupancy[executor.location()] = occupancy.get(executor.location(), 0) + 1
+        for observer in self.__occupancyObservers:
+            observer.onOccupancyChanged(occupancy)
+
     def __unregisterUnavailableExecutors(self):
         with self.__lock:
             executorsToCleanup = []
@@ -102,6 +139,8 @@ class JobExecutorsManager:
 
     def __revokeJobFromUnavailableExecutor(self, executor):
         executor.kill()
+        # Assignment ends before remaining tasks are enqueued, so recovery doesn't enqueue them twice
+        self.onExecutorFinished(executor)
         self.__queue.batchEnqueue(executor.remainingJob())
 
     def __refreshAvailableExecutors(self):
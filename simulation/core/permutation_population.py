@@ -0,0 +1,72 @@
+"""
+Population of genetic algorithm held as pool x n array of permutations of task indices. Selection, crossover
+and mutation of the whole population are batched NumPy operations, tasks are only looked up for evaluated genomes.
+"""
+import numpy as np
+
+
+def orderCrossover(parents1, parents2, cutPoints1, cutPoints2):
+    """
+    Davis order crossover of every pair of rows. Child keeps parent1 in [cutPoint1, cutPoint2), the rest is filled
+    from cutPoint2 onwards, wrapping around, with elements of parent2 in their order starting from cutPoint2.
+    :return: Array of children, one for every pair of parents
+    """
+    count, n = parents1.shape
+    positions = np.arange(0, n)
+    kept = (positions >= cutPoints1[:, None]) & (positions < cutPoints2[:, None])
+    keptElements = np.zeros((count, n), dtype=bool)
+    np.put_along_axis(keptElements, parents1, kept, axis=1)
+
+    fromCutPoint = (positions + cutPoints2[:, None]) % n
+    secondParentOrder = np.take_along_axis(parents2, fromCutPoint, axis=1)
+    missing = ~np.take_along_axis(keptElements, secondParentOrder, axis=1)
+    free = ~np.take_along_axis(kept, fromCutPoint, axis=1)
+
+    # Every row has as many missing elements as free positions, both are listed in their order within rows
+    children = parents1.copy()
+    rows = np.broadcast_to(np.arange(0, count)[:, None], (count, n))
+    children[rows[free], fromCutPoint[free]] = secondParentOrder[missing]
+    return children
+
+
+def swapMutation(genomes, probability, rng):
+    mutated = np.flatnonzero(rng.random(len(genomes)) < probability)
+    n = genomes.shape[1]
+    positions1 = rng.integers(0, n, len(mutated))
+    positions2 = rng.integers(0, n, len(mutated))
+    genomes[mutated, positions1], genomes[mutated, positions2] = genomes[mutated, positions2], genomes[mutated, positions1]
+
+
+def arePermutations(genomes):
+    return bool(np.all(np.sort(genomes, axis=1) == np.arange(0, genomes.shape[1])))
+
+
+class PermutationPopulation:
+    """
+    First genome keeps the initial order, the others are random permutations. Every generation the better half
+    survives, survivors mutate and are paired at random, each pair is followed by its two children.
+    """
+    def __init__(self, size, tasksNumber, mutationProbability, rng=None):
+        if size % 4 != 0:
+            # Survivors are paired
+            raise RuntimeError("Invalid population size")
+        self.__rng = rng if rng is not None else np.random.default_rng()
+        self.__mutationProbability = mutationProbability
+        self.genomes = np.argsort(self.__rng.random((size, tasksNumber)), axis=1).astype(np.int32)
+        self.genomes[0] = np.arange(0, tasksNumber, dtype=np.int32)
+        self.costs = np.zeros(size)
+
+    def size(self):
+        return len(self.genomes)
+
+    def nextGeneration(self):
+        size, n = self.genomes.shape
+        survivors = self.genomes[np.argsort(self.costs, kind='stable')[0: size // 2]]
+        swapMutation(survivors, self.__mutationProbability, self.__rng)
+        pairs = self.__rng.permutation(len(survivors)).reshape(-1, 2)
+        parents1, parents2 = survivors[pairs[:, 0]], survivors[pairs[:, 1]]
+        cutPoints = np.sort(self.__rng.integers(0, n, (len(pairs), 2)), axis=1)
+        children1 = orderCrossover(parents1, parents2, cutPoints[:, 0], cutPoints[:, 1])
+        children2 = orderCrossover(parents2, parents1, cutPoints[:, 0], cutPoints[:, 1])
+        self.genomes = np.stack([children1, children2, parents1, parents2], axis=1).reshape(size, n)
+        self.costs = np.zeros(size)
@@ -1,9 +1,16 @@
+import math
 from dataclasses import dataclass
 from simulation.core.agents_factory import AgentsFactory
 from simulation.core.tasks_queue import TasksQueue, TasksQueueView
 from simulation.core.traverser_base import TraverserStatistics
-from model.gnn_model import GNNModel  # Import the GNN model
-import torch
+from simulation.core.travel_costs import TravelCosts
+from simulation.core.cheapest_insertion import taskEndpoints, transitionCost, insertTasks
+from model.gnn_runtime import createPathScorer
+
+FULL = 'full'
+INCREMENTAL = 'incremental'
+# Share of sequence cost which estimated improvement must exceed to re-optimize the whole queue
+REOPTIMIZATION_THRESHOLD = 0.1
 
 @dataclass
 class OptimizationResult:
@@ -11,7 +18,13 @@ class OptimizationResult:
     statistics: TraverserStatistics
 
 class QueueOptimizer:
-    def __init__(self, system, agentsFactory: AgentsFactory, simulation, traverserFactory, queue: TasksQueue, executorsManager):
+    """
+    FULL mode re-optimizes the whole queue on every call. INCREMENTAL mode keeps the previous sequence and inserts
+    only newly arrived tasks at their cheapest positions. The whole queue is re-optimized when insertions made
+    the sequence worse than the optimized one by more than REOPTIMIZATION_THRESHOLD of its cost.
+    """
+    def __init__(self, system, agentsFactory: AgentsFactory, simulation, traverserFactory, queue: TasksQueue, executorsManager, pathScorer=None,
+                 mode=FULL):
         self.__system = system
         self.__agentsFactory = agentsFactory
         self.__simulation = simulation
@@ -20,79 +33,121 @@ class QueueOptimizer:
         self.__queue = queue
         self.__executorsManager = executorsManager
 
-        # Initialize the GNN model
-        self.__gnn_model = GNNModel(num_node_features=system.graph_data.num_features, num_classes=len(queue.tasksList()))
-        self.__gnn_model.eval()  # Set to evaluation mode for inference
+        # Single output GNN scores both candidate paths and tasks, so it doesn't depend on the queue length
+        self.__pathScorer = pathScorer if pathScorer is not None else createPathScorer(system)
+
+        self.__mode = mode
+        self.__travelCosts = None
+        self.__averageTransitionCost = None
+        self.__insertionExcess = 0.0
+
+    def setTravelCosts(self, travelCosts: TravelCosts):
+        self.__travelCosts = travelCosts
 
     def optimizeQueue(self, iterations) -> OptimizationResult:
         executorsNumber = self.__executorsManager.onlineExecutorsNumber()
-        self.__traverser = self.__traverserFactory(self.__system)
-        
-        if executorsNumber > 0:
-            self.__queue.onOptimizationStart()
-            tasksToOptimize = self.__queue.tasksList()
-            oldSize = len(tasksToOptimize)
-
-            if len(tasksToOptimize) > 1:
-                # GNN-based Optimization Logic
-                with torch.no_grad():
-                    # Assuming that graph_data is a torch_geometric Data object containing the graph structure
-                    graph_data = self.__system.graph_data
-                    optimized_tasks_tensor = self.__gnn_model(graph_data)  # Get the optimized output from GNN
-                    
-                    # Process GNN output to get optimized sequence
-                    optimized_task_indices = torch.argsort(optimized_tasks_tensor, descending=True)
-                    optimizedSequence = [tasksToOptimize[idx] for idx in optimized_task_indices]
-
-                # Integrate Multi-Path Search using `get_k_shortest_paths()`
-                for task in optimizedSequence:
-                    source, destination = task.getSource(), task.getDestination()
-                    # Get multiple paths between source and destination
-                    k_shortest_paths = self.__system.graph.get_k_shortest_paths(source, destination, k=3)
-
-                    # Use GNN to evaluate and pick the best path
-                    best_path = None
-                    min_cost = float('inf')
-                    for path in k_shortest_paths:
-                        path_tensor = self._prepare_path_tensor(path)  # Assuming method to convert path to tensor
-                        predicted_cost = self.__gnn_model(path_tensor)  # Predict cost with GNN
-                        
-                        if predicted_cost < min_cost:
-                            min_cost = predicted_cost
-                            best_path = path
-                    
-                    # Assign the best path to the task
-                    task.setOptimizedPath(best_path)
-
-                newSize = len(optimizedSequence)
-                if oldSize != newSize:
-                    raise Exception("Queue corrupted by optimizer, old: {}, new: {}!".format(oldSize, newSize))
-
-                # Provide feedback to the queue
-                self.__queue.onOptimizationFeedback(optimizedSequence, self.__traverser.cost())
 
+        if executorsNumber > 0:
+            newTasks = self.__queue.onOptimizationStart()
+            if self.__mode == INCREMENTAL and self.__averageTransitionCost is not None:
+                if len(newTasks) > 0 and not self.__insertNewTasks(newTasks):
+                    self.__optimizeAllTasks()
+            else:
+                self.__optimizeAllTasks()
             self.__queue.onOptimizationFinished()
-        
+
+        if self.__traverser is None:
+            self.__traverser = self.__traverserFactory(self.__system)
         return OptimizationResult(self.__queue.queueView(), self.__traverser.statistics())
 
+    def __optimizeAllTasks(self):
+        self.__traverser = self.__traverserFactory(self.__system)
+        tasksToOptimize = self.__queue.tasksList()
+        oldSize = len(tasksToOptimize)
+
+        if len(tasksToOptimize) > 1:
+            # GNN-based Optimization Logic
+            # Priorities and deadlines of orders are constraints, optimizer only orders tasks with equal requirements
+            optimizedSequence = self.__queue.constrainedSequence(self.__orderTasks(tasksToOptimize))
+
+            # Integrate Multi-Path Search, candidate paths of all tasks are scored in one GNN pass
+            for task, best_path in zip(optimizedSequence, self.bestPaths(optimizedSequence)):
+                # Assign the best path to the task
+                task.setOptimizedPath(best_path)
+
+            newSize = len(optimizedSequence)
+            if oldSize != newSize:
+                raise Exception("Queue corrupted by optimizer, old: {}, new: {}!".format(oldSize, newSize))
+
+            # Provide feedback to the queue, cost of the sequence is measured the same way as incremental insertions
+            self.__queue.onOptimizationFeedback(optimizedSequence, self.__sequenceCost(optimizedSequence))
+            tasksToOptimize = optimizedSequence
+
+        if self.__mode == INCREMENTAL:
+            self.__averageTransitionCost = self.__sequenceCost(tasksToOptimize) / max(1, len(tasksToOptimize) - 1)
+            self.__insertionExcess = 0.0
+
+    def __insertNewTasks(self, newTasks):
+        """
+        Inserts new tasks into the current sequence, only their paths are evaluated.
+        :return: False when the whole queue should be re-optimized instead
+        """
+        newTasksIds = set(id(task) for task in newTasks)
+        sequence = [task for task in self.__queue.tasksList() if id(task) not in newTasksIds]
+        optimizedSequence, increases = insertTasks(self.__costs(), sequence, newTasks)
+        # Insertions dearer than average transition of the optimized sequence are what re-optimization could win back
+        self.__insertionExcess += sum(increase - self.__averageTransitionCost for increase in increases)
+        optimizedSequence = self.__queue.constrainedSequence(optimizedSequence)
+        cost = self.__sequenceCost(optimizedSequence)
+        # Unreachable transitions can't be compared with the threshold, full optimization has to handle them
+        if not math.isfinite(cost) or not math.isfinite(self.__insertionExcess) or \
+                self.__insertionExcess > REOPTIMIZATION_THRESHOLD * cost:
+            return False
+
+        for task, best_path in zip(newTasks, self.bestPaths(newTasks)):
+            task.setOptimizedPath(best_path)
+        self.__queue.onOptimizationFeedback(optimizedSequence, cost)
+        return True
+
+    def __sequenceCost(self, sequence):
+        """
+        :return: Sum of empty travels between consecutive tasks
+        """
+        sources, destinations = taskEndpoints(sequence)
+        return transitionCost(self.__costs(), sources, destinations)
+
+    def __costs(self):
+        if self.__travelCosts is None:
+            self.__travelCosts = TravelCosts(self.__system)
+        return self.__travelCosts.matrix()
+
     def queue(self):
         return self.__queue
 
+    def __orderTasks(self, tasks):
+        """
+        Orders tasks by GNN scores of their source to destination chains. Scores are predicted costs, as in bestPaths,
+        so the cheapest task goes first.
+        """
+        scores = self.__pathScorer.scorePaths([[task.source(), task.destination()] for task in tasks])
+        return [tasks[i] for i in sorted(range(0, len(tasks)), key=lambda i: scores[i])]
+
     def __createAgent(self, traverser):
         return self.__agentsFactory.createAgent({'traverser': traverser})
 
-    def _prepare_path_tensor(self, path):
+    def bestPaths(self, tasks, k=3):
         """
-        Converts a path into a tensor representation suitable for the GNN model.
-        Assumes that `path` is a list of nodes.
+        Picks path with the lowest predicted cost for every task.
+        :param tasks: Tasks to find paths for
+        :param k: Number of candidate shortest paths per task
+        :return: List of paths matching tasks, None for tasks without any path
         """
-        # Placeholder logic: convert path into tensor.
-        # You might want to encode the sequence of nodes as input features.
-        node_features = []
-        for node in path:
-            # Assuming each node has a feature vector, e.g., extracted from the graph
-            node_feature = self.__system.graph.vs[node].get('features', [1.0])
-            node_features.append(node_feature)
-        
-        path_tensor = torch.tensor(node_features, dtype=torch.float)
-        return path_tensor
+        pathGroups = [self.__system.graph.get_k_shortest_paths(task.source(), task.destination(), k=k) for task in tasks]
+        scores = self.__pathScorer.scorePathGroups(pathGroups)
+        res = []
+        for paths, pathsScores in zip(pathGroups, scores):
+            if len(paths) == 0:
+                res.append(None)
+            else:
+                res.append(paths[min(range(0, len(paths)), key=lambda i: pathsScores[i])])
+        return res
@@ -0,0 +1,212 @@
+import heapq, itertools, math, threading, time
+
+
+DEFAULT_WAIT_STEP = 1.0
+DEFAULT_MAX_EXPANSIONS = 20000
+
+
+class ReservationTable:
+    """
+    Space-time reservations of nodes and edges, every reservation is a half-open [start, end) interval.
+    Edges are physical corridors, so reservation of a -> b blocks b -> a as well.
+    """
+    def __init__(self):
+        self.__nodes = dict()
+        self.__edges = dict()
+        self.__lock = threading.RLock()
+
+    def lock(self):
+        return self.__lock
+
+    def reserveNode(self, node, start, end, owner):
+        with self.__lock:
+            self.__nodes.setdefault(node, []).append((start, end, id(owner)))
+
+    def reserveEdge(self, source, destination, start, end, owner):
+        with self.__lock:
+            self.__edges.setdefault(self.__edgeKey(source, destination), []).append((start, end, id(owner)))
+
+    def nodeFree(self, node, start, end, owner=None):
+        with self.__lock:
+            return self.__free(self.__nodes.get(node), start, end, owner)
+
+    def edgeFree(self, source, destination, start, end, owner=None):
+        with self.__lock:
+            return self.__free(self.__edges.get(self.__edgeKey(source, destination)), start, end, owner)
+
+    def release(self, owner):
+        with self.__lock:
+            for reservations in (self.__nodes, self.__edges):
+                for key in list(reservations.keys()):
+                    reservations[key] = [r for r in reservations[key] if r[2] != id(owner)]
+                    if len(reservations[key]) == 0:
+                        del reservations[key]
+
+    def releaseBefore(self, timePoint):
+        """
+        Drops reservations which ended before given time point.
+        """
+        with self.__lock:
+            for reservations in (self.__nodes, self.__edges):
+                for key in list(reservations.keys()):
+                    reservations[key] = [r for r in reservations[key] if r[1] > timePoint]
+                    if len(reservations[key]) == 0:
+                        del reservations[key]
+
+    def reservationsCount(self):
+        with self.__lock:
+            return sum(len(r) for r in self.__nodes.values()) + sum(len(r) for r in self.__edges.values())
+
+    @staticmethod
+    def __edgeKey(source, destination):
+        return (source, destination) if source <= destination else (destination, source)
+
+    @staticmethod
+    def __free(reservations, start, end, owner):
+        if reservations is None:
+            return True
+        ownerId = id(owner) if owner is not None else None
+        for reservedStart, reservedEnd, reservedOwner in reservations:
+            if reservedOwner != ownerId and reservedStart < end and start < reservedEnd:
+                return False
+        return True
+
+
+class MonotonicClock:
+    """
+    Time base of plans and of waiting for planned departures.
+    """
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class CooperativePlanner:
+    """
+    Prioritized cooperative A* in space-time. Every plan respects reservations made by earlier plans,
+    so the order of planning defines priority. Agents may wait at nodes instead of entering occupied corridors.
+    Reservations keep agents apart only while they follow planned timing, executors are held at nodes
+    until their planned departures. Executors which are late don't wait, segment locks keep them apart then.
+    """
+    def __init__(self, system, reservations: ReservationTable, heuristic=None, waitStep=DEFAULT_WAIT_STEP, maxExpansions=DEFAULT_MAX_EXPANSIONS,
+                 clock=None):
+        self.__system = system
+        self.__clock = clock if clock is not None else MonotonicClock()
+        self.__reservations = reservations
+        self.__heuristic = heuristic
+        self.__waitStep = waitStep
+        self.__maxExpansions = maxExpansions
+
+    def setHeuristic(self, heuristic):
+        """
+        :param heuristic: Callable (node, destination) -> admissible transit cost estimate, e.g. TravelCosts.cost
+        """
+        self.__heuristic = heuristic
+
+    def reservations(self):
+        return self.__reservations
+
+    def clock(self):
+        return self.__clock
+
+    def plan(self, source, destination, owner, startTime=None):
+        """
+        Plans and reserves timed path for given owner, previous reservations of the owner are dropped.
+        :param startTime: Time of departure from source, current time of the clock when not given
+        :return: List of (node, arrivalTime) tuples, repeated node means waiting, None if no plan was found
+        """
+        if startTime is None:
+            startTime = self.__clock.now()
+        with self.__reservations.lock():
+            self.__reservations.releaseBefore(startTime)
+            self.__reservations.release(owner)
+            timeline = self.__search(source, destination, owner, startTime)
+            if timeline is not None:
+                self.__reserve(timeline, owner)
+            return timeline
+
+    def release(self, owner):
+        self.__reservations.release(owner)
+
+    def __search(self, source, destination, owner, startTime):
+        counter = itertools.count()
+        openSet = [(self.__estimate(source, destination) + startTime, next(counter), startTime, source, None)]
+        parents = dict()
+        expansions = 0
+        while openSet and expansions < self.__maxExpansions:
+            _, _, timePoint, node, parent = heapq.heappop(openSet)
+            key = (node, round((timePoint - startTime) / self.__waitStep))
+            if key in parents:
+                continue
+            parents[key] = (parent, node, timePoint)
+            # Destination is held until the plan is released
+            if node == destination and self.__reservations.nodeFree(node, timePoint, math.inf, owner):
+                return self.__timeline(parents, key)
+            expansions += 1
+
+            for neighbour in self.__system.graph.neighbors(node):
+                if neighbour == node:
+                    continue
+                weight = self.__system.edgeWeight(node, neighbour)
+                arrival = timePoint + (weight if weight is not None else 1.0)
+                if self.__reservations.edgeFree(node, neighbour, timePoint, arrival, owner) and \
+                        self.__reservations.nodeFree(neighbour, arrival, arrival + self.__waitStep, owner):
+                    heapq.heappush(openSet, (arrival + self.__estimate(neighbour, destination), next(counter), arrival, neighbour, key))
+
+            waitEnd = timePoint + self.__waitStep
+            if self.__reservations.nodeFree(node, timePoint, waitEnd, owner):
+                heapq.heappush(openSet, (waitEnd + self.__estimate(node, destination), next(counter), waitEnd, node, key))
+        return None
+
+    def __estimate(self, node, destination):
+        if self.__heuristic is None:
+            return 0
+        return self.__heuristic(node, destination)
+
+    @staticmethod
+    def __timeline(parents, key):
+        timeline = []
+        while key is not None:
+            parent, node, timePoint = parents[key]
+            timeline.append((node, timePoint))
+            key = parent
+        timeline.reverse()
+        return timeline
+
+    def __reserve(self, timeline, owner):
+        for i in range(0, len(timeline)):
+            node, timePoint = timeline[i]
+            end = timePoint + self.__waitStep if i + 1 < len(timeline) else math.inf
+            self.__reservations.reserveNode(node, timePoint, end, owner)
+            if i + 1 < len(timeline) and timeline[i + 1][0] != node:
+                self.__reservations.reserveEdge(node, timeline[i + 1][0], timePoint, timeline[i + 1][1], owner)
+
+
+def timelineToPath(timeline):
+    """
+    Drops waiting steps from planned timeline.
+    :return: List of nodes
+    """
+    path = []
+    for node, _ in timeline:
+        if len(path) == 0 or path[-1] != node:
+            path.append(node)
+    return path
+
+
+def timelineDepartures(timeline):
+    """
+    :return: Planned times of leaving every node of timelineToPath(timeline), including planned waits.
+             The last node is left at arrival.
+    """
+    departures = []
+    previous = None
+    for node, timePoint in timeline:
+        if node == previous:
+            departures[-1] = timePoint
+        else:
+            departures.append(timePoint)
+        previous = node
+    return departures
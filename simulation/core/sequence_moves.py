@@ -0,0 +1,167 @@
+"""
+Neighbourhood moves of tasks sequences with cost deltas in the distance model. Agents are assumed to take tasks
+in turn, so a task is followed by the task agentsNumber positions later and the cost of a sequence is the sum of
+empty travels between destination of a task and source of its follower. A move changes only the edges crossing
+boundaries of shifted or reversed ranges, so swap, relocate and or-opt deltas take O(agentsNumber) and 2-opt delta
+O(k + agentsNumber) for reversed segment of length k. Sequences are lists of indices of tasks.
+"""
+import math, random
+import numpy as np
+
+SWAP = 'swap'
+RELOCATE = 'relocate'
+TWO_OPT = 'twoOpt'
+OR_OPT = 'orOpt'
+MOVES = [SWAP, RELOCATE, TWO_OPT, OR_OPT]
+
+MAX_OR_OPT_LENGTH = 3
+MAX_TWO_OPT_LENGTH = 50
+
+
+class DistanceModel:
+    def __init__(self, costs, tasks, agentsNumber=1):
+        """
+        :param costs: Matrix of lowest travel costs between nodes, e.g. TravelCosts.matrix()
+        """
+        finite = costs[np.isfinite(costs)]
+        # Unreachable transitions cost more than any path, so deltas stay finite
+        unreachable = (np.max(finite) + 1) * len(costs) if len(finite) > 0 else 1.0
+        self.__costs = np.where(np.isfinite(costs), costs, unreachable).tolist()
+        self.__sources = [task.source() for task in tasks]
+        self.__destinations = [task.destination() for task in tasks]
+        self.stride = agentsNumber
+
+    def transition(self, first, second):
+        """
+        :param first: Index of task
+        :param second: Index of the task following it
+        """
+        return self.__costs[self.__destinations[first]][self.__sources[second]]
+
+    def cost(self, sequence):
+        return sum(self.transition(sequence[i], sequence[i + self.stride]) for i in range(0, len(sequence) - self.stride))
+
+
+class SequenceNeighbourhood:
+    """
+    Random moves are tuples (kind, i, j, length), they are drawn and evaluated without changing the sequence.
+    Relocate and or-opt moves insert segment [i, i + length) before position j of the original sequence.
+    """
+    def __init__(self, model: DistanceModel, generator=None):
+        self.__model = model
+        self.__random = generator if generator is not None else random
+
+    def randomMove(self, sequence):
+        n = len(sequence)
+        kind = self.__random.choice(MOVES)
+        if kind == SWAP:
+            i, j = sorted(self.__random.sample(range(0, n), 2))
+            return kind, i, j, 1
+        if kind == TWO_OPT:
+            i = self.__random.randint(0, n - 2)
+            return kind, i, self.__random.randint(i + 1, min(n - 1, i + MAX_TWO_OPT_LENGTH)), 1
+        length = 1 if kind == RELOCATE else self.__random.randint(1, min(MAX_OR_OPT_LENGTH, n - 1))
+        i = self.__random.randint(0, n - length)
+        # Positions within the segment and right after it leave the sequence unchanged
+        j = self.__random.randint(0, n - length - 1)
+        return kind, i, j if j < i else j + length + 1, length
+
+    def delta(self, sequence, move):
+        kind, i, j, length = move
+        stride = self.__model.stride
+        if kind == SWAP:
+            changed = lambda p: j if p == i else i if p == j else p
+            edges = self.__edgesTouching([i, j], len(sequence))
+            return self.__edgesDelta(sequence, edges, changed)
+        if kind == TWO_OPT:
+            changed = lambda p: i + j - p if i <= p <= j else p
+            return self.__edgesDelta(sequence, range(max(0, i - stride), min(j + 1, len(sequence) - stride)), changed)
+        return self.__segmentMoveDelta(sequence, i, j, length)
+
+    def apply(self, sequence, move):
+        kind, i, j, length = move
+        if kind == SWAP:
+            sequence[i], sequence[j] = sequence[j], sequence[i]
+        elif kind == TWO_OPT:
+            sequence[i:j + 1] = sequence[i:j + 1][::-1]
+        else:
+            segment = sequence[i:i + length]
+            del sequence[i:i + length]
+            position = j if j <= i else j - length
+            sequence[position:position] = segment
+
+    def __edgesTouching(self, positions, n):
+        stride = self.__model.stride
+        return set(a for p in positions for a in (p - stride, p) if 0 <= a < n - stride)
+
+    def __edgesDelta(self, sequence, edges, changed):
+        """
+        :param edges: Positions of tasks whose followers may change
+        :param changed: Maps positions of the changed sequence to positions of the original one
+        """
+        t, stride = self.__model.transition, self.__model.stride
+        return sum(t(sequence[changed(a)], sequence[changed(a + stride)]) - t(sequence[a], sequence[a + stride]) for a in edges)
+
+    def __segmentMoveDelta(self, sequence, i, j, length):
+        # Ranges between boundaries are only shifted, edges within them keep their tasks
+        if j < i:
+            oldBoundaries, newBoundaries = (j, i, i + length), (j, j + length, i + length)
+            changed = lambda p: i + p - j if j <= p < j + length else p - length if j + length <= p < i + length else p
+        else:
+            oldBoundaries, newBoundaries = (i, i + length, j), (i, j - length, j)
+            changed = lambda p: p + length if i <= p < j - length else i + p - j + length if j - length <= p < j else p
+        t = self.__model.transition
+        stride = self.__model.stride
+        old = sum(t(sequence[a], sequence[a + stride]) for a in self.__edgesCrossing(oldBoundaries, len(sequence)))
+        new = sum(t(sequence[changed(a)], sequence[changed(a + stride)]) for a in self.__edgesCrossing(newBoundaries, len(sequence)))
+        return new - old
+
+    def __edgesCrossing(self, boundaries, n):
+        stride = self.__model.stride
+        return set(a for boundary in boundaries for a in range(max(0, boundary - stride), min(boundary, n - stride)))
+
+
+class AdaptiveCooling:
+    """
+    Temperature follows target acceptance rate of uphill moves, which decays geometrically window by window.
+    Temperature is lowered when more moves were accepted in the last window than the target, raised otherwise.
+    """
+    def __init__(self, initialTemperature, initialAcceptance=0.5, finalAcceptance=0.001, acceptanceDecay=0.97,
+                 window=100, adjustment=0.8):
+        self.temperature = initialTemperature
+        self.targetAcceptance = initialAcceptance
+        self.__finalAcceptance = finalAcceptance
+        self.__acceptanceDecay = acceptanceDecay
+        self.__window = window
+        self.__adjustment = adjustment
+        self.__uphillMoves = 0
+        self.__acceptedUphillMoves = 0
+
+    @staticmethod
+    def initialTemperature(uphillDeltas, acceptance=0.5):
+        """
+        :return: Temperature at which uphill move of average size is accepted with given probability
+        """
+        if len(uphillDeltas) == 0:
+            return 1.0
+        return -(sum(uphillDeltas) / len(uphillDeltas)) / math.log(acceptance)
+
+    def accepts(self, delta, generator):
+        if delta <= 0:
+            return True
+        accepted = self.temperature > 0 and generator.random() < math.exp(-delta / self.temperature)
+        self.__onUphillMove(accepted)
+        return accepted
+
+    def __onUphillMove(self, accepted):
+        self.__uphillMoves += 1
+        self.__acceptedUphillMoves += accepted
+        if self.__uphillMoves < self.__window:
+            return
+        if self.__acceptedUphillMoves / self.__uphillMoves > self.targetAcceptance:
+            self.temperature *= self.__adjustment
+        else:
+            self.temperature /= math.sqrt(self.__adjustment)
+        self.targetAcceptance = max(self.__finalAcceptance, self.targetAcceptance * self.__acceptanceDecay)
+        self.__uphillMoves = 0
+        self.__acceptedUphillMoves = 0
@@ -0,0 +1,29 @@
+"""
+Checks that optimizers only reorder tasks. Sequences are compared as multisets of task numbers in linear time,
+without copying tasks. Validation can be disabled in production, where it only guards against optimizer bugs.
+"""
+from collections import Counter
+
+_enabled = True
+
+
+def setSequenceValidation(enabled):
+    global _enabled
+    _enabled = enabled
+
+
+def sequenceValidationEnabled():
+    return _enabled
+
+
+def missingTaskNumber(sequence, reference):
+    """
+    :return: Number of a task from sequence which reference doesn't hold (as many times), None when there is none
+    """
+    counts = Counter(task.taskNumber() for task in reference)
+    for task in sequence:
+        taskNumber = task.taskNumber()
+        if counts[taskNumber] == 0:
+            return taskNumber
+        counts[taskNumber] -= 1
+    return None
@@ -1,56 +1,109 @@
+import numpy as np
 from simulation.core.traverser_base import *
+from simulation.core.sequence_moves import DistanceModel, SequenceNeighbourhood, AdaptiveCooling
+from simulation.core.travel_costs import TravelCosts
+
+# States of the annealing chain evaluated together
+DEFAULT_BATCH_SIZE = 8
+# Moves of the chain between evaluated states
+DEFAULT_MOVES_PER_TASK = 10
+# Random moves sampled to estimate the initial temperature
+TEMPERATURE_SAMPLES = 100
 
 
 class SimulatedAnnealingTraverser(TraverserBase):
-    def __init__(self, system):
-        super().__init__(system)
-        self.__temperaturePoint = 0
-        self.__temperatureStep = 0.01
-
-    def __generateSequence(self):
-        self._currentSequence = copy.deepcopy(self._bestSequence)
-        self.__modifySequence()
-        self._tmpSequence = copy.deepcopy(self._currentSequence)
-
-    def __modifySequence(self):
-        swaps = max(1, int(len(self._currentSequence) * 0.1))
-        for i in range(0, swaps):
-            pos1 = random.randint(0, len(self._currentSequence)-1)
-            pos2 = random.randint(0, len(self._currentSequence) - 1)
-            while pos1 == pos2:
-                pos2 = random.randint(0, len(self._currentSequence)-1)
-            self._currentSequence[pos1], self._currentSequence[pos2] = self._currentSequence[pos2], self._currentSequence[pos1]
+    """
+    Annealing chain moves through the neighbourhood of swaps, relocations, 2-opt and or-opt moves, which are accepted
+    by their cost deltas in the distance model, without simulation. Temperature adapts to acceptance rate of uphill moves.
+    Chain states are simulated every movesPerTask * n moves, the best simulated one is kept.
+    """
+    def __init__(self, system, batchSize=DEFAULT_BATCH_SIZE, movesPerTask=DEFAULT_MOVES_PER_TASK, agentsNumber=1,
+                 travelCosts: TravelCosts = None, seed=None):
+        super().__init__(system, seed)
+        self.__agentsNumber = agentsNumber
+        self.__batchSize = batchSize
+        self.__movesPerTask = movesPerTask
+        self.__travelCosts = travelCosts
+        self.__neighbourhood = None
+        self.__cooling = None
+        self.__tasks = []
+        self.__chainOrder = []
+        self.__currentOrder = []
+        self.__bestOrder = []
+        self.__candidates = []
+
+    def assignSequence(self, sequence):
+        super().assignSequence(sequence)
+        self.__tasks = self._currentSequence
+        self.__currentOrder = list(range(0, len(sequence)))
+        self.__bestOrder = self.__currentOrder
+        self.__chainOrder = list(self.__currentOrder)
+        if self.__travelCosts is None:
+            # Computed once, the matrix follows changes of edge weights
+            self.__travelCosts = TravelCosts(self.system)
+        self.__neighbourhood = SequenceNeighbourhood(DistanceModel(self.__travelCosts.matrix(), self.__tasks, self.__agentsNumber), self._random)
+        self.__cooling = AdaptiveCooling(AdaptiveCooling.initialTemperature(self.__uphillDeltas()))
+
+    def __uphillDeltas(self):
+        if len(self.__chainOrder) < 2:
+            return []
+        deltas = [self.__neighbourhood.delta(self.__chainOrder, self.__neighbourhood.randomMove(self.__chainOrder))
+                  for _ in range(0, TEMPERATURE_SAMPLES)]
+        return [delta for delta in deltas if delta > 0]
+
+    def __anneal(self):
+        """
+        :return: Copy of the chain state after movesPerTask moves per task
+        """
+        order = self.__chainOrder
+        if len(order) >= 2:
+            for _ in range(0, self.__movesPerTask * len(order)):
+                move = self.__neighbourhood.randomMove(order)
+                if self.__cooling.accepts(self.__neighbourhood.delta(order, move), self._random):
+                    self.__neighbourhood.apply(order, move)
+        return list(order)
+
+    def __setCurrentOrder(self, order):
+        self.__currentOrder = order
+        self._currentSequence = [self.__tasks[i] for i in order]
+        self._tmpSequence = list(self._currentSequence)
 
     def nextIteration(self):
-        self.__performStateTransition()
-        self.__generateSequence()
-        self.__temperaturePoint += self.__temperatureStep
+        self.__onEvaluated()
+        self.__setCurrentOrder(self.__anneal())
         self._currentCost = 0
         self._currentStatistics = TraverserStatistics(0, 0, 0, 0)
 
     def feedback(self, cost, collisions, timeInQueue, timeInPenalty, timeInTransition):
         super().feedback(cost, collisions, timeInQueue, timeInPenalty, timeInTransition)
 
-    def __performStateTransition(self):
-        if self._bestCost == -1:
-            self._acceptCurrentSolution()
-        else:
-            if random.random() < self.__transitionProbability(currentEnergy=self._bestCost, newEnergy=self._currentCost):
-                self._acceptCurrentSolution()
-
-    def __transitionProbability(self, currentEnergy, newEnergy):
-        upwardsTransitionProbability = self.__temperature()
-        if newEnergy > currentEnergy:
-            return upwardsTransitionProbability
-        return 1 - upwardsTransitionProbability
-
-    def __temperatureFunction(self, x):
-        f1 = math.exp(-x)
-        f2 = math.cos(x*x)**2
-        f3 = 1.5*x + 0.75
-        f4 = 0.25
-        return f1*f2*f3*f4
-
-    def __temperature(self):
-        return self.__temperatureFunction(self.__temperaturePoint)
+    def candidates(self):
+        # Initial sequence is evaluated first, as in sequential iterations
+        first = [self.__bestOrder] if self._bestCost == -1 else []
+        generated = self.__batchSize if self._surrogate is None else int(math.ceil(self.__batchSize / self._simulatedFraction))
+        states = [self.__anneal() for _ in range(len(first), generated)]
+        if self._surrogate is not None and len(states) > 0:
+            # States with the lowest estimates are simulated, in order of estimates
+            estimates = self._surrogate.costs(self.__tasks, np.array(states))
+            self._budget.surrogateEvaluations += len(states)
+            states = [states[i] for i in np.argsort(estimates, kind='stable')[0: self.__batchSize - len(first)]]
+        self.__candidates = first + states
+        return np.array(self.__candidates, dtype=np.int32)
 
+    def batchFeedback(self, results):
+        self._budget.simulatedEvaluations += len(results)
+        for order, result in zip(self.__candidates, results):
+            self.__setCurrentOrder(order)
+            self._currentCost = result[0]
+            self._currentStatistics = TraverserStatistics(*result[1:])
+            self.__onEvaluated()
+        self._currentCost = 0
+        self._currentStatistics = TraverserStatistics(0, 0, 0, 0)
+
+    def _acceptCurrentSolution(self):
+        super()._acceptCurrentSolution()
+        self.__bestOrder = self.__currentOrder
+
+    def __onEvaluated(self):
+        if self._bestCost == -1 or self._currentCost < self._bestCost:
+            self._acceptCurrentSolution()
@@ -0,0 +1,70 @@
+"""
+Analytic estimate of simulated cost of candidate sequences, used to pre-screen candidates before SimPy evaluation.
+"""
+import numpy as np
+from simulation.core.travel_costs import TravelCosts
+
+
+class SurrogateCostModel:
+    """
+    Deterministic list scheduling of all candidates at once. The next task of a sequence goes to the agent which
+    becomes free first, it travels the lowest cost path to the source, is served there and at the destination.
+    Nodes serve one agent at a time, an agent arriving at a busy node waits until it's free. Random timeouts
+    are replaced by their means and collision penalties are left out.
+    """
+    def __init__(self, system, agentsNumber=1, travelCosts: TravelCosts = None):
+        self.__travelCosts = travelCosts if travelCosts is not None else TravelCosts(system)
+        self.__agentsNumber = agentsNumber
+        self.__serviceTimes = np.array([getattr(system.node(i), 'serviceTime', 0) for i in range(0, system.nodesCount())], dtype=np.float64)
+
+    def costs(self, tasks, candidates):
+        """
+        :param tasks: Sequence of Task, candidates are permutations of its indices
+        :param candidates: pool x n array of candidates
+        :return: Array of estimated costs, sums of tasks durations as reported by simulated agents
+        """
+        travel = self.__travelCosts.matrix()
+        candidates = np.asarray(candidates, dtype=np.int64)
+        pool, n = candidates.shape
+        sources = np.array([task.source() for task in tasks], dtype=np.int64)[candidates]
+        destinations = np.array([task.destination() for task in tasks], dtype=np.int64)[candidates]
+
+        rows = np.arange(0, pool)
+        agentsFree = np.zeros((pool, self.__agentsNumber))
+        # Agents start at the source of their first task
+        agentsLocations = np.full((pool, self.__agentsNumber), -1, dtype=np.int64)
+        nodesFree = np.zeros((pool, len(self.__serviceTimes)))
+        res = np.zeros(pool)
+        for k in range(0, n):
+            agents = np.argmin(agentsFree, axis=1)
+            start = agentsFree[rows, agents]
+            locations = agentsLocations[rows, agents]
+            source, destination = sources[:, k], destinations[:, k]
+
+            arrival = start + np.where(locations < 0, 0.0, travel[np.maximum(locations, 0), source])
+            leaving = np.maximum(arrival, nodesFree[rows, source]) + self.__serviceTimes[source]
+            nodesFree[rows, source] = leaving
+            arrival = leaving + travel[source, destination]
+            end = np.maximum(arrival, nodesFree[rows, destination]) + self.__serviceTimes[destination]
+            nodesFree[rows, destination] = end
+
+            agentsFree[rows, agents] = end
+            agentsLocations[rows, agents] = destination
+            res += end - start
+        return res
+
+
+def screenedCosts(estimates, simulated, simulatedCosts):
+    """
+    Costs of all candidates when only some of them were simulated. Candidates left out are ranked after
+    all simulated ones by their estimates, scaled to simulated costs.
+    :param simulated: Indices of simulated candidates, they have the lowest estimates
+    """
+    res = np.empty(len(estimates))
+    res[simulated] = simulatedCosts
+    left = np.ones(len(estimates), dtype=bool)
+    left[simulated] = False
+    meanEstimate = np.mean(estimates[simulated])
+    scale = np.mean(simulatedCosts) / meanEstimate if meanEstimate > 0 else 1.0
+    res[left] = np.max(simulatedCosts) + (estimates[left] - np.max(estimates[simulated])) * scale
+    return res
@@ -1,13 +1,93 @@
-try:
-    from igraph import Graph
-except ModuleNotFoundError:
-    print("Please install igraph module: python -m pip install igraph")
-    from graph.graph import Graph
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def graphClass():
+    """
+    Graph backend resolved on first System construction, so importing simulation modules doesn't load igraph.
+    """
+    try:
+        from igraph import Graph
+    except ModuleNotFoundError:
+        print("Please install igraph module: python -m pip install igraph")
+        from graph.graph import Graph
+        return Graph
+
+    class VersionedGraph(Graph):
+        """
+        Counts writes of edge weights through graph[source, destination] and added edges, like the fallback backends.
+        """
+        weightsVersion = 0
+
+        def __setitem__(self, key, value):
+            super().__setitem__(key, value)
+            self.weightsVersion += 1
+
+        def add_edge(self, *args, **kwargs):
+            res = super().add_edge(*args, **kwargs)
+            self.weightsVersion += 1
+            return res
+
+        def add_edges(self, *args, **kwargs):
+            res = super().add_edges(*args, **kwargs)
+            self.weightsVersion += 1
+            return res
+    return VersionedGraph
 
 
 class System:
     def __init__(self):
-        self.graph = Graph()
+        self.graph = graphClass()()
+        self.__topologyVersion = 0
+        self.__featuresVersion = 0
+        self.__graphData = None
+        self.__graphDataVersion = None
+        self.__graphArrays = None
+        self.__graphArraysVersion = None
+
+    def compact(self):
+        """
+        Replaces built topology with array backed CsrGraph, keeping node and edge ids.
+        """
+        from graph.csr_graph import CsrGraph
+        self.graph = CsrGraph.fromGraph(self.graph)
+        self.__topologyVersion += 1
+
+    @property
+    def graph_data(self):
+        """
+        Topology as torch_geometric Data for GNN consumers, rebuilt after weights or features change.
+        """
+        from model.gnn_model import graphData  # torch is imported only when GNN is used
+        if self.__graphDataVersion != self.graphDataVersion():
+            self.__graphData = graphData(self)
+            self.__graphDataVersion = self.graphDataVersion()
+        return self.__graphData
+
+    def graphArrays(self):
+        """
+        Node features matrix and edge index as NumPy arrays, rebuilt after weights or features change.
+        """
+        from model.gnn_runtime import graphArrays
+        if self.__graphArraysVersion != self.graphDataVersion():
+            self.__graphArrays = graphArrays(self)
+            self.__graphArraysVersion = self.graphDataVersion()
+        return self.__graphArrays
+
+    def graphDataVersion(self):
+        return self.__topologyVersion, self.__featuresVersion
+
+    def nodeFeatures(self, index):
+        try:
+            features = self.graph.vs[index]['features']
+        except KeyError:
+            features = None
+        # Attribute set for one vertex is None for the others
+        return features if features is not None else [1.0]
+
+    def setNodeFeatures(self, index, features):
+        self.graph.vs[index]['features'] = features
+        self.__featuresVersion += 1
 
     def node(self, index):
         return self.graph.vs[index]['node']
@@ -15,6 +95,17 @@ class System:
     def edgeWeight(self, source, destination):
         return self.graph[source, destination]
 
+    def setEdgeWeight(self, source, destination, weight):
+        self.graph[source, destination] = weight
+        self.__topologyVersion += 1
+
+    def topologyVersion(self):
+        # Weights written directly to the graph are counted by the graph itself
+        return self.__topologyVersion, self.graph.weightsVersion
+
+    def edgeId(self, source, destination):
+        return self.graph.get_eid(source, destination)
+
     def edgeAgents(self, source, destination):
         edge = self.graph.es[self.graph.get_eid(source, destination)]
         return edge['agents']
@@ -1,19 +1,44 @@
 class Task:
-    def __init__(self, taskNumber, source, destination, taskId = -1):
+    def __init__(self, taskNumber, source, destination, taskId = -1, orderPriority = 0, requiredOutputTime = None):
         self.__taskNumber = taskNumber
         self.__source = source
         self.__destination = destination
         self.__taskId = taskId
+        self.__optimizedPath = None
+        self.__orderPriority = orderPriority
+        self.__requiredOutputTime = requiredOutputTime
 
     def setTaskId(self, taskId):
         self.__taskId = taskId
 
+    def setOrderRequirements(self, orderPriority, requiredOutputTime):
+        self.__orderPriority = orderPriority
+        self.__requiredOutputTime = requiredOutputTime
+
+    def orderPriority(self):
+        """
+        :return: Priority of MES order, higher is more urgent
+        """
+        return self.__orderPriority
+
+    def requiredOutputTime(self):
+        """
+        :return: Deadline of MES order as POSIX timestamp, None when order has no deadline
+        """
+        return self.__requiredOutputTime
+
     def source(self):
         return self.__source
 
     def destination(self):
         return self.__destination
 
+    def setOptimizedPath(self, path):
+        self.__optimizedPath = path
+
+    def optimizedPath(self):
+        return self.__optimizedPath
+
     def taskNumber(self):
         return self.__taskNumber
 
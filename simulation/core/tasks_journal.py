@@ -0,0 +1,254 @@
+"""
+Write-ahead log of TasksQueue and executors assignments, so tasks received from MES survive TMS restart.
+Records are appended in memory and written with a single fsync per flush interval by a background thread.
+The log is compacted into a snapshot of the whole state after the queue optimization, when enough records were written.
+"""
+import json, os, threading, time
+from collections import Counter
+from simulation.core.task import Task
+
+SNAPSHOT_FILENAME = 'snapshot.json'
+LOG_FILENAME = 'journal.log'
+
+DEFAULT_FLUSH_INTERVAL = 0.05
+DEFAULT_SNAPSHOT_INTERVAL = 10000
+
+ENQUEUED = 'e'
+OPTIMIZATION_STARTED = 's'
+REORDERED = 'r'
+POPPED = 'p'
+JOB_ASSIGNED = 'a'
+JOB_FINISHED = 'f'
+
+
+def serializeTask(task):
+    return [task.taskNumber(), task.source(), task.destination(), task.taskId(), task.orderPriority(), task.requiredOutputTime()]
+
+
+def deserializeTask(fields):
+    return Task(*fields)
+
+
+def reorderedPositions(tasks, newSequence):
+    """
+    Tasks are matched by task number and occurrence, as by sequence validation, so optimizers may return copies of tasks.
+    :return: Positions in tasks of every task of newSequence
+    """
+    positions = dict()
+    for i, task in enumerate(tasks):
+        positions.setdefault(task.taskNumber(), []).append(i)
+    occurrences = Counter()
+    res = []
+    for task in newSequence:
+        taskNumber = task.taskNumber()
+        res.append(positions[taskNumber][occurrences[taskNumber]])
+        occurrences[taskNumber] += 1
+    return res
+
+
+def sameTask(task, other):
+    return task.taskNumber() == other.taskNumber() and task.taskId() == other.taskId()
+
+
+class TasksJournal:
+    """
+    Records are lost only when TMS crashes within flushInterval after they were made.
+    """
+    def __init__(self, directory, flushInterval=DEFAULT_FLUSH_INTERVAL, snapshotInterval=DEFAULT_SNAPSHOT_INTERVAL):
+        self.__directory = directory
+        self.__flushInterval = flushInterval
+        self.__snapshotInterval = snapshotInterval
+        self.__sequenceNumber = 0
+        self.__snapshotSequenceNumber = 0
+        self.__records = []
+        self.__snapshot = None
+        self.__assignments = dict()
+        self.__log = None
+        self.__working = False
+        self.__thread = None
+        self.__lock = threading.Lock()
+
+    def recover(self, queue):
+        """
+        Replays snapshot and log into an empty queue. Jobs which were assigned to executors when TMS stopped
+        and tasks popped without being assigned are enqueued again, executors have to be assigned anew.
+        """
+        os.makedirs(self.__directory, exist_ok=True)
+        tasks, pendingTasks, cost = [], [], -1
+        snapshotPath = os.path.join(self.__directory, SNAPSHOT_FILENAME)
+        if os.path.exists(snapshotPath):
+            with open(snapshotPath, 'r') as f:
+                snapshot = json.load(f)
+            self.__sequenceNumber = snapshot['sequenceNumber']
+            tasks = [deserializeTask(fields) for fields in snapshot['tasks']]
+            pendingTasks = [deserializeTask(fields) for fields in snapshot['pendingTasks']]
+            cost = snapshot['cost']
+            self.__snapshotSequenceNumber = self.__sequenceNumber
+            self.__assignments = {executorId: [deserializeTask(fields) for fields in job] for executorId, job in snapshot['assignments']}
+        queue.restore(tasks, pendingTasks, cost)
+
+        poppedTasks = []
+        enqueuedTasks = []
+        for record in self.__readLog():
+            if record[0] <= self.__sequenceNumber:
+                continue
+            self.__sequenceNumber = record[0]
+            kind = record[1]
+            if kind == ENQUEUED:
+                # Consecutive enqueues are merged, so replay doesn't copy pending tasks for every one of them
+                enqueuedTasks.extend(deserializeTask(fields) for fields in record[2])
+                continue
+            if len(enqueuedTasks) > 0:
+                queue.batchEnqueue(enqueuedTasks)
+                enqueuedTasks = []
+            if kind == OPTIMIZATION_STARTED:
+                queue.onOptimizationStart()
+            elif kind == REORDERED:
+                currentTasks = queue.tasksList()
+                queue.onOptimizationFeedback([currentTasks[index] for index in record[2]], record[3])
+            elif kind == POPPED:
+                poppedTasks.append(queue.popTask())
+            elif kind == JOB_ASSIGNED:
+                job = [deserializeTask(fields) for fields in record[3]]
+                self.__assignments[record[2]] = job
+                for task in job:
+                    poppedTasks = self.__withoutTask(poppedTasks, task)
+            elif kind == JOB_FINISHED:
+                self.__assignments.pop(record[2], None)
+        if len(enqueuedTasks) > 0:
+            queue.batchEnqueue(enqueuedTasks)
+
+        interruptedTasks = poppedTasks + [task for job in self.__assignments.values() for task in job]
+        self.__assignments = dict()
+        if len(interruptedTasks) > 0:
+            queue.batchEnqueue(interruptedTasks)
+        # Recovered state is compacted on the first flush, so interrupted jobs aren't replayed again
+        state = queue.snapshot()
+        self.snapshot(state.tasks, state.pendingTasks, state.cost)
+
+    def start(self):
+        os.makedirs(self.__directory, exist_ok=True)
+        self.__log = open(os.path.join(self.__directory, LOG_FILENAME), 'a')
+        self.__working = True
+        self.__thread = threading.Thread(target=self.__flushPeriodically)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def close(self):
+        self.__working = False
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        self.__flush()
+        if self.__log is not None:
+            self.__log.close()
+            self.__log = None
+
+    def onEnqueued(self, tasks):
+        self.__append(ENQUEUED, tasks)
+
+    def onOptimizationStarted(self):
+        self.__append(OPTIMIZATION_STARTED)
+
+    def onReordered(self, indices, cost):
+        """
+        :param indices: Positions of reordered tasks in the queue before reordering
+        """
+        self.__append(REORDERED, indices, cost)
+
+    def onPopped(self):
+        self.__append(POPPED)
+
+    def onJobAssigned(self, executorId, job):
+        with self.__lock:
+            self.__assignments[executorId] = list(job)
+            self.__appendRecord(JOB_ASSIGNED, executorId, job)
+
+    def onJobFinished(self, executorId):
+        with self.__lock:
+            if self.__assignments.pop(executorId, None) is not None:
+                self.__appendRecord(JOB_FINISHED, executorId)
+
+    def snapshotDue(self):
+        return self.__sequenceNumber - self.__snapshotSequenceNumber >= self.__snapshotInterval
+
+    def snapshot(self, tasks, pendingTasks, cost):
+        """
+        Schedules compaction of the log. Must be called while the queue doesn't change, so its state matches the last record.
+        """
+        with self.__lock:
+            self.__snapshotSequenceNumber = self.__sequenceNumber
+            self.__snapshot = (self.__sequenceNumber, tuple(tasks), tuple(pendingTasks), cost,
+                               [(executorId, list(job)) for executorId, job in self.__assignments.items()])
+
+    def __append(self, kind, *payload):
+        with self.__lock:
+            self.__appendRecord(kind, *payload)
+
+    def __appendRecord(self, kind, *payload):
+        # Tasks are serialized when flushed, so recording doesn't slow down queue operations
+        self.__sequenceNumber += 1
+        self.__records.append((self.__sequenceNumber, kind) + payload)
+
+    def __flushPeriodically(self):
+        while self.__working:
+            self.__flush()
+            time.sleep(self.__flushInterval)
+
+    def __flush(self):
+        if self.__log is None:
+            return
+        with self.__lock:
+            records, self.__records = self.__records, []
+            snapshot, self.__snapshot = self.__snapshot, None
+        if snapshot is not None:
+            self.__writeSnapshot(snapshot)
+            # Records made before the snapshot are already held by it
+            records = [record for record in records if record[0] > snapshot[0]]
+        if len(records) > 0:
+            self.__log.write(''.join(json.dumps(self.__serialize(record)) + '\n' for record in records))
+            self.__log.flush()
+            os.fsync(self.__log.fileno())
+
+    def __writeSnapshot(self, snapshot):
+        sequenceNumber, tasks, pendingTasks, cost, assignments = snapshot
+        path = os.path.join(self.__directory, SNAPSHOT_FILENAME)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'sequenceNumber': sequenceNumber,
+                       'tasks': [serializeTask(task) for task in tasks],
+                       'pendingTasks': [serializeTask(task) for task in pendingTasks],
+                       'cost': cost,
+                       'assignments': [(executorId, [serializeTask(task) for task in job]) for executorId, job in assignments]}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+        # Logged records are older than the snapshot and skipped by recovery, so crash before truncation is harmless
+        self.__log.truncate(0)
+
+    @staticmethod
+    def __serialize(record):
+        kind = record[1]
+        if kind == ENQUEUED:
+            return [record[0], kind, [serializeTask(task) for task in record[2]]]
+        if kind == JOB_ASSIGNED:
+            return [record[0], kind, record[2], [serializeTask(task) for task in record[3]]]
+        return list(record)
+
+    def __readLog(self):
+        path = os.path.join(self.__directory, LOG_FILENAME)
+        if not os.path.exists(path):
+            return
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Record torn by crash during write, nothing after it was flushed
+                    return
+
+    @staticmethod
+    def __withoutTask(tasks, task):
+        for i in range(0, len(tasks)):
+            if sameTask(tasks[i], task):
+                return tasks[:i] + tasks[i + 1:]
+        return tasks
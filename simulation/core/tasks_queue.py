@@ -1,4 +1,123 @@
-import copy, threading
+import heapq, itertools, math, threading
+from collections import deque
+from dataclasses import dataclass
+from simulation.core.sequence_validation import sequenceValidationEnabled, missingTaskNumber
+from simulation.core.tasks_journal import reorderedPositions
+
+CHANGES_HISTORY = 1024
+
+FIFO = 'fifo'
+PRIORITY = 'priority'
+EARLIEST_DEADLINE_FIRST = 'earliestDeadlineFirst'
+
+ENQUEUED = 'enqueued'
+OPTIMIZATION_STARTED = 'optimizationStarted'
+REORDERED = 'reordered'
+POPPED = 'popped'
+
+
+@dataclass(frozen=True)
+class QueueSnapshot:
+    version: int
+    tasks: tuple
+    pendingTasks: tuple
+    cost: float
+
+
+@dataclass(frozen=True)
+class QueueChange:
+    """
+    ENQUEUED: tasks appended to pending tasks, OPTIMIZATION_STARTED: all pending tasks moved to the end of the queue,
+    REORDERED: queue replaced with tasks in dispatch order, POPPED: tasks removed from the front of the queue.
+    """
+    version: int
+    kind: str
+    tasks: tuple
+
+
+def deadline(task):
+    return task.requiredOutputTime() if task.requiredOutputTime() is not None else math.inf
+
+
+def priorityKey(task):
+    return -task.orderPriority(), deadline(task)
+
+
+def deadlineKey(task):
+    return deadline(task), -task.orderPriority()
+
+
+class FifoOrder:
+    appendsTasks = True
+
+    def __init__(self):
+        self.__tasks = deque()
+
+    def extend(self, tasks):
+        self.__tasks.extend(tasks)
+
+    def replace(self, tasks):
+        self.__tasks = deque(tasks)
+
+    def pop(self):
+        return self.__tasks.popleft()
+
+    def first(self, count):
+        return list(itertools.islice(self.__tasks, count))
+
+    def tasks(self):
+        return tuple(self.__tasks)
+
+    def constrained(self, sequence):
+        return sequence
+
+    def __len__(self):
+        return len(self.__tasks)
+
+
+class HeapOrder:
+    """
+    Tasks ordered by key of MES order requirements, ties are kept in order given by optimizer or in arrival order.
+    """
+    appendsTasks = False
+
+    def __init__(self, key):
+        self.__key = key
+        self.__heap = []
+        self.__counter = itertools.count()
+
+    def extend(self, tasks):
+        for task in tasks:
+            heapq.heappush(self.__heap, (self.__key(task), next(self.__counter), task))
+
+    def replace(self, tasks):
+        self.__heap = [(self.__key(task), next(self.__counter), task) for task in tasks]
+        heapq.heapify(self.__heap)
+
+    def pop(self):
+        return heapq.heappop(self.__heap)[2]
+
+    def first(self, count):
+        entries = [heapq.heappop(self.__heap) for _ in range(0, min(count, len(self.__heap)))]
+        for entry in entries:
+            heapq.heappush(self.__heap, entry)
+        return [entry[2] for entry in entries]
+
+    def tasks(self):
+        return tuple(entry[2] for entry in sorted(self.__heap))
+
+    def constrained(self, sequence):
+        return sorted(sequence, key=self.__key)
+
+    def __len__(self):
+        return len(self.__heap)
+
+
+ORDERS = {
+    FIFO: FifoOrder,
+    PRIORITY: lambda: HeapOrder(priorityKey),
+    EARLIEST_DEADLINE_FIRST: lambda: HeapOrder(deadlineKey)
+}
 
 
 class TasksQueueView:
@@ -14,70 +133,159 @@ class TasksQueueView:
     def pendingTasksList(self):
         return self.queue.pendingTasksList()
 
+    def size(self):
+        return self.queue.size()
+
+    def pendingSize(self):
+        return self.queue.pendingSize()
+
+    def snapshot(self):
+        return self.queue.snapshot()
+
+    def changesSince(self, version):
+        return self.queue.changesSince(version)
+
 
 class TasksQueue:
-    def __init__(self):
-        self.__queue = list()
-        self.__pendingTasks = list()
+    """
+    Queue of optimized tasks and tasks pending until the next optimization. In FIFO mode tasks are dispatched
+    in order given by optimizer, PRIORITY and EARLIEST_DEADLINE_FIRST modes keep them in a heap, so enqueue and pop
+    take O(log n) and optimizer order only breaks ties of MES order requirements.
+    Every change bumps version and is recorded, observers may ask only for changes since the version they have seen.
+    Immutable snapshots are built once per version, when first requested.
+    Changes are recorded in TasksJournal when one is set, so the queue can be recovered after restart.
+    """
+    def __init__(self, mode=FIFO):
+        self.__journal = None
+        self.__order = ORDERS[mode]()
+        self.__pendingTasks = tuple()
         self.__cost = -1
+        self.__version = 0
+        self.__snapshot = None
+        self.__changes = deque(maxlen=CHANGES_HISTORY)
         self.__lock = threading.Lock()
 
-    def enqueue(self, task):
+    def setJournal(self, journal):
+        self.__journal = journal
+
+    def restore(self, tasks, pendingTasks, cost):
         with self.__lock:
-            self.__pendingTasks.append(task)
+            self.__order.replace(tasks)
+            self.__pendingTasks = tuple(pendingTasks)
+            self.__cost = cost
+            self.__changed(REORDERED, self.__order.tasks())
+
+    def enqueue(self, task):
+        self.batchEnqueue([task])
 
     def batchEnqueue(self, tasks):
         with self.__lock:
-            self.__pendingTasks.extend(tasks)
+            tasks = tuple(tasks)
+            self.__pendingTasks = self.__pendingTasks + tasks
+            self.__changed(ENQUEUED, tasks)
+            if self.__journal is not None:
+                self.__journal.onEnqueued(tasks)
 
     def onOptimizationStart(self):
+        """
+        :return: Tuple of pending tasks moved to the queue
+        """
         with self.__lock:
-            self.__queue.extend(self.__pendingTasks)
-            self.__pendingTasks = list()
+            moved = self.__pendingTasks
+            if len(moved) > 0:
+                self.__order.extend(moved)
+                self.__pendingTasks = tuple()
+                self.__changed(OPTIMIZATION_STARTED, moved)
+                if self.__journal is not None:
+                    self.__journal.onOptimizationStarted()
+                if not self.__order.appendsTasks:
+                    # Moved tasks are placed by their requirements, not appended
+                    self.__changed(REORDERED, self.__order.tasks())
+            return moved
 
     def onOptimizationFeedback(self, newSequence, cost):
-        self.__validateNewSequence(newSequence)
-        self.__queue = newSequence
-        self.__cost = cost
+        with self.__lock:
+            self.__validateNewSequence(newSequence)
+            if self.__journal is not None:
+                self.__journal.onReordered(reorderedPositions(self.__order.tasks(), newSequence), cost)
+            self.__order.replace(newSequence)
+            self.__cost = cost
+            self.__changed(REORDERED, self.__order.tasks())
 
     def onOptimizationFinished(self):
-        pass
+        # Log is compacted between optimizations, off the enqueue and dispatch path
+        if self.__journal is not None and self.__journal.snapshotDue():
+            with self.__lock:
+                self.__journal.snapshot(self.__order.tasks(), self.__pendingTasks, self.__cost)
+
+    def constrainedSequence(self, sequence):
+        """
+        Reorders sequence proposed by optimizer to respect priorities and deadlines of the queue mode.
+        """
+        return self.__order.constrained(sequence)
 
     def __validateNewSequence(self, newSequence):
-        if len(newSequence) != len(self.__queue):
-            raise Exception("Queue corruption during optimization, old: {}, new: {}".format(len(self.__queue), len(newSequence)))
-        tmp = copy.deepcopy(newSequence)
-        for task in self.__queue:
-            index = -1
-            for i in range(0, len(tmp)):
-                if task.taskNumber() == tmp[i].taskNumber():
-                    index = i
-                    break
-            if index == -1:
-                raise Exception("Queue corruption during optimization, missing item: {}".format(task.taskNumber()))
-            else:
-                tmp.pop(index)
+        if not sequenceValidationEnabled():
+            return
+        if len(newSequence) != len(self.__order):
+            raise Exception("Queue corruption during optimization, old: {}, new: {}".format(len(self.__order), len(newSequence)))
+        missing = missingTaskNumber(self.__order.tasks(), newSequence)
+        if missing is not None:
+            raise Exception("Queue corruption during optimization, missing item: {}".format(missing))
+
+    def __changed(self, kind, tasks):
+        self.__version += 1
+        self.__changes.append(QueueChange(self.__version, kind, tasks))
+
+    def snapshot(self) -> QueueSnapshot:
+        with self.__lock:
+            if self.__snapshot is None or self.__snapshot.version != self.__version:
+                self.__snapshot = QueueSnapshot(self.__version, self.__order.tasks(), self.__pendingTasks, self.__cost)
+            return self.__snapshot
+
+    def changesSince(self, version):
+        """
+        :return: List of QueueChange newer than version, None when they are no longer recorded and snapshot must be taken
+        """
+        with self.__lock:
+            if version == self.__version:
+                return []
+            if len(self.__changes) == 0 or self.__changes[0].version > version + 1:
+                return None
+            return [change for change in self.__changes if change.version > version]
 
     def tasksList(self):
-        return copy.deepcopy(self.__queue)
+        return list(self.snapshot().tasks)
 
     def pendingTasksList(self):
-        return copy.deepcopy(self.__pendingTasks)
+        return list(self.__pendingTasks)
 
     def size(self):
-        return len(self.__queue)
+        return len(self.__order)
+
+    def pendingSize(self):
+        return len(self.__pendingTasks)
 
     def queueView(self):
         return TasksQueueView(self)
 
     def popTask(self):
-        return self.__queue.pop(0)
+        with self.__lock:
+            task = self.__order.pop()
+            self.__changed(POPPED, (task,))
+            if self.__journal is not None:
+                self.__journal.onPopped()
+            return task
 
     def nextTask(self):
-        return self.__queue[0]
+        return self.nextTasks(1)[0]
+
+    def nextTasks(self, count):
+        with self.__lock:
+            return self.__order.first(count)
 
     def empty(self):
-        return len(self.__queue) == 0
+        return len(self.__order) == 0
 
     def cost(self):
-        return self.__cost
\ No newline at end of file
+        return self.__cost
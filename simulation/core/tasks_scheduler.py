@@ -44,32 +44,17 @@ class TasksScheduler:
     # Dispatch tasks based on the GNN-optimized sequence and path evaluation
     def dispatchTasks(self):
         free_executors = self.__executorsManager.freeExecutorsNumber()
-        for _ in range(0, free_executors):
-            if not self.__queueOptimizer.queue().empty():
-                task = self.__queueOptimizer.queue().nextTask()
+        tasks = self.__queueOptimizer.queue().nextTasks(free_executors)
 
-                # Get the best path for the task using the GNN-enhanced multi-path evaluation
-                source, destination = task.getSource(), task.getDestination()
-                k_shortest_paths = self.__queueOptimizer._QueueOptimizer__system.graph.get_k_shortest_paths(source, destination, k=3)
+        # Get the best paths for all dispatched tasks using single GNN-enhanced multi-path evaluation
+        for task, best_path in zip(tasks, self.__queueOptimizer.bestPaths(tasks)):
+            task.setOptimizedPath(best_path)
 
-                # Evaluate paths using GNN
-                best_path = None
-                min_cost = float('inf')
-                for path in k_shortest_paths:
-                    path_tensor = self.__queueOptimizer._prepare_path_tensor(path)  # Prepare tensor for GNN evaluation
-                    predicted_cost = self.__queueOptimizer._QueueOptimizer__gnn_model(path_tensor)  # Predict cost
-
-                    if predicted_cost < min_cost:
-                        min_cost = predicted_cost
-                        best_path = path
-
-                # Assign the best path to the task
-                task.setOptimizedPath(best_path)
-
-                # Assign the task to an executor and execute it
-                executor = self.__executorsManager.closestFreeExecutor(task)
-                if executor is not None:
-                    executor.executeJob([self.__queueOptimizer.queue().popTask()])
+            # Assign the task to an executor and execute it
+            executor = self.__executorsManager.closestFreeExecutor(task)
+            if executor is None:
+                break
+            self.__executorsManager.assignJob(executor, [self.__queueOptimizer.queue().popTask()])
 
     # Wait for the queue to be processed (for testing purposes)
     def waitForQueueProcessed(self):
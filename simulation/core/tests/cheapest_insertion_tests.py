@@ -0,0 +1,32 @@
+import unittest
+import numpy as np
+from simulation.core.task import Task
+from simulation.core.cheapest_insertion import taskEndpoints, transitionCost, insertTasks
+
+
+class CheapestInsertionTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # Nodes on a line, travel cost is the distance between them
+        nodes = np.arange(0, 6)
+        self.__costs = np.abs(nodes[:, None] - nodes[None, :]).astype(np.float64)
+
+    def test_insertsTaskBetweenClosestNeighbours(self):
+        sequence = [Task(0, 0, 1), Task(1, 4, 5)]
+        newSequence, increases = insertTasks(self.__costs, sequence, [Task(2, 2, 3)])
+        self.assertEqual([0, 2, 1], [task.taskNumber() for task in newSequence])
+        # Task itself covers part of the empty travel between its neighbours
+        self.assertEqual([-1.0], increases)
+        self.assertEqual(2.0, transitionCost(self.__costs, *taskEndpoints(newSequence)))
+
+    def test_appendsUnreachableTask(self):
+        self.__costs[:, 5] = np.inf
+        self.__costs[5, :] = np.inf
+        sequence = [Task(0, 0, 1), Task(1, 1, 2)]
+        newSequence, increases = insertTasks(self.__costs, sequence, [Task(2, 5, 5)])
+        self.assertEqual([0, 1, 2], [task.taskNumber() for task in newSequence])
+        self.assertEqual([np.inf], increases)
+
+
+if __name__ == '__main__':
+    unittest.main()
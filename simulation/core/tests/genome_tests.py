@@ -0,0 +1,56 @@
+import random, unittest
+from simulation.core.task import Task
+from simulation.core.genetic_algorithm_traverser import Genome, sequenceHistogram
+
+
+def quadraticDavisCrossover(first, second):
+    """
+    Previous O(n^2) implementation, which rebuilt child histogram and rescanned second parent for every position.
+    """
+    p1 = random.randint(0, len(first)-1)
+    p2 = random.randint(0, len(first)-1)
+    if p1 > p2:
+        p1, p2 = p2, p1
+
+    child = [Task(-1, -1, -1) for _ in range(0, len(first))]
+    for i in range(p1, p2):
+        child[i] = first[i]
+    originalHistogram = sequenceHistogram(first)
+
+    def processSecondParentElementsForRange(start, stop):
+        for i in range(start, stop):
+            currentChildHistogram = sequenceHistogram(child)
+            for j in range(0, len(second)):
+                t = second[(i + j) % len(second)]
+                if t.taskNumber() in currentChildHistogram and originalHistogram[t.taskNumber()] == currentChildHistogram[t.taskNumber()]:
+                    continue
+                child[i] = t
+                break
+
+    processSecondParentElementsForRange(p2, len(child))
+    processSecondParentElementsForRange(0, p1)
+    return child
+
+
+class GenomeTests(unittest.TestCase):
+
+    def test_crossoverMatchesQuadraticImplementation(self):
+        generator = random.Random(3)
+        for attempt in range(0, 300):
+            length = generator.randint(1, 30)
+            # Few distinct numbers, so most sequences hold duplicates
+            first = [Task(generator.randint(0, max(1, length // 3)), 0, 1) for _ in range(0, length)]
+            second = generator.sample(first, k=length)
+
+            random.seed(attempt)
+            children = Genome(first).crossover(Genome(second))
+            random.seed(attempt)
+            expected = (quadraticDavisCrossover(first, second), quadraticDavisCrossover(second, first))
+
+            for child, expectedChild in zip(children, expected):
+                self.assertEqual([id(task) for task in expectedChild], [id(task) for task in child.tasks])
+                child.validate(first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import tempfile, unittest
+from simulation.core.task import Task
+from simulation.core.tasks_queue import TasksQueue, FIFO
+from simulation.core.tasks_journal import TasksJournal
+from simulation.core.job_executors_manager import JobExecutorsManager
+
+
+class FakeTasksExecutor:
+    def __init__(self, executorId, location):
+        self.location = location
+        self.__executorId = executorId
+
+    def getId(self):
+        return self.__executorId
+
+    def getLocation(self):
+        return self.location
+
+    def isOnline(self):
+        return True
+
+
+class FakeTasksExecutorManager:
+    def __init__(self):
+        self.executors = []
+
+    def addTasksExecutorObserver(self, observer):
+        pass
+
+    def tasksExecutors(self):
+        return self.executors
+
+
+class FakeOccupancyObserver:
+    def __init__(self):
+        self.occupancy = None
+
+    def onOccupancyChanged(self, occupancy):
+        self.occupancy = occupancy
+
+
+class FakeJobExecutor:
+    def __init__(self, executorId):
+        self.__executorId = executorId
+        self.__job = []
+
+    def taskExecutorId(self):
+        return self.__executorId
+
+    def executeJob(self, job):
+        self.__job = job
+
+    def remainingJob(self):
+        return self.__job[1:]
+
+
+class JobExecutorsManagerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__journal, self.__queue = self.__open()
+        self.__tasksExecutors = FakeTasksExecutorManager()
+        self.__manager = JobExecutorsManager(self.__tasksExecutors, trafficController=None, queue=self.__queue)
+        self.__manager.setJournal(self.__journal)
+
+    def tearDown(self) -> None:
+        self.__journal.close()
+        self.__directory.cleanup()
+
+    def __open(self):
+        journal = TasksJournal(self.__directory.name)
+        queue = TasksQueue(FIFO)
+        journal.recover(queue)
+        queue.setJournal(journal)
+        journal.start()
+        return journal, queue
+
+    def test_abandonedJobIsEnqueuedAgain(self):
+        executor = FakeJobExecutor('agv1')
+        self.__manager.assignJob(executor, [Task(0, 0, 1), Task(1, 1, 2), Task(2, 2, 3)])
+
+        with self.assertLogs('simulation.core.job_executors_manager', level='WARNING') as logs:
+            self.__manager.onJobAbandoned(executor)
+        self.assertIn('agv1', logs.output[0])
+        self.assertEqual([1, 2], [task.taskNumber() for task in self.__queue.pendingTasksList()])
+
+        # Remaining tasks are recovered once, from the queue, not from the assignment
+        self.__journal.close()
+        self.__journal, self.__queue = self.__open()
+        self.assertEqual([1, 2], [task.taskNumber() for task in self.__queue.pendingTasksList()])
+
+    def test_occupancyObserversFollowExecutorsLocations(self):
+        observer = FakeOccupancyObserver()
+        self.__manager.addOccupancyObserver(observer)
+        self.assertEqual({}, observer.occupancy)
+
+        self.__tasksExecutors.executors = [FakeTasksExecutor(0, 3), FakeTasksExecutor(1, 3), FakeTasksExecutor(2, 5)]
+        self.__manager.onTasksExecutorsChanged()
+        self.assertEqual({3: 2, 5: 1}, observer.occupancy)
+
+        self.__tasksExecutors.executors[1].location = 4
+        self.__manager.onExecutorMoved(None)
+        self.assertEqual({3: 1, 4: 1, 5: 1}, observer.occupancy)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import random, unittest
+from simulation.core.system_builder import SystemBuilder
+from simulation.core.task import Task
+from simulation.core.genetic_algorithm_traverser import GeneticAlgorithmTraverser
+from simulation.core.simulated_annealing_traverser import SimulatedAnnealingTraverser
+from simulation.experiments_utils.test_graphs_builders import ShortServiceTimeFullGraphBuilder
+from simulation.simpy_adapter.parallel_evaluator import ParallelEvaluator, optimize
+
+
+class ParallelEvaluatorTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        builder = SystemBuilder()
+        ShortServiceTimeFullGraphBuilder(5).setEnvironment(None).build(builder)
+        self.__system = builder.system()
+        generator = random.Random(1)
+        self.__tasks = [Task(i, *generator.sample(range(0, 5), 2)) for i in range(0, 12)]
+        self.__candidates = [generator.sample(range(0, 12), 12) for _ in range(0, 6)]
+
+    def test_resultsDontDependOnWorkers(self):
+        with ParallelEvaluator(self.__system, agentsNumber=2, workers=0, seed=5) as evaluator:
+            serial = evaluator.evaluate(self.__tasks, self.__candidates)
+        with ParallelEvaluator(self.__system, agentsNumber=2, workers=2, seed=5) as evaluator:
+            parallel = evaluator.evaluate(self.__tasks, self.__candidates)
+
+        self.assertEqual(serial, parallel)
+        self.assertTrue(all(result[0] > 0 for result in serial))
+
+    def test_traversersOptimizeBatches(self):
+        numbers = sorted(task.taskNumber() for task in self.__tasks)
+        for traverser in [GeneticAlgorithmTraverser(self.__system), SimulatedAnnealingTraverser(self.__system)]:
+            with ParallelEvaluator(self.__system, agentsNumber=2, workers=0) as evaluator:
+                sequence = optimize(traverser, evaluator, self.__tasks, 2)
+            self.assertEqual(numbers, sorted(task.taskNumber() for task in sequence))
+            self.assertGreater(traverser.cost(), 0)
+
+    def test_optimizationIsDeterministicForGivenSeeds(self):
+        for traverserClass in [GeneticAlgorithmTraverser, SimulatedAnnealingTraverser]:
+            results = []
+            for _ in range(0, 2):
+                with ParallelEvaluator(self.__system, agentsNumber=2, workers=0, seed=5) as evaluator:
+                    traverser = traverserClass(self.__system, seed=3)
+                    sequence = optimize(traverser, evaluator, self.__tasks, 2)
+                results.append((traverser.cost(), [task.taskNumber() for task in sequence]))
+            self.assertEqual(results[0], results[1])
+
+    def test_inProcessEvaluationKeepsCallerRandomState(self):
+        random.seed(0)
+        expected = random.random()
+        random.seed(0)
+        with ParallelEvaluator(self.__system, workers=0) as evaluator:
+            evaluator.evaluate(self.__tasks, self.__candidates[0:1])
+        self.assertEqual(expected, random.random())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import time, unittest
+import numpy as np
+from simulation.core.permutation_population import PermutationPopulation, orderCrossover, arePermutations
+
+
+class PermutationPopulationTests(unittest.TestCase):
+
+    def test_orderCrossoverKeepsSegmentAndFillsFromSecondParent(self):
+        parents1 = np.array([[0, 1, 2, 3, 4, 5, 6, 7]])
+        parents2 = np.array([[7, 6, 5, 4, 3, 2, 1, 0]])
+        children = orderCrossover(parents1, parents2, np.array([2]), np.array([5]))
+        # Second parent is walked from position 5: 2, 1, 0, 7, 6, 5, 4, 3
+        self.assertEqual([[6, 5, 2, 3, 4, 1, 0, 7]], children.tolist())
+
+    def test_generationsKeepPermutations(self):
+        population = PermutationPopulation(8, 10, 0.5, np.random.default_rng(7))
+        self.assertEqual(list(range(0, 10)), population.genomes[0].tolist())
+        for i in range(0, 20):
+            population.costs = np.arange(0, 8, dtype=np.float64)[::-1]
+            best = population.genomes[-1].copy()
+            population.nextGeneration()
+            self.assertTrue(arePermutations(population.genomes))
+            # Survivors are kept next to their children, mutation may swap only two tasks of them
+            self.assertTrue(any(np.count_nonzero(genome != best) <= 2 for genome in population.genomes))
+
+    def test_generationOfLargePopulationIsFast(self):
+        population = PermutationPopulation(120, 500, 0.15)
+        start = time.perf_counter()
+        for i in range(0, 10):
+            population.costs = np.random.random(120)
+            population.nextGeneration()
+        self.assertLess((time.perf_counter() - start) / 10, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
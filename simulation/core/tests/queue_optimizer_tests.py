@@ -0,0 +1,98 @@
+import math, unittest
+from model.gnn_runtime import PathScorerBase
+from simulation.core.system_builder import SystemBuilder, Vertex, Edge
+from simulation.core.task import Task
+from simulation.core.tasks_queue import TasksQueue
+from simulation.core.queue_optimizer import QueueOptimizer, INCREMENTAL
+from simulation.core.traverser_base import TraverserStatistics
+from simulation.simpy_adapter.node import Node
+
+
+class FakePathScorer(PathScorerBase):
+    def scorePaths(self, paths):
+        # Predicted cost grows with the first node
+        return [float(path[0]) for path in paths]
+
+
+class FakeExecutorsManager:
+    def onlineExecutorsNumber(self):
+        return 1
+
+
+class FakeTraverser:
+    created = 0
+
+    def __init__(self, system):
+        FakeTraverser.created += 1
+
+    def cost(self):
+        # Never run by the optimizer, mustn't be recorded as cost of the queue
+        return 1000
+
+    def statistics(self):
+        return TraverserStatistics(0, 0, 0, 0)
+
+
+class QueueOptimizerTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        builder = SystemBuilder()
+        # Node 4 is unreachable
+        for i in range(0, 5):
+            builder.addVertex(Vertex(name='unused', node=Node(env=None, serviceTime=1, index=i)))
+        for source, target in [(0, 1), (1, 2), (2, 3)]:
+            builder.addEdge(Edge(name='unused', source=source, target=target, weight=1))
+        self.__system = builder.system()
+        self.__queue = TasksQueue()
+
+    def __optimizer(self, **kwargs):
+        return QueueOptimizer(system=self.__system, agentsFactory=None, simulation=None, traverserFactory=FakeTraverser,
+                              queue=self.__queue, executorsManager=FakeExecutorsManager(), pathScorer=FakePathScorer(), **kwargs)
+
+    def test_roundsWithDifferentQueueLengths(self):
+        optimizer = self.__optimizer()
+        self.__queue.batchEnqueue([Task(0, 0, 1), Task(1, 2, 3)])
+        optimizer.optimizeQueue(1)
+        self.assertEqual([0, 1], [task.taskNumber() for task in self.__queue.tasksList()])
+
+        self.__queue.batchEnqueue([Task(2, 1, 2), Task(3, 3, 0), Task(4, 0, 3)])
+        optimizer.optimizeQueue(1)
+        self.assertEqual([0, 4, 2, 1, 3], [task.taskNumber() for task in self.__queue.tasksList()])
+        self.assertTrue(all(task.optimizedPath() is not None for task in self.__queue.tasksList()))
+
+    def test_incrementalModeRecordsCostOfInsertions(self):
+        optimizer = self.__optimizer(mode=INCREMENTAL)
+        self.__queue.batchEnqueue([Task(0, 0, 1), Task(1, 2, 3)])
+        optimizer.optimizeQueue(1)
+        created = FakeTraverser.created
+
+        self.__queue.batchEnqueue([Task(2, 3, 0)])
+        optimizer.optimizeQueue(1)
+        self.assertEqual(created, FakeTraverser.created)
+        self.assertEqual([2, 0, 1], [task.taskNumber() for task in self.__queue.tasksList()])
+        # Empty travels 0 -> 0 and 1 -> 2
+        self.assertEqual(1, self.__queue.cost())
+
+        # Unreachable task forces optimization of the whole queue
+        self.__queue.batchEnqueue([Task(3, 4, 4)])
+        optimizer.optimizeQueue(1)
+        self.assertEqual(created + 1, FakeTraverser.created)
+        self.assertTrue(math.isinf(self.__queue.cost()))
+
+    def test_insertionsDearerThanThresholdReoptimizeQueue(self):
+        optimizer = self.__optimizer(mode=INCREMENTAL)
+        self.__queue.batchEnqueue([Task(0, 0, 1), Task(1, 1, 2)])
+        optimizer.optimizeQueue(1)
+        created = FakeTraverser.created
+        self.assertEqual(0, self.__queue.cost())
+
+        # Appending costs 1 more than average transition 0, which exceeds REOPTIMIZATION_THRESHOLD of the cost
+        self.__queue.batchEnqueue([Task(2, 3, 3)])
+        optimizer.optimizeQueue(1)
+        self.assertEqual(created + 1, FakeTraverser.created)
+        self.assertEqual([0, 1, 2], [task.taskNumber() for task in self.__queue.tasksList()])
+        self.assertEqual(1, self.__queue.cost())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from simulation.core.system_builder import SystemBuilder, Vertex, Edge
+from simulation.core.reservation_table import ReservationTable, CooperativePlanner, timelineToPath, timelineDepartures
+
+
+class FakeOwner:
+    pass
+
+
+class ReservationTableTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # Crossing with node 1 in the middle
+        builder = SystemBuilder()
+        for i in range(0, 5):
+            builder.addVertex(Vertex(name='unused', node=i))
+        for source, target in [(0, 1), (1, 2), (3, 1), (1, 4)]:
+            builder.addEdge(Edge(name='unused', source=source, target=target, weight=1))
+        self.__reservations = ReservationTable()
+        self.__planner = CooperativePlanner(builder.system(), self.__reservations)
+
+    def test_reservationsOfOtherOwnersBlockOverlappingIntervals(self):
+        owner, other = FakeOwner(), FakeOwner()
+        self.__reservations.reserveEdge(0, 1, 0, 2, owner)
+        self.assertFalse(self.__reservations.edgeFree(1, 0, 1, 3, other))
+        self.assertTrue(self.__reservations.edgeFree(1, 0, 2, 3, other))
+        self.assertTrue(self.__reservations.edgeFree(1, 0, 1, 3, owner))
+        self.__reservations.release(owner)
+        self.assertEqual(self.__reservations.reservationsCount(), 0)
+
+    def test_lowerPriorityAgentWaitsForCrossingToBeFree(self):
+        first, second = FakeOwner(), FakeOwner()
+        firstTimeline = self.__planner.plan(0, 2, first, 0)
+        secondTimeline = self.__planner.plan(3, 4, second, 0)
+        self.assertEqual(timelineToPath(firstTimeline), [0, 1, 2])
+        self.assertEqual(timelineToPath(secondTimeline), [3, 1, 4])
+        self.assertEqual(dict(firstTimeline)[1], 1)
+        self.assertGreaterEqual(dict(secondTimeline)[1], 2)
+        # Wait at node 3 is kept as its later departure
+        self.assertEqual(timelineDepartures(firstTimeline), [0, 1, 2])
+        self.assertGreaterEqual(timelineDepartures(secondTimeline)[0], 1)
+
+    def test_destinationIsHeldUntilRelease(self):
+        first, second = FakeOwner(), FakeOwner()
+        self.__planner.plan(0, 2, first, 0)
+        self.assertFalse(self.__reservations.nodeFree(2, 100, 101, second))
+        self.assertIsNone(self.__planner.plan(3, 2, second, 0))
+        self.__planner.release(first)
+        self.assertEqual(timelineToPath(self.__planner.plan(3, 2, second, 0)), [3, 1, 2])
+
+    def test_replanningDropsPreviousReservations(self):
+        owner = FakeOwner()
+        self.__planner.plan(0, 2, owner, 0)
+        count = self.__reservations.reservationsCount()
+        self.__planner.plan(0, 2, owner, 0)
+        self.assertEqual(self.__reservations.reservationsCount(), count)
+
+
+if __name__ == '__main__':
+    unittest.main()
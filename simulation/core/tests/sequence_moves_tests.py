@@ -0,0 +1,70 @@
+import random, unittest
+import numpy as np
+from simulation.core.system_builder import SystemBuilder, Vertex, Edge
+from simulation.core.task import Task
+from simulation.core.sequence_moves import DistanceModel, SequenceNeighbourhood, AdaptiveCooling
+from simulation.core.simulated_annealing_traverser import SimulatedAnnealingTraverser
+from simulation.core.travel_costs import TravelCosts
+from simulation.simpy_adapter.node import Node
+
+
+class SequenceMovesTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        generator = random.Random(2)
+        self.__costs = np.array([[generator.random() * 10 for _ in range(0, 6)] for _ in range(0, 6)])
+        self.__costs[1, 2] = np.inf
+        self.__tasks = [Task(i, generator.randrange(0, 6), generator.randrange(0, 6)) for i in range(0, 40)]
+
+    def test_deltasMatchRecomputedCosts(self):
+        generator = random.Random(3)
+        for agentsNumber in [1, 3]:
+            for n in [2, 5, 40]:
+                model = DistanceModel(self.__costs, self.__tasks[0:n], agentsNumber)
+                neighbourhood = SequenceNeighbourhood(model, generator)
+                sequence = generator.sample(range(0, n), n)
+                for _ in range(0, 300):
+                    move = neighbourhood.randomMove(sequence)
+                    delta = neighbourhood.delta(sequence, move)
+                    cost = model.cost(sequence)
+                    neighbourhood.apply(sequence, move)
+                    self.assertEqual(list(range(0, n)), sorted(sequence))
+                    self.assertAlmostEqual(model.cost(sequence), cost + delta, places=6)
+
+    def test_coolingFollowsAcceptanceRate(self):
+        cooling = AdaptiveCooling(10.0, window=10)
+        for _ in range(0, 10):
+            cooling.accepts(0.001, random.Random(0))
+        self.assertLess(cooling.temperature, 10.0)
+
+        cooling = AdaptiveCooling(10.0, window=10)
+        for _ in range(0, 10):
+            cooling.accepts(1000.0, random.Random(0))
+        self.assertGreater(cooling.temperature, 10.0)
+        self.assertLess(cooling.targetAcceptance, 0.5)
+
+    def test_annealingLowersEmptyTravels(self):
+        builder = SystemBuilder()
+        for i in range(0, 6):
+            builder.addVertex(Vertex(name='unused', node=Node(env=None, serviceTime=1, index=i)))
+        for i in range(0, 6):
+            builder.addEdge(Edge(name='unused', source=i, target=(i + 1) % 6, weight=1 + i))
+        system = builder.system()
+        random.seed(4)
+        traverser = SimulatedAnnealingTraverser(system, batchSize=4)
+        traverser.assignSequence(self.__tasks)
+
+        candidates = traverser.candidates()
+        self.assertEqual(list(range(0, 40)), candidates[0].tolist())
+        self.assertTrue(all(sorted(candidate.tolist()) == list(range(0, 40)) for candidate in candidates))
+        model = DistanceModel(TravelCosts(system).matrix(), self.__tasks)
+        costs = [model.cost(candidate.tolist()) for candidate in candidates]
+        self.assertLess(costs[-1], costs[0])
+
+        traverser.batchFeedback([(costs[i], 0, 0, 0, 0) for i in range(0, len(candidates))])
+        self.assertEqual(min(costs), traverser.cost())
+        self.assertEqual(4, traverser.budget().simulatedEvaluations)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from simulation.core.task import Task
+from simulation.core.tasks_queue import TasksQueue
+from simulation.core.genetic_algorithm_traverser import Genome
+from simulation.core.sequence_validation import missingTaskNumber, setSequenceValidation
+
+
+def tasks(numbers):
+    return [Task(number, 0, 1) for number in numbers]
+
+
+class SequenceValidationTests(unittest.TestCase):
+    def tearDown(self):
+        setSequenceValidation(True)
+
+    def test_findsTaskMissingInPermutation(self):
+        self.assertIsNone(missingTaskNumber(tasks([1, 2, 2, 3]), tasks([2, 3, 1, 2])))
+        self.assertEqual(2, missingTaskNumber(tasks([1, 2, 2, 3]), tasks([2, 3, 1, 1])))
+
+    def test_queueRejectsCorruptedSequence(self):
+        queue = TasksQueue()
+        queue.batchEnqueue(tasks([1, 2, 3]))
+        queue.onOptimizationStart()
+        with self.assertRaises(Exception):
+            queue.onOptimizationFeedback(tasks([3, 1, 1]), 10)
+        queue.onOptimizationFeedback(tasks([3, 1, 2]), 10)
+        self.assertEqual([3, 1, 2], [task.taskNumber() for task in queue.tasksList()])
+
+    def test_validationCanBeDisabled(self):
+        setSequenceValidation(False)
+        Genome(tasks([1, 1])).validate(tasks([1, 2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
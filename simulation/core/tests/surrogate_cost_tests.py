@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+from simulation.core.system_builder import SystemBuilder, Vertex, Edge
+from simulation.core.task import Task
+from simulation.core.genetic_algorithm_traverser import GeneticAlgorithmTraverser
+from simulation.core.surrogate_cost import SurrogateCostModel, screenedCosts
+from simulation.simpy_adapter.node import Node
+
+
+class SurrogateCostTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        builder = SystemBuilder()
+        for i in range(0, 3):
+            builder.addVertex(Vertex(name='unused', node=Node(env=None, serviceTime=1, index=i)))
+        for source, target in [(0, 1), (1, 2)]:
+            builder.addEdge(Edge(name='unused', source=source, target=target, weight=1))
+        self.__system = builder.system()
+        self.__tasks = [Task(0, 0, 2), Task(1, 1, 2)]
+
+    def test_estimatesListScheduledTasks(self):
+        # Agent starts at source of its first task, the second task starts with travel from 2 to its source
+        costs = SurrogateCostModel(self.__system).costs(self.__tasks, [[0, 1], [1, 0]])
+        self.assertEqual([8.0, 9.0], costs.tolist())
+
+    def test_screenedCandidatesAreRankedAfterSimulatedOnes(self):
+        costs = screenedCosts(np.array([5.0, 1.0, 2.0, 9.0]), np.array([1, 2]), np.array([20.0, 10.0]))
+        self.assertEqual([10.0, 20.0], costs[[2, 1]].tolist())
+        self.assertTrue(20.0 < costs[0] < costs[3])
+
+    def test_geneticAlgorithmSimulatesFractionOfGeneration(self):
+        traverser = GeneticAlgorithmTraverser(self.__system)
+        traverser.setSurrogate(SurrogateCostModel(self.__system), 0.25)
+        traverser.assignSequence(self.__tasks)
+
+        candidates = traverser.candidates()
+        self.assertEqual(30, len(candidates))
+        traverser.batchFeedback([(10.0 + i, 0, 0, 0, 0) for i in range(0, len(candidates))])
+        self.assertEqual(10.0, traverser.cost())
+        self.assertEqual((120, 30), (traverser.budget().surrogateEvaluations, traverser.budget().simulatedEvaluations))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import copy, os, tempfile, time, unittest
+from simulation.core.task import Task
+from simulation.core.tasks_queue import TasksQueue, FIFO, EARLIEST_DEADLINE_FIRST
+from simulation.core.tasks_journal import TasksJournal, LOG_FILENAME
+
+
+def numbers(tasks):
+    return [task.taskNumber() for task in tasks]
+
+
+class TasksJournalTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__journal, self.__queue = self.__open()
+
+    def tearDown(self) -> None:
+        self.__journal.close()
+        self.__directory.cleanup()
+
+    def __open(self, mode=EARLIEST_DEADLINE_FIRST, snapshotInterval=1000):
+        journal = TasksJournal(self.__directory.name, snapshotInterval=snapshotInterval)
+        queue = TasksQueue(mode)
+        journal.recover(queue)
+        queue.setJournal(journal)
+        journal.start()
+        return journal, queue
+
+    def __restart(self, **kwargs):
+        self.__journal.close()
+        self.__journal, self.__queue = self.__open(**kwargs)
+
+    def test_recoversQueueAndInterruptedJobs(self):
+        self.__queue.batchEnqueue([Task(0, 0, 1), Task(1, 1, 2, requiredOutputTime=10.0), Task(2, 2, 3)])
+        self.__queue.onOptimizationStart()
+        self.__queue.onOptimizationFeedback(list(reversed(self.__queue.tasksList())), 7)
+        task = self.__queue.popTask()
+        self.__journal.onJobAssigned('agv1', [task])
+        self.__queue.popTask()
+        self.__queue.enqueue(Task(3, 3, 4, taskId=12))
+
+        self.__restart()
+
+        self.assertEqual([0], numbers(self.__queue.tasksList()))
+        # Popped but unassigned task and task of interrupted job are enqueued again
+        self.assertEqual([3, 2, 1], numbers(self.__queue.pendingTasksList()))
+        self.assertEqual(12, self.__queue.pendingTasksList()[0].taskId())
+        self.assertEqual(10.0, self.__queue.pendingTasksList()[2].requiredOutputTime())
+        self.assertEqual(7, self.__queue.cost())
+
+    def test_recordsReorderingOfCopiedTasks(self):
+        self.__restart(mode=FIFO)
+        self.__queue.batchEnqueue([Task(0, 0, 1), Task(1, 1, 2), Task(1, 2, 3), Task(2, 3, 4)])
+        self.__queue.onOptimizationStart()
+        # Optimizer returns copies, tasks with the same number keep their order
+        self.__queue.onOptimizationFeedback(copy.deepcopy([self.__queue.tasksList()[i] for i in [3, 1, 0, 2]]), 5)
+
+        self.__restart(mode=FIFO)
+
+        self.assertEqual([2, 1, 0, 1], numbers(self.__queue.tasksList()))
+        self.assertEqual([3, 1, 0, 2], [task.source() for task in self.__queue.tasksList()])
+
+    def test_compactsLogIntoSnapshot(self):
+        self.__restart(snapshotInterval=2)
+        self.__queue.batchEnqueue([Task(0, 0, 1), Task(1, 1, 2)])
+        self.__queue.onOptimizationStart()
+        self.__queue.onOptimizationFinished()
+        self.__queue.popTask()
+        self.__journal.onJobAssigned('agv1', [Task(0, 0, 1)])
+        self.__journal.onJobFinished('agv1')
+        self.__journal.close()
+
+        with open(os.path.join(self.__directory.name, LOG_FILENAME)) as f:
+            self.assertEqual(3, len(f.readlines()))
+        self.__journal, self.__queue = self.__open()
+        self.assertEqual([1], numbers(self.__queue.tasksList()))
+        self.assertEqual([], self.__queue.pendingTasksList())
+
+    def test_ignoresRecordTornByCrash(self):
+        self.__queue.enqueue(Task(0, 0, 1))
+        self.__journal.close()
+        with open(os.path.join(self.__directory.name, LOG_FILENAME), 'a') as f:
+            f.write('[2, "e", [[1, 0')
+
+        self.__journal, self.__queue = self.__open()
+        self.assertEqual([0], numbers(self.__queue.pendingTasksList()))
+
+    def test_replaysTenThousandTasksQuickly(self):
+        for i in range(0, 10000):
+            self.__queue.enqueue(Task(i, i % 7, i % 5, taskId=i))
+            if i % 1000 == 999:
+                self.__queue.onOptimizationStart()
+                self.__queue.onOptimizationFeedback(self.__queue.tasksList(), i)
+        self.__journal.close()
+
+        start = time.perf_counter()
+        self.__journal, self.__queue = self.__open()
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(10000, self.__queue.size())
+
+
+if __name__ == '__main__':
+    unittest.main()
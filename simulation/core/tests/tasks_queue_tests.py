@@ -0,0 +1,59 @@
+import unittest
+from simulation.core.task import Task
+from simulation.core.tasks_queue import TasksQueue, ENQUEUED, OPTIMIZATION_STARTED, REORDERED, POPPED, EARLIEST_DEADLINE_FIRST, PRIORITY
+
+
+def numbers(tasks):
+    return [task.taskNumber() for task in tasks]
+
+
+class TasksQueueTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.__queue = TasksQueue()
+        self.__queue.batchEnqueue([Task(i, 0, 1) for i in range(0, 3)])
+
+    def test_snapshotIsNotChangedByLaterOperations(self):
+        snapshot = self.__queue.snapshot()
+        self.__queue.onOptimizationStart()
+        self.__queue.enqueue(Task(3, 0, 1))
+
+        self.assertEqual(([], [0, 1, 2]), (numbers(snapshot.tasks), numbers(snapshot.pendingTasks)))
+        self.assertEqual(([0, 1, 2], [3]), (numbers(self.__queue.snapshot().tasks), numbers(self.__queue.snapshot().pendingTasks)))
+        self.assertEqual(snapshot.version + 2, self.__queue.snapshot().version)
+
+    def test_reportsChangesSinceSeenVersion(self):
+        version = self.__queue.snapshot().version
+        self.__queue.onOptimizationStart()
+        self.__queue.onOptimizationFeedback(list(reversed(self.__queue.tasksList())), 10)
+        self.__queue.popTask()
+
+        changes = self.__queue.changesSince(version)
+        self.assertEqual([OPTIMIZATION_STARTED, REORDERED, POPPED], [change.kind for change in changes])
+        self.assertEqual([2, 1, 0], numbers(changes[1].tasks))
+        self.assertEqual([2], numbers(changes[2].tasks))
+        self.assertEqual([], self.__queue.changesSince(self.__queue.snapshot().version))
+        self.assertEqual([ENQUEUED], [change.kind for change in self.__queue.changesSince(0)][0:1])
+
+    def test_dispatchesEarliestDeadlineFirst(self):
+        queue = TasksQueue(EARLIEST_DEADLINE_FIRST)
+        queue.batchEnqueue([Task(0, 0, 1), Task(1, 0, 1, requiredOutputTime=30.0), Task(2, 0, 1, requiredOutputTime=10.0), Task(3, 0, 1)])
+        queue.onOptimizationStart()
+        # Optimizer may only order tasks with equal requirements
+        queue.onOptimizationFeedback(queue.constrainedSequence(list(reversed(queue.tasksList()))), 10)
+
+        self.assertEqual([2, 1], numbers(queue.nextTasks(2)))
+        self.assertEqual([2, 1, 3, 0], [queue.popTask().taskNumber() for _ in range(0, 4)])
+        self.assertTrue(queue.empty())
+
+    def test_dispatchesHighestPriorityFirst(self):
+        queue = TasksQueue(PRIORITY)
+        queue.batchEnqueue([Task(0, 0, 1, orderPriority=1), Task(1, 0, 1, orderPriority=5, requiredOutputTime=20.0),
+                            Task(2, 0, 1, orderPriority=5, requiredOutputTime=10.0)])
+        queue.onOptimizationStart()
+
+        self.assertEqual([2, 1, 0], numbers(queue.snapshot().tasks))
+        self.assertEqual(REORDERED, queue.changesSince(0)[-1].kind)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import threading, time, unittest
+from unittest import mock
+from simulation.core import traffic_controller
+from simulation.core.system_builder import SystemBuilder, Vertex, Edge
+from simulation.core.traffic_controller import TrafficController
+from simulation.core.reservation_table import ReservationTable, CooperativePlanner
+from simulation.simpy_adapter.node import Node
+
+
+class FakePathScorer:
+    def scorePaths(self, paths):
+        return [0.0] * len(paths)
+
+
+class FakeExecutor:
+    pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.time += seconds
+
+
+def lineSystem():
+    builder = SystemBuilder()
+    for i in range(0, 3):
+        builder.addVertex(Vertex(name='unused', node=Node(env=None, serviceTime=1, index=i)))
+    for source, target in [(0, 1), (1, 2)]:
+        builder.addEdge(Edge(name='unused', source=source, target=target, weight=0.001))
+    return builder.system()
+
+
+class TrafficControllerTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.__system = lineSystem()
+        self.__reservations = ReservationTable()
+        self.__controller = TrafficController(self.__system, pathScorer=FakePathScorer())
+        self.__clock = FakeClock()
+        self.__controller.setPathPlanner(CooperativePlanner(self.__system, self.__reservations, waitStep=0.001, clock=self.__clock))
+
+    def test_plannedPathWhichCantBeAssignedKeepsNoReservations(self):
+        first, second = FakeExecutor(), FakeExecutor()
+        self.assertEqual([0, 1, 2], self.__controller.requestPath(0, 2, first))
+        # First executor is late, its reservations expire while it still holds the segment
+        self.__clock.time += 0.01
+
+        # Destination of the first executor stays reserved, node 1 doesn't
+        self.assertIsNone(self.__controller.requestPath(0, 1, second))
+        self.assertEqual(1, self.__reservations.reservationsCount())
+
+        self.__controller.revokePath([0, 1, 2], first)
+        self.assertEqual([0, 1], self.__controller.requestPath(0, 1, second))
+
+    def test_executorIsHeldUntilPlannedDeparture(self):
+        # Crossing with node 1 in the middle
+        builder = SystemBuilder()
+        for i in range(0, 5):
+            builder.addVertex(Vertex(name='unused', node=Node(env=None, serviceTime=1, index=i)))
+        for source, target in [(0, 1), (1, 2), (3, 1), (1, 4)]:
+            builder.addEdge(Edge(name='unused', source=source, target=target, weight=0.05))
+        system = builder.system()
+        controller = TrafficController(system, pathScorer=FakePathScorer())
+        clock = FakeClock()
+        controller.setPathPlanner(CooperativePlanner(system, ReservationTable(), waitStep=0.05, clock=clock))
+        first, second = FakeExecutor(), FakeExecutor()
+
+        self.assertEqual([0, 1, 2], controller.requestPath(0, 2, first))
+        secondPath = controller.requestPath(3, 4, second)
+        self.assertEqual([3, 1, 4], secondPath)
+        # Second executor waits at node 3 until the crossing is left by the first one
+        controller.waitForPlannedDeparture(secondPath, second, 0)
+        self.assertAlmostEqual(0.05, clock.time)
+        # Executor which isn't late leaves at once
+        controller.waitForPlannedDeparture(secondPath, second, 0)
+        self.assertAlmostEqual(0.05, clock.time)
+
+        # Paths which weren't planned aren't held
+        clock.time = 0.0
+        controller.waitForPlannedDeparture([3, 1, 4], second, 0)
+        self.assertEqual(0.0, clock.time)
+
+    @mock.patch.object(traffic_controller, 'DEADLOCK_MAX_BACKOFF', 0)
+    def test_deadlockVictimGivesUpAfterBoundedRetries(self):
+        first, second = FakeExecutor(), FakeExecutor()
+        self.assertEqual([0, 1], self.__controller.requestPath(0, 1, first))
+        self.assertEqual([1, 2], self.__controller.requestPath(1, 2, second))
+        # Each executor waits for the edge held by the other one, there's no alternative path
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(self.__controller.waitForNextSegment([1, 2], first, 0, timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+
+        self.assertFalse(self.__controller.waitForNextSegment([0, 1], second, 0))
+        self.assertEqual(traffic_controller.DEADLOCK_MAX_RETRIES + 1, self.__controller.deadlockStatistics().backoffs)
+
+        self.__controller.revokePath([1, 2], second)
+        waiter.join()
+        self.assertEqual([True], results)
+
+    def test_seededControllersBackOffTheSame(self):
+        def backoffs(seed):
+            system = lineSystem()
+            controller = TrafficController(system, pathScorer=FakePathScorer(), seed=seed)
+            controller.setPathPlanner(CooperativePlanner(system, ReservationTable(), waitStep=0.001, clock=FakeClock()))
+            first, second = FakeExecutor(), FakeExecutor()
+            self.assertEqual([0, 1], controller.requestPath(0, 1, first))
+            self.assertEqual([1, 2], controller.requestPath(1, 2, second))
+            waiter = threading.Thread(target=lambda: controller.waitForNextSegment([1, 2], first, 0, timeout=5))
+            waiter.start()
+            time.sleep(0.05)
+            with mock.patch.object(traffic_controller.time, 'sleep') as sleep:
+                self.assertFalse(controller.waitForNextSegment([0, 1], second, 0, timeout=5))
+            controller.revokePath([1, 2], second)
+            waiter.join()
+            return [call.args[0] for call in sleep.call_args_list]
+
+        self.assertEqual(backoffs(7), backoffs(7))
+        self.assertNotEqual(backoffs(7), backoffs(8))
+
+
+if __name__ == '__main__':
+    unittest.main()
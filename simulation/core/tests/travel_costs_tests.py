@@ -0,0 +1,46 @@
+import unittest, unittest.mock
+import numpy as np
+from simulation.core.system_builder import SystemBuilder, Vertex, Edge
+from simulation.core.travel_costs import TravelCosts, ShortestPaths
+
+
+class TravelCostsTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        builder = SystemBuilder()
+        for i in range(0, 4):
+            builder.addVertex(Vertex(name='unused', node=i))
+        for source, target, weight in [(0, 1, 1), (1, 2, 1), (0, 2, 5), (2, 3, 2)]:
+            builder.addEdge(Edge(name='unused', source=source, target=target, weight=weight))
+        self.__system = builder.system()
+        self.__costs = TravelCosts(self.__system)
+
+    def test_computesLowestTransitCosts(self):
+        self.assertEqual(self.__costs.cost(0, 2), 2)
+        self.assertEqual(self.__costs.cost(3, 0), 4)
+        self.assertEqual(self.__costs.costsTo([0, 1, 2, 3], 3).tolist(), [4, 3, 2, 0])
+
+    def test_recomputesCostsAfterWeightChange(self):
+        self.assertEqual(self.__costs.cost(0, 2), 2)
+        self.__system.setEdgeWeight(0, 2, 0.5)
+        self.assertEqual(self.__costs.cost(0, 2), 0.5)
+
+    def test_recomputesCostsAfterWeightWrittenToGraph(self):
+        self.assertEqual(self.__costs.matrix()[0, 2], 2)
+        self.__system.graph[1, 2] = 4
+        self.assertEqual(self.__costs.matrix()[0, 2], 5)
+        self.assertEqual(self.__costs.cost(0, 2), 5)
+
+    def test_singleCostsMatchMatrix(self):
+        expected = self.__costs.cost(3, 0), self.__costs.costsTo([0, 1, 2, 3], 1).tolist()
+        self.assertEqual(expected, (self.__costs.matrix()[3, 0], self.__costs.matrix()[:, 1].tolist()))
+
+    def test_fallbackDijkstraMatchesIgraph(self):
+        expected = ShortestPaths(self.__system).costsFrom(range(0, 4))
+        with unittest.mock.patch.dict('sys.modules', {'igraph': None}):
+            np.testing.assert_array_equal(expected, ShortestPaths(self.__system).costsFrom(range(0, 4)))
+            np.testing.assert_array_equal(expected[:, [3]].T, ShortestPaths(self.__system).costsTo([3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from simulation.core.wait_for_graph import WaitForGraph
+
+
+class FakeExecutor:
+    pass
+
+
+class WaitForGraphTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.__graph = WaitForGraph()
+        self.__executors = [FakeExecutor() for _ in range(0, 3)]
+
+    def test_chainOfWaitsIsNotACycle(self):
+        e0, e1, e2 = self.__executors
+        self.assertIsNone(self.__graph.setBlocked(e0, [e1], 0))
+        self.assertIsNone(self.__graph.setBlocked(e1, [e2], 1))
+
+    def test_detectsCycleClosedByBlockedExecutor(self):
+        e0, e1, e2 = self.__executors
+        self.__graph.setBlocked(e0, [e1], 0)
+        self.__graph.setBlocked(e1, [e2], 1)
+        cycle = self.__graph.setBlocked(e2, [e0], 2)
+        self.assertEqual(set(id(executor) for executor, _ in cycle), set(id(executor) for executor in self.__executors))
+        self.assertIs(WaitForGraph.victim(cycle), e2)
+
+    def test_removedWaiterBreaksCycle(self):
+        e0, e1, _ = self.__executors
+        self.__graph.setBlocked(e0, [e1], 0)
+        self.__graph.remove(e0)
+        self.assertIsNone(self.__graph.setBlocked(e1, [e0], 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,90 +1,261 @@
-import threading
-from model.gnn_model import GNNModel  # Import the GNN model
-import torch
+import threading, time, random
+from collections import deque
+from dataclasses import dataclass
+from model.gnn_runtime import createPathScorer
+from simulation.core.reservation_table import timelineToPath, timelineDepartures
+from simulation.core.wait_for_graph import WaitForGraph, DeadlockStatistics
+import numpy as np
 
 LOCK_RANGE = 5
+LOCK_STRIPES = 64
+DEADLOCK_REROUTE_PATHS = 3
+DEADLOCK_MAX_BACKOFF = 0.5
+DEADLOCK_MAX_RETRIES = 10
+
+
+@dataclass
+class WaitStatistics:
+    waits: int
+    waiting: int
+    totalWaitTime: float
+    maxWaitTime: float
+
 
 class TrafficController:
-    def __init__(self, system):
+    """
+    Assigns path segments to executors. Segments are guarded by striped per-edge locks taken in
+    ascending stripe order, so executors working in different areas don't block each other.
+    Path finding and GNN scoring run before any lock is taken.
+    """
+    def __init__(self, system, pathScorer=None, seed=None):
+        """
+        :param seed: Seed of deadlock back-offs, runs with the same seed resolve deadlocks the same way
+        """
         self.__system = system
-        self.__lock = threading.Lock()
+        self.__random = random.Random(seed)
+        self.__stripes = [threading.Condition() for _ in range(0, LOCK_STRIPES)]
+        self.__pathReleased = threading.Condition()
+        self.__releasesCount = 0
+        self.__waitQueues = dict()
+        self.__statisticsLock = threading.Lock()
+        self.__waitStatistics = WaitStatistics(0, 0, 0, 0)
+        self.__waitForGraph = WaitForGraph()
+        self.__blockingStripes = dict()
+        self.__victims = set()
+        self.__reroutes = dict()
+        self.__deadlockStatistics = DeadlockStatistics(0, 0, 0, 0)
+        self.__travelCosts = None
+        self.__pathPlanner = None
+        self.__plannedDepartures = dict()
 
-        # Initialize the GNN model for path optimization
-        self.__gnn_model = GNNModel(num_node_features=system.graph_data.num_features, num_classes=1)
-        self.__gnn_model.eval()  # Set to evaluation mode for inference
+        # GNN path scorer for path optimization
+        self.__pathScorer = pathScorer if pathScorer is not None else createPathScorer(system)
 
     def requestPath(self, source, destination, executor):
         k = 3
         sourceNode = self.__system.node(source)
         destinationNode = self.__system.node(destination)
-        with self.__lock:
-            # Get k shortest paths
-            paths = self.__system.graph.get_k_shortest_paths(sourceNode.index, destinationNode.index, k=k)
-
-            # GNN-based Path Selection
-            optimized_path = self.__getOptimizedPath(paths)
-
-            # Fall back to original path selection if GNN fails to provide a valid path
-            if optimized_path is None:
-                path = self.__pickFreePath(paths)
-                if path is None:
-                    path = self.__pickPartiallyFreePath(paths)
-            else:
-                path = optimized_path
-
-            if path is not None:
-                self.__assignSegment(path, executor, 0, LOCK_RANGE)
+        plannedPath, departures = self.__planPath(sourceNode.index, destinationNode.index, executor)
+        if plannedPath is not None:
+            if self.__tryAssignSegment(plannedPath, executor, 0):
+                with self.__statisticsLock:
+                    self.__plannedDepartures[id(executor)] = (plannedPath, departures)
+                return plannedPath
+            # Reservations of the plan which can't be taken would block plans of other executors
+            self.__pathPlanner.release(executor)
+
+        # Get k shortest paths
+        paths = self.__system.graph.get_k_shortest_paths(sourceNode.index, destinationNode.index, k=k)
+
+        # GNN-based path ranking, falls back to original order if GNN gives no scores
+        rankedPaths = self.__rankPaths(paths)
+
+        # Prefer completely free path, then any path with free first segment
+        for path in rankedPaths:
+            if self.__freePath(path) and self.__tryAssignSegment(path, executor, 0):
+                return path
+        for path in rankedPaths:
+            if self.__tryAssignSegment(path, executor, 0):
                 return path
         return None
 
-    def __getOptimizedPath(self, paths):
-        # GNN inference to select the best path from the given paths
-        with torch.no_grad():
-            best_path = None
-            best_score = float('-inf')
-            for path in paths:
-                # Prepare tensor representation of the path
-                path_tensor = self._prepare_path_tensor(path)
-                
-                # Use GNN model to predict path score
-                path_score = self.__gnn_model(path_tensor)
-                
-                if path_score.item() > best_score:
-                    best_path = path
-                    best_score = path_score.item()
-
-            return best_path
-
-    def _prepare_path_tensor(self, path):
-        """
-        Converts a path into a tensor representation suitable for the GNN model.
-        Assumes that `path` is a list of nodes.
-        """
-        node_features = []
-        for node in path:
-            # Assuming each node has a feature vector stored in the graph
-            node_feature = self.__system.graph.vs[node].get('features', [1.0])
-            node_features.append(node_feature)
-        
-        path_tensor = torch.tensor(node_features, dtype=torch.float)
-        return path_tensor
+    def waitForPath(self, source, destination, executor, timeout=None):
+        """
+        Blocks until path is assigned, waiters are woken up whenever any segment is released.
+        :return: Assigned path or None on timeout
+        """
+        with self.__pathReleased:
+            releasesCount = self.__releasesCount
+        path = self.requestPath(source, destination, executor)
+        if path is not None:
+            return path
+        waitStart = self.__onWaitStarted()
+        try:
+            while path is None:
+                with self.__pathReleased:
+                    if releasesCount == self.__releasesCount and not self.__pathReleased.wait(self.__remainingTime(waitStart, timeout)):
+                        return None
+                    releasesCount = self.__releasesCount
+                path = self.requestPath(source, destination, executor)
+            return path
+        finally:
+            self.__onWaitFinished(waitStart)
+
+    def setPathPlanner(self, pathPlanner):
+        self.__pathPlanner = pathPlanner
+        if self.__travelCosts is not None:
+            self.__pathPlanner.setHeuristic(self.__travelCosts.cost)
+
+    def __planPath(self, source, destination, executor):
+        """
+        :return: Tuple of planned path and planned departures from its nodes, (None, None) when there is no plan
+        """
+        if self.__pathPlanner is None:
+            return None, None
+        timeline = self.__pathPlanner.plan(source, destination, executor)
+        if timeline is not None:
+            return timelineToPath(timeline), timelineDepartures(timeline)
+        self.__pathPlanner.release(executor)
+        return None, None
+
+    def waitForPlannedDeparture(self, path, executor, pathPoint):
+        """
+        Holds executor at path[pathPoint] until departure planned by path planner, so it keeps timing its reservations
+        were made for. Executors which are late or follow paths which weren't planned leave at once.
+        Departures are measured by the clock of the path planner.
+        """
+        with self.__statisticsLock:
+            planned = self.__plannedDepartures.get(id(executor))
+        if planned is None or planned[0] is not path or pathPoint >= len(planned[1]):
+            return
+        clock = self.__pathPlanner.clock()
+        delay = planned[1][pathPoint] - clock.now()
+        if delay > 0:
+            clock.sleep(delay)
+
+    def __rankPaths(self, paths):
+        # GNN inference to order given paths from the best one, scores are predicted costs of paths
+        scores = self.__pathScorer.scorePaths(paths)
+        order = sorted(range(0, len(paths)), key=lambda i: scores[i])
+        return [paths[i] for i in order]
 
     def requestNextSegment(self, path, executor, startingPoint):
-        with self.__lock:
-            self.__unassignSegment(path, executor, startingPoint - 1, LOCK_RANGE)
-            if self.__segmentFree(path, startingPoint, LOCK_RANGE):
-                self.__assignSegment(path, executor, startingPoint, LOCK_RANGE)
+        self.__releaseSegment(path, executor, startingPoint - 1, LOCK_RANGE)
+        return self.__tryAssignSegment(path, executor, startingPoint)
+
+    def waitForNextSegment(self, path, executor, startingPoint, timeout=None):
+        """
+        Blocks until next segment is assigned. Executors waiting for the same edges are served in FIFO order.
+        Executor chosen to break a deadlock is rerouted or backs off and queues again, at most DEADLOCK_MAX_RETRIES times.
+        :return: True when segment was assigned, False on timeout or when retries were exhausted
+        """
+        self.__releaseSegment(path, executor, startingPoint - 1, LOCK_RANGE)
+        waitStart = time.monotonic()
+        for _ in range(0, DEADLOCK_MAX_RETRIES + 1):
+            assigned = self.__waitInQueue(path, executor, startingPoint, self.__remainingTime(waitStart, timeout))
+            if assigned is not None:
+                return assigned
+            if self.__reroute(path, executor, startingPoint):
                 return True
+            with self.__statisticsLock:
+                self.__deadlockStatistics.backoffs += 1
+            time.sleep(self.__random.uniform(0, DEADLOCK_MAX_BACKOFF))
+            remainingTime = self.__remainingTime(waitStart, timeout)
+            if remainingTime is not None and remainingTime <= 0:
+                return False
         return False
 
+    def __waitInQueue(self, path, executor, startingPoint, timeout):
+        """
+        :return: True when segment was assigned, False on timeout, None when executor was chosen to break a deadlock
+        """
+        edges = self.__segmentEdges(path, startingPoint, LOCK_RANGE)
+        stripes = self.__stripesOf(edges)
+        self.__acquire(stripes)
+        if self.__segmentFree(path, startingPoint, LOCK_RANGE) and not self.__segmentAwaited(edges):
+            self.__assignSegment(path, executor, startingPoint, LOCK_RANGE)
+            self.__release(stripes)
+            return True
+
+        # Enqueueing while holding all stripes keeps the same order in every shared queue
+        for edge in edges:
+            self.__waitQueues.setdefault(edge, deque()).append(executor)
+        waitStart = self.__onWaitStarted()
+        try:
+            while True:
+                if self.__takeVictimFlag(executor):
+                    break
+                blockingEdge, blockers = self.__blockingEdge(path, startingPoint, edges, executor)
+                if blockingEdge is None:
+                    self.__assignSegment(path, executor, startingPoint, LOCK_RANGE)
+                    return True
+                # Keep only stripe of blocking edge, its release has to notify this stripe
+                blockingStripe = self.__stripes[blockingEdge % LOCK_STRIPES]
+                self.__blockingStripes[id(executor)] = blockingStripe
+                cycle = self.__waitForGraph.setBlocked(executor, blockers, waitStart)
+                victim = self.__onDeadlockDetected(cycle) if cycle is not None else None
+                if victim is not None:
+                    if victim is executor:
+                        break
+                    # Victim's stripe can't be taken out of order, drop ours before waking it up
+                    self.__release(stripes)
+                    self.__wakeUp(victim)
+                    self.__acquire(stripes)
+                    continue
+                self.__release([stripe for stripe in stripes if stripe is not blockingStripe])
+                notified = blockingStripe.wait(self.__remainingTime(waitStart, timeout))
+                blockingStripe.release()
+                self.__acquire(stripes)
+                if not notified:
+                    return False
+        finally:
+            for edge in edges:
+                self.__waitQueues[edge].remove(executor)
+                if len(self.__waitQueues[edge]) == 0:
+                    del self.__waitQueues[edge]
+                self.__stripes[edge % LOCK_STRIPES].notify_all()
+            self.__release(stripes)
+            self.__waitForGraph.remove(executor)
+            self.__blockingStripes.pop(id(executor), None)
+            self.__onWaitFinished(waitStart)
+        return None
+
+    def takeReroutedPath(self, executor):
+        """
+        Path assigned instead of the blocked one when deadlock was resolved by rerouting, starts at executor's location.
+        :return: New path or None when executor keeps its path
+        """
+        with self.__statisticsLock:
+            return self.__reroutes.pop(id(executor), None)
+
+    def deadlockStatistics(self):
+        with self.__statisticsLock:
+            return DeadlockStatistics(self.__deadlockStatistics.cyclesResolved, self.__deadlockStatistics.reroutes,
+                                      self.__deadlockStatistics.backoffs, self.__deadlockStatistics.timeLost)
+
+    def waitStatistics(self):
+        with self.__statisticsLock:
+            return WaitStatistics(self.__waitStatistics.waits, self.__waitStatistics.waiting,
+                                  self.__waitStatistics.totalWaitTime, self.__waitStatistics.maxWaitTime)
+
     def segmentNodes(self, path, startingPoint):
         return self.__segmentNodes(path, startingPoint, LOCK_RANGE)
 
     def revokePath(self, path, executor):
-        with self.__lock:
-            self.__unassignSegment(path, executor, 0, len(path))
+        self.__releaseSegment(path, executor, 0, len(path))
+        with self.__statisticsLock:
+            self.__plannedDepartures.pop(id(executor), None)
+        if self.__pathPlanner is not None:
+            self.__pathPlanner.release(executor)
+
+    def setTravelCosts(self, travelCosts):
+        self.__travelCosts = travelCosts
+        if self.__pathPlanner is not None:
+            self.__pathPlanner.setHeuristic(travelCosts.cost)
 
     def lowestCost(self, source, destination):
+        if self.__travelCosts is not None:
+            return self.__travelCosts.cost(source, destination)
         path = self.__system.graph.get_k_shortest_paths(source, destination, k=1)[0]
         cost = 0
         i = 1
@@ -93,21 +264,14 @@ class TrafficController:
             i += 1
         return cost
 
+    def lowestCosts(self, sources, destination):
+        if self.__travelCosts is not None:
+            return self.__travelCosts.costsTo(sources, destination)
+        return np.array([self.lowestCost(source, destination) for source in sources], dtype=np.float64)
+
     def isValidLocation(self, location):
         return location in self.__system.graph.vs.indices
 
-    def __pickFreePath(self, paths):
-        for path in paths:
-            if self.__freePath(path):
-                return path
-        return None
-
-    def __pickPartiallyFreePath(self, paths):
-        for path in paths:
-            if self.__partiallyFreePath(path):
-                return path
-        return None
-
     def __freePath(self, path):
         i = 1
         while i < len(path):
@@ -117,9 +281,6 @@ class TrafficController:
             i += 1
         return True
 
-    def __partiallyFreePath(self, path):
-        return self.__segmentFree(path, 0, LOCK_RANGE)
-
     def __segmentFree(self, path, startingPoint, endingPoint):
         i = startingPoint + 1
         while i < len(path):
@@ -131,6 +292,138 @@ class TrafficController:
             i += 1
         return True
 
+    def __segmentEdges(self, path, startingPoint, endingPoint):
+        # Superset of edges touched by __segmentFree, __assignSegment and __unassignSegment
+        edges = []
+        i = max(startingPoint + 1, 1)
+        while i < len(path):
+            edges.append(self.__system.edgeId(path[i - 1], path[i]))
+            if (i - startingPoint - 1) == endingPoint:
+                break
+            i += 1
+        return edges
+
+    def __stripesOf(self, edges):
+        return [self.__stripes[i] for i in sorted(set(edge % LOCK_STRIPES for edge in edges))]
+
+    @staticmethod
+    def __acquire(stripes):
+        for stripe in stripes:
+            stripe.acquire()
+
+    @staticmethod
+    def __release(stripes):
+        for stripe in reversed(stripes):
+            stripe.release()
+
+    def __tryAssignSegment(self, path, executor, startingPoint):
+        edges = self.__segmentEdges(path, startingPoint, LOCK_RANGE)
+        stripes = self.__stripesOf(edges)
+        self.__acquire(stripes)
+        try:
+            if self.__segmentFree(path, startingPoint, LOCK_RANGE) and not self.__segmentAwaited(edges):
+                self.__assignSegment(path, executor, startingPoint, LOCK_RANGE)
+                return True
+            return False
+        finally:
+            self.__release(stripes)
+
+    def __releaseSegment(self, path, executor, startingPoint, endingPoint):
+        edges = self.__segmentEdges(path, startingPoint, endingPoint)
+        stripes = self.__stripesOf(edges)
+        self.__acquire(stripes)
+        try:
+            released = self.__unassignSegment(path, executor, startingPoint, endingPoint)
+        finally:
+            self.__release(stripes)
+        if released:
+            with self.__pathReleased:
+                self.__releasesCount += 1
+                self.__pathReleased.notify_all()
+
+    def __segmentAwaited(self, edges):
+        for edge in edges:
+            if edge in self.__waitQueues:
+                return True
+        return False
+
+    def __blockingEdge(self, path, startingPoint, edges, executor):
+        """
+        :return: Tuple of first edge executor can't take yet and executors it waits for, (None, []) if segment can be taken
+        """
+        for edge in edges:
+            if self.__waitQueues[edge][0] is not executor:
+                return edge, [self.__waitQueues[edge][0]]
+        i = startingPoint + 1
+        while i < len(path):
+            segmentExecutors = self.__system.edgeExecutors(path[i - 1], path[i])
+            if len(segmentExecutors) > 0:
+                return self.__system.edgeId(path[i - 1], path[i]), list(segmentExecutors.values())
+            if (i - startingPoint - 1) == LOCK_RANGE:
+                break
+            i += 1
+        return None, []
+
+    def __onDeadlockDetected(self, cycle):
+        """
+        :return: Executor chosen to resolve the cycle, None when resolution of this cycle is already pending
+        """
+        victim = WaitForGraph.victim(cycle)
+        now = time.monotonic()
+        with self.__statisticsLock:
+            if any(id(executor) in self.__victims for executor, _ in cycle):
+                return None
+            self.__victims.add(id(victim))
+            self.__deadlockStatistics.cyclesResolved += 1
+            self.__deadlockStatistics.timeLost += sum(now - waitStart for _, waitStart in cycle)
+        return victim
+
+    def __takeVictimFlag(self, executor):
+        with self.__statisticsLock:
+            if id(executor) in self.__victims:
+                self.__victims.remove(id(executor))
+                return True
+            return False
+
+    def __wakeUp(self, executor):
+        stripe = self.__blockingStripes.get(id(executor))
+        if stripe is not None:
+            with stripe:
+                stripe.notify_all()
+
+    def __reroute(self, path, executor, startingPoint):
+        """
+        Assigns alternative path from executor's location to deadlock victim.
+        :return: True when any alternative path was free
+        """
+        self.__takeVictimFlag(executor)
+        for alternative in self.__system.graph.get_k_shortest_paths(path[startingPoint], path[-1], k=DEADLOCK_REROUTE_PATHS):
+            if alternative != path[startingPoint:] and self.__tryAssignSegment(alternative, executor, 0):
+                with self.__statisticsLock:
+                    self.__reroutes[id(executor)] = alternative
+                    self.__deadlockStatistics.reroutes += 1
+                return True
+        return False
+
+    def __onWaitStarted(self):
+        with self.__statisticsLock:
+            self.__waitStatistics.waiting += 1
+        return time.monotonic()
+
+    def __onWaitFinished(self, waitStart):
+        waitTime = time.monotonic() - waitStart
+        with self.__statisticsLock:
+            self.__waitStatistics.waits += 1
+            self.__waitStatistics.waiting -= 1
+            self.__waitStatistics.totalWaitTime += waitTime
+            self.__waitStatistics.maxWaitTime = max(self.__waitStatistics.maxWaitTime, waitTime)
+
+    @staticmethod
+    def __remainingTime(waitStart, timeout):
+        if timeout is None:
+            return None
+        return max(0.0, timeout - (time.monotonic() - waitStart))
+
     def __segmentNodes(self, path, startingPoint, endingPoint):
         i = startingPoint
         segmentNodes = []
@@ -153,11 +446,15 @@ class TrafficController:
                 break
 
     def __unassignSegment(self, path, executor, startingPoint, endingPoint):
+        released = False
         i = startingPoint + 1
         while i < len(path):
             segmentExecutors = self.__system.edgeExecutors(path[i - 1], path[i])
             if id(executor) in segmentExecutors:
                 del segmentExecutors[id(executor)]
+                self.__stripes[self.__system.edgeId(path[i - 1], path[i]) % LOCK_STRIPES].notify_all()
+                released = True
             i += 1
             if (i - startingPoint - 1) == endingPoint:
                 break
+        return released
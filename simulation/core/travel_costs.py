@@ -0,0 +1,139 @@
+import heapq, threading
+import numpy as np
+
+# Rows of distances computed by igraph at once, bounds its temporary lists
+ROWS_PER_CHUNK = 256
+
+
+class ShortestPaths:
+    """
+    Repeated Dijkstra over edges of the system, in igraph when it's installed, so the cost of all pairs is
+    O(V E log V) instead of O(V^3). Unreachable pairs are marked with inf.
+    """
+    def __init__(self, system):
+        graph = system.graph
+        sources, targets, weights = [], [], []
+        for edge in graph.es:
+            weight = edge['weight']
+            sources.append(edge.source)
+            targets.append(edge.target)
+            weights.append(weight if weight is not None else 1.0)
+        self.verticesCount = system.nodesCount()
+        self.__directed = graph.is_directed()
+        self.__weights = weights
+        try:
+            from igraph import Graph
+            self.__graph = Graph(n=self.verticesCount, edges=list(zip(sources, targets)), directed=self.__directed)
+        except ModuleNotFoundError:
+            self.__graph = None
+            self.__adjacency = self.__adjacencyLists(sources, targets, weights, reverse=False)
+            self.__reverseAdjacency = self.__adjacencyLists(sources, targets, weights, reverse=True)
+
+    def costsFrom(self, origins):
+        """
+        :return: len(origins) x verticesCount matrix of lowest transit costs from every origin
+        """
+        return self.__costs(origins, reverse=False)
+
+    def costsTo(self, destinations):
+        """
+        :return: len(destinations) x verticesCount matrix of lowest transit costs to every destination
+        """
+        return self.__costs(destinations, reverse=True)
+
+    def __costs(self, origins, reverse):
+        origins = list(origins)
+        res = np.empty((len(origins), self.verticesCount))
+        for i in range(0, len(origins), ROWS_PER_CHUNK):
+            chunk = origins[i:i + ROWS_PER_CHUNK]
+            if self.__graph is not None:
+                res[i:i + len(chunk)] = self.__graph.distances(source=chunk, weights=self.__weights, mode='in' if reverse else 'out')
+            else:
+                adjacency = self.__reverseAdjacency if reverse else self.__adjacency
+                for j, origin in enumerate(chunk):
+                    res[i + j] = self.__dijkstra(adjacency, origin)
+        return res
+
+    def __adjacencyLists(self, sources, targets, weights, reverse):
+        adjacency = [[] for _ in range(0, self.verticesCount)]
+        for source, target, weight in zip(sources, targets, weights):
+            if reverse:
+                source, target = target, source
+            adjacency[source].append((target, weight))
+            if not self.__directed:
+                adjacency[target].append((source, weight))
+        return adjacency
+
+    def __dijkstra(self, adjacency, origin):
+        costs = np.full(self.verticesCount, np.inf)
+        costs[origin] = 0
+        heap = [(0.0, origin)]
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost > costs[node]:
+                continue
+            for neighbour, weight in adjacency[node]:
+                if cost + weight < costs[neighbour]:
+                    costs[neighbour] = cost + weight
+                    heapq.heappush(heap, (cost + weight, neighbour))
+        return costs
+
+
+class TravelCosts:
+    """
+    Lowest transit costs between nodes of the system, recomputed lazily after any change of edge weights.
+    Single costs are served from columns computed per destination, so path planning and closest executor lookup
+    don't wait for the whole matrix, which is needed only by queue optimization.
+    """
+    def __init__(self, system):
+        self.__system = system
+        self.__version = None
+        self.__shortestPaths = None
+        self.__columns = dict()
+        self.__costs = None
+        self.__lock = threading.Lock()
+        self.__matrixLock = threading.Lock()
+
+    def matrix(self):
+        """
+        :return: V x V matrix of lowest transit costs
+        """
+        with self.__matrixLock:
+            shortestPaths, version = self.__current()
+            costs = self.__costs
+            if costs is None or costs[0] != version:
+                costs = (version, shortestPaths.costsFrom(range(0, shortestPaths.verticesCount)))
+                self.__costs = costs
+            return costs[1]
+
+    def cost(self, source, destination):
+        return float(self.__column(destination)[source])
+
+    def costsTo(self, sources, destination):
+        """
+        :param sources: Sequence of nodes indices
+        :return: Array of lowest costs from every source to destination
+        """
+        return self.__column(destination)[np.asarray(sources, dtype=np.int64)]
+
+    def __column(self, destination):
+        shortestPaths, version = self.__current()
+        costs = self.__costs
+        if costs is not None and costs[0] == version:
+            return costs[1][:, destination]
+        with self.__lock:
+            column = self.__columns.get(destination) if self.__version == version else None
+            if column is None:
+                column = shortestPaths.costsTo([destination])[0]
+                if self.__version == version:
+                    self.__columns[destination] = column
+            return column
+
+    def __current(self):
+        with self.__lock:
+            version = self.__system.topologyVersion()
+            if self.__version != version:
+                self.__version = version
+                self.__shortestPaths = ShortestPaths(self.__system)
+                self.__columns = dict()
+            return self.__shortestPaths, self.__version
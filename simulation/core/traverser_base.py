@@ -10,9 +10,19 @@ class TraverserStatistics:
     timeInTransition: float
 
 
+@dataclass
+class EvaluationBudget:
+    surrogateEvaluations: int
+    simulatedEvaluations: int
+
+
 class TraverserBase:
-    def __init__(self, system):
+    def __init__(self, system, seed=None):
+        """
+        :param seed: Seed of traverser's random generator, global random module is used when not given
+        """
         self.system = system
+        self._random = random.Random(seed) if seed is not None else random
         self._bestSequence = None
         self._bestCost = 0
         self._bestStatistics = None
@@ -21,6 +31,27 @@ class TraverserBase:
         self._currentStatistics = None
         self._tmpSequence = None
         self._initialSequence = []
+        self._surrogate = None
+        self._simulatedFraction = 1.0
+        self._budget = EvaluationBudget(0, 0)
+
+    def setSurrogate(self, surrogate, simulatedFraction):
+        """
+        Batch candidates are screened by surrogate, only simulatedFraction of generated ones with the lowest
+        estimated cost is proposed for simulation.
+        :param surrogate: Model with costs(tasks, candidates) method, e.g. SurrogateCostModel
+        """
+        self._surrogate = surrogate
+        self._simulatedFraction = simulatedFraction
+
+    def budget(self) -> EvaluationBudget:
+        """
+        :return: Numbers of candidates estimated by surrogate and simulated since the sequence was assigned
+        """
+        return self._budget
+
+    def _simulatedCount(self, generated):
+        return max(1, int(math.ceil(generated * self._simulatedFraction)))
 
     def assignSequence(self, sequence):
         self._bestCost = -1
@@ -30,6 +61,7 @@ class TraverserBase:
         self._tmpSequence = copy.deepcopy(sequence)
         self._currentStatistics = TraverserStatistics(0, 0, 0, 0)
         self._initialSequence = copy.deepcopy(sequence)
+        self._budget = EvaluationBudget(0, 0)
 
     def feedback(self, cost, collisions, timeInQueue, timeInPenalty, timeInTransition):
         self._currentCost += cost
@@ -41,6 +73,18 @@ class TraverserBase:
     def nextIteration(self):
         raise NotImplementedError("To be implemented in concrete traverser!")
 
+    def candidates(self):
+        """
+        :return: Array of candidates to be evaluated together, rows are permutations of indices of assigned sequence
+        """
+        raise NotImplementedError("To be implemented in concrete traverser!")
+
+    def batchFeedback(self, results):
+        """
+        :param results: List of (cost, collisions, timeInQueue, timeInPenalty, timeInTransition) tuples matching candidates
+        """
+        raise NotImplementedError("To be implemented in concrete traverser!")
+
     def finished(self):
         return len(self._tmpSequence) == 0
 
@@ -0,0 +1,55 @@
+import threading
+from dataclasses import dataclass
+
+
+@dataclass
+class DeadlockStatistics:
+    cyclesResolved: int
+    reroutes: int
+    backoffs: int
+    timeLost: float
+
+
+class WaitForGraph:
+    """
+    Tracks which executors wait for which. Every blocked executor has edges to executors holding
+    or queued ahead for the edge it waits for, a cycle through it means nobody in the cycle can proceed.
+    """
+    def __init__(self):
+        self.__waiting = dict()
+        self.__lock = threading.Lock()
+
+    def setBlocked(self, waiter, blockers, waitStart):
+        """
+        Updates blockers of the waiter and checks for a cycle created by this update.
+        :return: List of (executor, waitStart) tuples forming a cycle through the waiter or None
+        """
+        with self.__lock:
+            self.__waiting[id(waiter)] = (waiter, set(id(blocker) for blocker in blockers if blocker is not waiter), waitStart)
+            return self.__findCycle(id(waiter))
+
+    def remove(self, waiter):
+        with self.__lock:
+            self.__waiting.pop(id(waiter), None)
+
+    @staticmethod
+    def victim(cycle):
+        """
+        Executor which started waiting last has the lowest priority.
+        """
+        return max(cycle, key=lambda item: item[1])[0]
+
+    def __findCycle(self, start):
+        stack = [(start, iter(self.__waiting[start][1]))]
+        visited = {start}
+        while stack:
+            node, blockers = stack[-1]
+            blocker = next(blockers, None)
+            if blocker is None:
+                stack.pop()
+            elif blocker == start:
+                return [(self.__waiting[node][0], self.__waiting[node][2]) for node, _ in stack]
+            elif blocker in self.__waiting and blocker not in visited:
+                visited.add(blocker)
+                stack.append((blocker, iter(self.__waiting[blocker][1])))
+        return None
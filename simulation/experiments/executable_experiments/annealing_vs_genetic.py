@@ -0,0 +1,46 @@
+"""
+Best simulated cost reached by genetic algorithm and simulated annealing per number of simulated evaluations.
+
+Usage: python -m simulation.experiments.executable_experiments.annealing_vs_genetic [tasksNumber] [evaluations] [workers]
+"""
+import random, sys
+from simulation.core.system_builder import SystemBuilder
+from simulation.core.task import Task
+from simulation.core.genetic_algorithm_traverser import GeneticAlgorithmTraverser
+from simulation.core.simulated_annealing_traverser import SimulatedAnnealingTraverser
+from simulation.experiments_utils.test_graphs_builders import ShortServiceTimeFullGraphBuilder
+from simulation.simpy_adapter.parallel_evaluator import ParallelEvaluator
+
+AGENTS_NUMBER = 3
+REPORTS = 12
+
+
+def run(tasksNumber, evaluations, workers):
+    random.seed(0)
+    systemBuilder = SystemBuilder()
+    ShortServiceTimeFullGraphBuilder(10).setEnvironment(None).build(systemBuilder)
+    system = systemBuilder.system()
+    tasks = [Task(i, *random.sample(range(0, system.nodesCount()), 2)) for i in range(0, tasksNumber)]
+
+    traversers = [('genetic algorithm', GeneticAlgorithmTraverser(system)),
+                  ('simulated annealing', SimulatedAnnealingTraverser(system, agentsNumber=AGENTS_NUMBER))]
+    for name, traverser in traversers:
+        traverser.assignSequence(tasks)
+        progress = []
+        with ParallelEvaluator(system, agentsNumber=AGENTS_NUMBER, workers=workers) as evaluator:
+            while traverser.budget().simulatedEvaluations < evaluations:
+                traverser.batchFeedback(evaluator.evaluate(tasks, traverser.candidates()))
+                progress.append((traverser.budget().simulatedEvaluations, traverser.cost()))
+        reported = progress[::max(1, len(progress) // REPORTS)]
+        if reported[-1] != progress[-1]:
+            reported.append(progress[-1])
+        print(name)
+        for simulated, cost in reported:
+            print('  {:6d} simulated  best cost {:10.1f}'.format(simulated, cost))
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 60,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2400,
+        int(sys.argv[3]) if len(sys.argv) > 3 else None)
@@ -0,0 +1,49 @@
+"""
+Best simulated cost reached per wall-clock second by genetic algorithm, when all genomes are simulated and when
+surrogate model leaves only a fraction of them for simulation.
+
+Usage: python -m simulation.experiments.executable_experiments.surrogate_screening [tasksNumber] [seconds] [workers]
+"""
+import random, sys, time
+from simulation.core.system_builder import SystemBuilder
+from simulation.core.task import Task
+from simulation.core.genetic_algorithm_traverser import GeneticAlgorithmTraverser
+from simulation.core.surrogate_cost import SurrogateCostModel
+from simulation.experiments_utils.test_graphs_builders import ShortServiceTimeFullGraphBuilder
+from simulation.simpy_adapter.parallel_evaluator import ParallelEvaluator
+
+SIMULATED_FRACTIONS = [1.0, 0.25, 0.1]
+AGENTS_NUMBER = 3
+
+
+def run(tasksNumber, seconds, workers):
+    random.seed(0)
+    systemBuilder = SystemBuilder()
+    ShortServiceTimeFullGraphBuilder(10).setEnvironment(None).build(systemBuilder)
+    system = systemBuilder.system()
+    tasks = [Task(i, *random.sample(range(0, system.nodesCount()), 2)) for i in range(0, tasksNumber)]
+    surrogate = SurrogateCostModel(system, agentsNumber=AGENTS_NUMBER)
+
+    for fraction in SIMULATED_FRACTIONS:
+        traverser = GeneticAlgorithmTraverser(system)
+        if fraction < 1.0:
+            traverser.setSurrogate(surrogate, fraction)
+        traverser.assignSequence(tasks)
+        with ParallelEvaluator(system, agentsNumber=AGENTS_NUMBER, workers=workers) as evaluator:
+            start = time.perf_counter()
+            progress = []
+            while time.perf_counter() - start < seconds:
+                traverser.batchFeedback(evaluator.evaluate(tasks, traverser.candidates()))
+                progress.append((time.perf_counter() - start, traverser.cost()))
+        budget = traverser.budget()
+        print('simulated fraction: {}, generations: {}, surrogate evaluations: {}, simulated evaluations: {}'.format(
+            fraction, len(progress), budget.surrogateEvaluations, budget.simulatedEvaluations))
+        for elapsed, cost in progress:
+            print('  {:8.2f} s  best cost {:10.1f}'.format(elapsed, cost))
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 60,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 20.0,
+        int(sys.argv[3]) if len(sys.argv) > 3 else None)
@@ -0,0 +1,37 @@
+import sys
+from model.gnn_training import TRAINING_TOPOLOGIES, TrainedChooserFactory, simulateRun
+from simulation.experiments_utils.runner import Runner
+from simulation.experiments_utils.logger import Logger
+from simulation.experiments_utils.analytics.experiment_analyzer import *
+
+
+class TrainedGnnJobCostExperiment:
+    """
+    Realized job cost when paths are chosen randomly from k shortest ones (chooserFactory None) or by trained GNN.
+    """
+    def __init__(self, topology, chooserFactory):
+        self.__topology = topology
+        self.__chooserFactory = chooserFactory
+        self.__run = 0
+
+    def run(self, statisticsCollector):
+        _, outcomes = simulateRun(self.__topology, self.__run, self.__chooserFactory)
+        self.__run += 1
+        for path, cost, collisions, timeInQueue, features in outcomes:
+            statisticsCollector.collect('cost', cost)
+            statisticsCollector.collect('collisions', collisions)
+
+
+# Usage: python -m simulation.experiments.generic_experiments.trained_gnn_job_cost_experiment <gnn_weights.npz>
+experimentCollector = ExperimentCollector(Logger())
+analyzer = ExperimentAnalyzer(experimentCollector)
+
+for chooserName, chooserFactory in [('random', None), ('trained', TrainedChooserFactory(sys.argv[1]))]:
+    for topology in TRAINING_TOPOLOGIES:
+        experiment = TrainedGnnJobCostExperiment(topology, chooserFactory)
+        Runner(experiment, experimentCollector.getRetriesCollector((chooserName, topology))).run(times=10)
+
+for statistic in ['cost', 'collisions']:
+    series = analyzer.analyze(statistic, ['mean'])['mean']
+    for parameterValue, value in zip(series.x_values, series.y_values):
+        print("{} {}: {}".format(statistic, parameterValue, value))
@@ -11,7 +11,7 @@ class Agent:
         self.nextNode = None
 
     def start(self):
-        self.env.process(self.__run())
+        return self.env.process(self.__run())
 
 
     def __run(self):
@@ -0,0 +1,188 @@
+"""
+Evaluation of candidate tasks sequences in SimPy simulations spread over a process pool. Workers build the topology
+once and receive candidates as arrays of indices into the evaluated tasks. Every candidate is simulated in its own
+environment with random generator seeded by evaluator seed and candidate index, so results don't depend on
+the number of workers or on how candidates are split between them.
+
+Usage: python -m simulation.simpy_adapter.parallel_evaluator [tasksNumber] [generations]
+"""
+import os, random, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+from simulation.core.system_builder import SystemBuilder, Vertex, Edge
+from simulation.core.task import Task
+from simulation.core.traverser_base import TraverserBase, TraverserStatistics
+from simulation.simpy_adapter.agent import Agent
+from simulation.simpy_adapter.environment_wrapper import EnvironmentWrapper
+from simulation.simpy_adapter.node import Node
+
+SIMULATION_TIMEOUT = 1000000
+CHUNKS_PER_WORKER = 2
+
+
+@dataclass(frozen=True)
+class TopologyDescription:
+    serviceTimes: tuple
+    edges: tuple
+
+
+def describeTopology(system) -> TopologyDescription:
+    """
+    :return: Picklable description of System built by SystemBuilder, nodes without service time get 0
+    """
+    serviceTimes = tuple(getattr(system.node(i), 'serviceTime', 0) for i in range(0, system.nodesCount()))
+    edges = tuple((edge.source, edge.target, edge['weight']) for edge in system.graph.es)
+    return TopologyDescription(serviceTimes, edges)
+
+
+def describeTasks(tasks):
+    return np.array([(task.taskNumber(), task.source(), task.destination()) for task in tasks], dtype=np.int64)
+
+
+class SequenceTraverser(TraverserBase):
+    """
+    Hands out tasks of a single candidate in order to agents, accumulates their feedback.
+    """
+    def __init__(self, system, tasks):
+        super().__init__(system)
+        self._tmpSequence = list(reversed(tasks))
+        self._currentStatistics = TraverserStatistics(0, 0, 0, 0)
+
+    def result(self):
+        statistics = self._currentStatistics
+        return self._currentCost, statistics.collisions, statistics.timeInQueue, statistics.timeInPenalty, statistics.timeInTransition
+
+
+class WorkerSimulation:
+    """
+    System of the worker, its nodes are rebound to a fresh environment for every candidate.
+    """
+    def __init__(self, topology: TopologyDescription):
+        self.__serviceTimes = topology.serviceTimes
+        builder = SystemBuilder()
+        for index, serviceTime in enumerate(topology.serviceTimes):
+            builder.addVertex(Vertex(name='unused', node=Node(env=None, serviceTime=serviceTime, index=index)))
+        for source, target, weight in topology.edges:
+            builder.addEdge(Edge(name='unused', source=source, target=target, weight=weight))
+        self.__system = builder.system()
+
+    def evaluate(self, tasks, candidate, agentsNumber, seed):
+        """
+        :param tasks: List of (taskNumber, source, destination) rows
+        :param candidate: Array of indices into tasks
+        :return: Tuple of cost, collisions, time in queue, time in penalty and time in transition
+        """
+        # Simulation draws from the global generator, state of the caller is restored when evaluating in-process
+        callerState = random.getstate()
+        random.seed('{}-{}'.format(*seed))
+        try:
+            simulation = EnvironmentWrapper(timeout=SIMULATION_TIMEOUT)
+            for index, serviceTime in enumerate(self.__serviceTimes):
+                self.__system.graph.vs[index]['node'] = Node(env=simulation.env, serviceTime=serviceTime, index=index)
+            traverser = SequenceTraverser(self.__system, [Task(*tasks[i]) for i in candidate])
+            for number in range(0, agentsNumber):
+                simulation.env.process(_agentProcess(Agent(env=simulation.env, number=number, traverser=traverser), traverser))
+            simulation.run()
+            return traverser.result()
+        finally:
+            random.setstate(callerState)
+
+
+def _agentProcess(agent, traverser):
+    # Agent executes one task per run and stays where it finished
+    while not traverser.finished():
+        yield agent.start()
+
+
+_workerSimulation = None
+
+
+def _initializeWorker(topology):
+    global _workerSimulation
+    _workerSimulation = WorkerSimulation(topology)
+
+
+def _evaluateChunk(job):
+    tasks, candidates, offset, agentsNumber, seed = job
+    tasks = tasks.tolist()
+    return [_workerSimulation.evaluate(tasks, candidate, agentsNumber, (seed, offset + i)) for i, candidate in enumerate(candidates)]
+
+
+class ParallelEvaluator:
+    """
+    Pool of workers simulating candidates of traversers. With 0 workers candidates are simulated in the calling process.
+    """
+    def __init__(self, system, agentsNumber=1, workers=None, seed=0):
+        self.__topology = describeTopology(system)
+        self.__agentsNumber = agentsNumber
+        self.__workers = workers if workers is not None else max(1, (os.cpu_count() or 2) - 1)
+        self.__seed = seed
+        self.__pool = None
+        self.__evaluations = 0
+
+    def start(self):
+        if self.__workers > 0:
+            self.__pool = ProcessPoolExecutor(max_workers=self.__workers, initializer=_initializeWorker, initargs=(self.__topology,))
+        else:
+            _initializeWorker(self.__topology)
+
+    def shutdown(self):
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def evaluate(self, tasks, candidates):
+        """
+        :param tasks: Sequence of Task, candidates are permutations of its indices
+        :param candidates: pool x n array of candidates
+        :return: List of (cost, collisions, timeInQueue, timeInPenalty, timeInTransition) tuples matching candidates
+        """
+        tasksDescription = describeTasks(tasks)
+        candidates = np.asarray(candidates, dtype=np.int32)
+        offset = self.__evaluations
+        self.__evaluations += len(candidates)
+        if self.__pool is None:
+            return _evaluateChunk((tasksDescription, candidates, offset, self.__agentsNumber, self.__seed))
+
+        chunkSize = max(1, -(-len(candidates) // (self.__workers * CHUNKS_PER_WORKER)))
+        jobs = [(tasksDescription, candidates[i:i + chunkSize], offset + i, self.__agentsNumber, self.__seed)
+                for i in range(0, len(candidates), chunkSize)]
+        return [result for results in self.__pool.map(_evaluateChunk, jobs) for result in results]
+
+
+def optimize(traverser, evaluator, tasks, iterations):
+    """
+    Evaluates batches of candidates proposed by traverser in parallel.
+    :return: Best sequence found
+    """
+    traverser.assignSequence(tasks)
+    for i in range(0, iterations):
+        traverser.batchFeedback(evaluator.evaluate(tasks, traverser.candidates()))
+    return traverser.sequence()
+
+
+def _benchmark(tasksNumber, generations):
+    from simulation.core.genetic_algorithm_traverser import GeneticAlgorithmTraverser
+    from simulation.experiments_utils.test_graphs_builders import ShortServiceTimeFullGraphBuilder
+    random.seed(0)
+    systemBuilder = SystemBuilder()
+    ShortServiceTimeFullGraphBuilder(10).setEnvironment(None).build(systemBuilder)
+    system = systemBuilder.system()
+    tasks = [Task(i, *random.sample(range(0, system.nodesCount()), 2)) for i in range(0, tasksNumber)]
+    for workers in sorted(set([0, 1, 2, 4, os.cpu_count() or 1])):
+        with ParallelEvaluator(system, agentsNumber=3, workers=workers) as evaluator:
+            start = time.perf_counter()
+            optimize(GeneticAlgorithmTraverser(system), evaluator, tasks, generations)
+            print('workers: {}, seconds per generation: {:.3f}'.format(workers, (time.perf_counter() - start) / generations), flush=True)
+
+
+if __name__ == '__main__':
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100, int(sys.argv[2]) if len(sys.argv) > 2 else 3)
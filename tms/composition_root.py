@@ -1,6 +1,7 @@
-import threading, time, copy
+import logging, threading, time, copy
 from dataclasses import dataclass
 from simulation.core.composition_root import CompositionRoot as SimulationRoot, SimulationInitInfo
+from simulation.core.tasks_queue import FIFO
 from simulation.simpy_adapter.composition_root import CompositionRoot as SimpyRoot
 from mes_adapter.composition_root import CompositionRoot as MesRoot, MesCompositionRootInitInfo
 from agv_adapter.composition_root import CompositionRoot as AgvRoot
@@ -10,6 +11,10 @@ from storage.graph_storage import GraphStorage
 from storage.mes_mapping_storage import MesMappingStorage
 from storage.filesystem import Filesystem
 
+MES_POLLING_MARKER = "MES polling started"
+
+logger = logging.getLogger(__name__)
+
 
 class QueueObserver:
     def probeQueueState(self, queue, executorsViews, timePoint):
@@ -27,6 +32,10 @@ class TmsInitInfo:
     agvControllerIp: str
     agvControllerPort: int
     queueObserver: QueueObserver
+    gnnWeightsPath: str = None
+    quantizedGnn: bool = False
+    queueMode: str = FIFO
+    journalDirectory: str = None
 
 
 class QueueObservingThread:
@@ -84,8 +93,12 @@ class CompositionRoot:
             'simulation': self.__simpyRoot.simulation,
             'taskExecutorsManager': self.__agvRoot.executorsManager()
         }
-        simulationInitInfo = SimulationInitInfo(traverserName='geneticAlgorithm')
+        simulationInitInfo = SimulationInitInfo(traverserName='geneticAlgorithm', gnnWeightsPath=tmsInitInfo.gnnWeightsPath,
+                                                quantizedGnn=tmsInitInfo.quantizedGnn,
+                                                queueMode=tmsInitInfo.queueMode,
+                                                journalDirectory=tmsInitInfo.journalDirectory)
         self.__simulationRoot.initialize(dependencies, topologyBuilder, simulationInitInfo)
+        self.__simulationRoot.precomputeTravelCosts()
         mesInitInfo = MesCompositionRootInitInfo(dependencies={
             'mesDataSource': self.__networkSenderFactory(host=tmsInitInfo.mesIp, port=tmsInitInfo.mesPort),
             'simulationDataSource': self.__networkSenderFactory(host=tmsInitInfo.simulationMesIp, port=tmsInitInfo.simulationMesPort),
@@ -98,6 +111,8 @@ class CompositionRoot:
     def start(self):
         self.__running = True
         self.__mesRoot.start()
+        # End of cold start measured by tms.startup_profiler, GNN is loaded in background afterwards
+        logger.info(MES_POLLING_MARKER)
         self.__queueObservingThread.start()
         self.__simulationRoot.start()
 
@@ -0,0 +1,98 @@
+"""
+Measures cold start of TMS, from process launch to MES polling, with an import time breakdown.
+
+Usage: python -m tms.startup_profiler bash launchTms.sh <mesIp:port> <simulationMesIp:port> <agvControllerIp:port>
+"""
+import os, queue, signal, subprocess, sys, threading, time
+from dataclasses import dataclass, field
+from tms.composition_root import MES_POLLING_MARKER
+
+DEFAULT_TIMEOUT = 60
+REPORTED_PACKAGES = 15
+
+
+@dataclass
+class ColdStartReport:
+    seconds: float
+    started: bool
+    importSeconds: dict = field(default_factory=dict)
+
+    def slowestImports(self, count=REPORTED_PACKAGES):
+        return sorted(self.importSeconds.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def importTimes(lines):
+    """
+    Sums self import time of -X importtime output per top level package.
+    :return: Dictionary of package name to seconds
+    """
+    res = dict()
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        columns = line[len('import time:'):].split('|')
+        if len(columns) != 3 or not columns[0].strip().isdigit():
+            continue  # header line
+        package = columns[2].strip().split('.')[0]
+        res[package] = res.get(package, 0.0) + int(columns[0]) / 1e6
+    return res
+
+
+def measureColdStart(command, marker=MES_POLLING_MARKER, timeout=DEFAULT_TIMEOUT, cwd=None, env=None, profileImports=True):
+    """
+    Starts command and waits until it logs marker line, then kills the whole process group.
+    Import times are recorded by PYTHONPROFILEIMPORTTIME, so they are collected from python started by a shell script as well.
+    Log and import times share stderr, so only imports finished before the marker are reported.
+    """
+    env = dict(os.environ if env is None else env)
+    if profileImports:
+        env['PYTHONPROFILEIMPORTTIME'] = '1'
+    begin = time.monotonic()
+    process = subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, start_new_session=True)
+    lines = queue.Queue()
+    reader = threading.Thread(target=_readLines, args=(process.stderr, lines))
+    reader.daemon = True
+    reader.start()
+    linesBeforeMarker = []
+    started = _waitForMarker(lines, marker, begin + timeout, linesBeforeMarker)
+    seconds = time.monotonic() - begin
+    _kill(process)
+    return ColdStartReport(seconds, started, importTimes(linesBeforeMarker))
+
+
+def _readLines(stream, lines):
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def _waitForMarker(lines, marker, deadline, linesBeforeMarker):
+    while True:
+        remainingTime = deadline - time.monotonic()
+        if remainingTime <= 0:
+            return False
+        try:
+            line = lines.get(timeout=remainingTime)
+        except queue.Empty:
+            return False
+        if line is None:
+            return False  # process exited before reaching marker
+        if marker in line:
+            return True
+        linesBeforeMarker.append(line)
+
+
+def _kill(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+
+if __name__ == '__main__':
+    report = measureColdStart(sys.argv[1:])
+    print("{} after {:.2f} s".format(MES_POLLING_MARKER if report.started else "Not started", report.seconds))
+    print("Import time by package:")
+    for package, seconds in report.slowestImports():
+        print("  {:<30} {:8.3f} s".format(package, seconds))
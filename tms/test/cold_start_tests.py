@@ -0,0 +1,30 @@
+import os, sys, tempfile, unittest
+from tms.startup_profiler import measureColdStart
+
+REPOSITORY = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+# Only guards against a hang, cold start time itself is reported by python -m tms.startup_profiler
+STARTUP_TIMEOUT = 120
+UNREACHABLE_ADDRESS = '127.0.0.1:1'
+# Loaded in background once MES polling started
+DEFERRED_PACKAGES = ['torch', 'torch_geometric']
+
+
+class ColdStartTests(unittest.TestCase):
+    def test_startsMesPollingBeforeLoadingGnn(self):
+        # Same as launchTms.sh, but log and queue lengths files are written to temporary directory
+        command = [sys.executable, os.path.join(REPOSITORY, 'tms', 'tms_cli.py'), UNREACHABLE_ADDRESS, UNREACHABLE_ADDRESS, UNREACHABLE_ADDRESS,
+                   os.path.join(REPOSITORY, 'tms', 'test_utils', 'testGraph.json'),
+                   os.path.join(REPOSITORY, 'tms', 'test_utils', 'mesTasksMapping.json')]
+        env = dict(os.environ, PYTHONPATH=REPOSITORY)
+        with tempfile.TemporaryDirectory() as directory:
+            report = measureColdStart(command, timeout=STARTUP_TIMEOUT, cwd=directory, env=env)
+
+        self.assertTrue(report.started)
+        self.assertIn('tms', report.importSeconds)
+        for package in DEFERRED_PACKAGES:
+            self.assertNotIn(package, report.importSeconds,
+                             "{} imported before MES polling, slowest imports: {}".format(package, report.slowestImports(5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
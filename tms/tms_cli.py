@@ -1,4 +1,4 @@
-import sys, signal, csv, time
+import sys, signal, csv, time, logging
 from tms.composition_root import CompositionRoot, TmsInitInfo, QueueObserver
 from tms.test_utils.logger import Logger
 
@@ -11,7 +11,7 @@ class CliQueueObserver(QueueObserver):
 
     def probeQueueState(self, queue, executorsViews, timePoint):
         global logger
-        qlen = len(queue.tasksList()) + len(queue.pendingTasksList())
+        qlen = queue.size() + queue.pendingSize()
         self.__qlens.append({'time': round(timePoint, 2), 'qlen': qlen})
         if len(self.__qlens) > 100:
             self.save()
@@ -34,6 +34,7 @@ class SignalHandler:
         self.killed = True
 
 
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s: %(message)s")
 logger = Logger("tms_log.txt")
 mesConnectionString = sys.argv[1].split(':')
 mesIp, mesPort = mesConnectionString[0], int(mesConnectionString[1])
@@ -41,6 +42,8 @@ simulationMesConnectionString = sys.argv[2].split(':')
 simulationMesIp, simulationMesPort = simulationMesConnectionString[0], int(simulationMesConnectionString[1])
 agvControllerConnectionString = sys.argv[3].split(':')
 agvControllerIp, agvControllerPort = agvControllerConnectionString[0], int(agvControllerConnectionString[1])
+# Tasks queue is persisted only when journal directory is given
+journalDirectory = sys.argv[6] if len(sys.argv) > 6 else None
 
 qlensObserver = CliQueueObserver('qlens.csv')
 sigIntHandler = SignalHandler()
@@ -54,7 +57,8 @@ logger.logLine("Starting TMS with MES: {}:{}, simulation MES: {}:{} and AGV cont
 initInfo = TmsInitInfo(topologyDescriptionPath=sys.argv[4], mesIp=mesIp, mesPort=mesPort,
                        mesTasksMappingPath=sys.argv[5], agvControllerIp=agvControllerIp,
                        agvControllerPort=agvControllerPort, queueObserver=qlensObserver,
-                       simulationMesIp=simulationMesIp, simulationMesPort=simulationMesPort)
+                       simulationMesIp=simulationMesIp, simulationMesPort=simulationMesPort,
+                       journalDirectory=journalDirectory)
 tmsRoot = CompositionRoot()
 tmsRoot.initialize(tmsInitInfo=initInfo)
 tmsRoot.start()
@@ -2,6 +2,7 @@ import tempfile
 from flask import Flask, request, render_template, abort, send_file, redirect
 from dataclasses import dataclass
 from composition_root import CompositionRoot, TmsInitInfo, QueueObserver
+from simulation.core.tasks_queue import ENQUEUED, OPTIMIZATION_STARTED, REORDERED, POPPED
 import logging
 
 @dataclass
@@ -28,9 +29,11 @@ class WebQueueObserver(QueueObserver):
         self.pendingTasks = []
         self.cost = 0
         self.length = 0
+        self.__version = 0
+        self.__optimizedLength = 0
 
     def probeQueueState(self, queue, executorsViews, timePoint):
-        self.reset()
+        self.agvs = []
         if queue.cost() != -1:
             self.cost = str(round(queue.cost()))
         else:
@@ -47,18 +50,42 @@ class WebQueueObserver(QueueObserver):
                     state = 'executed'
                 agvTasks.append(AGVTask(id=assignedPath[i], state=state))
             self.agvs.append(AGV(executorView.executorId(), agvTasks, executorView.state()))
-        for task in queue.tasksList():
-            self.tasks.append(TaskView(task.taskNumber(), "optimized"))
-        for task in queue.pendingTasksList():
-            self.tasks.append(TaskView(task.taskNumber(), "pending"))
+        self.__updateTasks(queue)
         self.length = len(self.tasks)
 
+    def __updateTasks(self, queue):
+        # Only changes since the last probe are applied, so probing cost doesn't grow with the queue
+        changes = queue.changesSince(self.__version)
+        if changes is None:
+            snapshot = queue.snapshot()
+            self.tasks = [TaskView(task.taskNumber(), "optimized") for task in snapshot.tasks] + \
+                         [TaskView(task.taskNumber(), "pending") for task in snapshot.pendingTasks]
+            self.__optimizedLength = len(snapshot.tasks)
+            self.__version = snapshot.version
+            return
+        for change in changes:
+            if change.kind == ENQUEUED:
+                self.tasks.extend(TaskView(task.taskNumber(), "pending") for task in change.tasks)
+            elif change.kind == OPTIMIZATION_STARTED:
+                for view in self.tasks[self.__optimizedLength:self.__optimizedLength + len(change.tasks)]:
+                    view.state = "optimized"
+                self.__optimizedLength += len(change.tasks)
+            elif change.kind == REORDERED:
+                self.tasks[0:self.__optimizedLength] = [TaskView(task.taskNumber(), "optimized") for task in change.tasks]
+                self.__optimizedLength = len(change.tasks)
+            elif change.kind == POPPED:
+                del self.tasks[0:len(change.tasks)]
+                self.__optimizedLength -= len(change.tasks)
+            self.__version = change.version
+
     def reset(self):
         self.agvs = []
         self.tasks = []
         self.pendingTasks = []
         self.cost = 0
         self.length = 0
+        self.__version = 0
+        self.__optimizedLength = 0
 
 
 class WebTms: